@@ -1,7 +1,8 @@
 import cv2
 
+from pyiof.face_recognition.cascade_classifiers_registry import cascade_classifiers_registry
 from pyiof.face_recognition.interfaces.icascade_classifiers_loader import ICascadeClassifiersLoader
-from pyiof.utils.common_utils import get_resources_dir
+from pyiof.utils.common_utils import calculate_file_hash, get_resources_dir
 import os
 
 
@@ -11,18 +12,62 @@ class CascadeClassifiersLoader(ICascadeClassifiersLoader):
 
     Attributes:
         _face_cascade_classifier_files (list[str]): A list of file paths for the Haar cascade classifier files.
+        shared (bool): Whether classifiers are taken from the process-wide CascadeClassifiersRegistry.
+        _file_checksums (dict): The stat signature and checksum of every classifier file, by file path,
+                                computed again only when the file changes.
     """
 
-    def __init__(self, face_cascade_classifier_files: list[str] = None):
+    def __init__(self, face_cascade_classifier_files: list[str] = None, shared: bool = False):
         """
         Initializes the CascadeClassifiersLoader with optional specific classifier files.
 
         Args:
             face_cascade_classifier_files (list[str], optional): A list of paths to Haar cascade classifier files.
                                                                  If not provided, defaults to common face detection classifiers.
+            shared (bool, optional): If True, classifiers are taken from the process-wide registry, which parses
+                                     every classifier file once per process and hands out one instance per thread.
+                                     If False, every call parses the classifier files again.
         """
         self._face_cascade_classifier_files = face_cascade_classifier_files or \
                                               self._get_cascade_classifiers_files()
+        self.shared = shared
+        self._file_checksums = {}
+
+    @property
+    def face_cascade_classifier_files(self) -> list[str]:
+        """
+        Returns the file paths of the Haar cascade classifier files.
+
+        Returns:
+            list[str]: A copy of the list of classifier file paths.
+        """
+        return list(self._face_cascade_classifier_files)
+
+    def cache_identity(self) -> str:
+        """
+        Returns a stable identity of the cascade classifiers for the keys of cached face recognition results:
+        the path and the BLAKE2b checksum of every classifier file, so results cached with a classifier file
+        replaced since then are not used. The checksum of a file is computed again only when its modification
+        time or size changes.
+
+        Returns:
+            str: The identity of the cascade classifiers.
+        """
+        file_identities = []
+        for classifier_file in self._face_cascade_classifier_files:
+            try:
+                stat_result = os.stat(classifier_file)
+            except OSError:
+                checksum = ''
+            else:
+                file_stamp = (stat_result.st_mtime_ns, stat_result.st_size)
+                file_checksum = self._file_checksums.get(classifier_file)
+                if file_checksum is None or file_checksum[0] != file_stamp:
+                    file_checksum = self._file_checksums[classifier_file] = \
+                        (file_stamp, calculate_file_hash(classifier_file, 'blake2b'))
+                checksum = file_checksum[1]
+            file_identities.append(f'{os.path.abspath(classifier_file)}:{checksum}')
+        return f'{type(self).__name__}:' + ','.join(file_identities)
 
     @staticmethod
     def _get_cascade_classifiers_files() -> list[str]:
@@ -41,6 +86,7 @@ class CascadeClassifiersLoader(ICascadeClassifiersLoader):
     def load_cascade_classifiers(self) -> list[cv2.CascadeClassifier]:
         """
         Loads the Haar cascade classifiers for face detection from the specified classifier files.
+        In shared mode, the classifiers returned belong to the calling thread and must only be used by it.
 
         Returns:
             list[cv2.CascadeClassifier]: A list of cv2.CascadeClassifier objects loaded from the classifier files.
@@ -52,5 +98,9 @@ class CascadeClassifiersLoader(ICascadeClassifiersLoader):
         for face_cascade_classifier_file in self._face_cascade_classifier_files:
             if not os.path.exists(face_cascade_classifier_file):
                 raise FileNotFoundError(f"The classifier file {face_cascade_classifier_file} was not found.")
-            face_cascade_classifiers.append(cv2.CascadeClassifier(face_cascade_classifier_file))
+            if self.shared:
+                face_cascade_classifiers.append(
+                    cascade_classifiers_registry.get_cascade_classifier(face_cascade_classifier_file))
+            else:
+                face_cascade_classifiers.append(cv2.CascadeClassifier(face_cascade_classifier_file))
         return face_cascade_classifiers
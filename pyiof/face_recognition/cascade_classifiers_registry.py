@@ -0,0 +1,122 @@
+import os
+import threading
+
+import cv2
+
+from pyiof.utils.common_utils import calculate_file_hash
+
+
+class CascadeClassifiersRegistry:
+    """
+    Process-wide registry of cascade classifiers, keyed by classifier file path and checksum.
+
+    The XML of every classifier file is read from disk once per process and kept in memory. Since
+    cv2.CascadeClassifier instances must not be used by several threads at the same time, the registry
+    hands out one instance per thread and per classifier file, built once from the in-memory XML and reused
+    by every caller of that thread.
+
+    Attributes:
+        _classifier_files (dict): The stat signature, checksum and XML of every registered classifier file,
+                                  by absolute file path.
+        _lock (threading.Lock): Lock protecting the registered classifier files.
+        _thread_local (threading.local): The classifier instances of each thread, by (file path, checksum).
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty CascadeClassifiersRegistry.
+        """
+        self._classifier_files = {}
+        self._lock = threading.Lock()
+        self._thread_local = threading.local()
+
+    def get_cascade_classifier(self, classifier_file: str) -> cv2.CascadeClassifier:
+        """
+        Returns the cascade classifier of the current thread for the given classifier file.
+
+        Parameters:
+            classifier_file (str): The path of the cascade classifier file.
+
+        Returns:
+            cv2.CascadeClassifier: A classifier instance used only by the current thread.
+
+        Raises:
+            FileNotFoundError: If the classifier file does not exist.
+        """
+        file_path, checksum, xml = self._register(classifier_file)
+
+        classifiers = getattr(self._thread_local, 'classifiers', None)
+        if classifiers is None:
+            classifiers = self._thread_local.classifiers = {}
+
+        key = (file_path, checksum)
+        classifier = classifiers.get(key)
+        if classifier is None:
+            classifier = classifiers[key] = self._create_cascade_classifier(file_path, xml)
+        return classifier
+
+    def clear(self):
+        """
+        Forgets the registered classifier files. Classifier instances already handed out are kept by
+        their threads until they request a classifier again.
+        """
+        with self._lock:
+            self._classifier_files.clear()
+        self._thread_local = threading.local()
+
+    def _register(self, classifier_file: str) -> tuple[str, str, str]:
+        """
+        Registers a classifier file, reading it again only if it changed on disk since it was registered.
+
+        Parameters:
+            classifier_file (str): The path of the cascade classifier file.
+
+        Returns:
+            tuple[str, str, str]: The absolute file path, the MD5 checksum and the XML of the classifier file.
+
+        Raises:
+            FileNotFoundError: If the classifier file does not exist.
+        """
+        file_path = os.path.abspath(classifier_file)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"The classifier file {classifier_file} was not found.") from e
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            registered = self._classifier_files.get(file_path)
+            if registered is not None and registered[0] == signature:
+                return file_path, registered[1], registered[2]
+
+        with open(file_path, 'r') as f:
+            xml = f.read()
+        checksum = calculate_file_hash(file_path, 'md5')
+
+        with self._lock:
+            self._classifier_files[file_path] = (signature, checksum, xml)
+        return file_path, checksum, xml
+
+    @staticmethod
+    def _create_cascade_classifier(file_path: str, xml: str) -> cv2.CascadeClassifier:
+        """
+        Creates a cascade classifier from its in-memory XML, or from its file for formats that OpenCV
+        can only load from files (such as the old Haar format).
+
+        Parameters:
+            file_path (str): The absolute path of the cascade classifier file.
+            xml (str): The XML of the cascade classifier file.
+
+        Returns:
+            cv2.CascadeClassifier: The new classifier instance.
+        """
+        file_storage = cv2.FileStorage(xml, cv2.FILE_STORAGE_READ | cv2.FILE_STORAGE_MEMORY)
+        classifier = cv2.CascadeClassifier()
+        if not classifier.read(file_storage.getFirstTopLevelNode()):
+            classifier = cv2.CascadeClassifier(file_path)
+        file_storage.release()
+        return classifier
+
+
+# Registry shared by every CascadeClassifiersLoader of the process
+cascade_classifiers_registry = CascadeClassifiersRegistry()
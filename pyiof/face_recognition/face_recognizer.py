@@ -1,7 +1,19 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+import cv2
+import numpy as np
+
 from pyiof.face_recognition.cascade_classifiers_loader import ICascadeClassifiersLoader
 from pyiof.models.face_recognition_result import FaceRecognitionResult
-from PIL import Image
-from pyiof.img_processing.image_processor import IImageProcessor
+from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor, ImageLike
+from pyiof.utils.common_utils import calculate_image_hash
+from pyiof.utils.concurrency_utils import run_in_executor
+from pyiof.utils.regions_utils import merge_overlapping_regions, regions_to_array
+from pyiof.utils.result_cache import ResultCache
 
 
 class FaceRecognizer:
@@ -11,52 +23,378 @@ class FaceRecognizer:
     Attributes:
         face_classifiers_loader (ICascadeClassifiersLoader): An object responsible for loading face cascade classifiers.
         image_processor (IImageProcessor): An object to process images, such as converting to grayscale and cropping.
-        _face_cascade_classifiers (list): A private list of loaded face cascade classifiers for face detection.
+        cache (Optional[ResultCache]): A cache of face recognition results.
+        parallel_cascades (bool): Whether the cascade classifiers run concurrently on a thread pool.
+        max_workers (Optional[int]): The maximum number of threads used to run the cascade classifiers, or to
+                                     search the tiles in tiled detection.
+        _executor (Optional[ThreadPoolExecutor]): A private thread pool, created on first use in parallel mode.
+        _executor_lock (threading.Lock): Lock protecting the creation and the shutdown of the private thread pool,
+                                         since the faces of several images can be detected at once.
+        _thread_local (threading.local): Private per-thread storage of the loaded face cascade classifiers, since
+                                         a cascade classifier must not be used by several threads at once.
     """
 
+    # Intersection over union above which regions found in neighboring tiles are the same face
+    TILES_OVERLAP_THRESHOLD = 0.3
+
     def __init__(self, face_classifiers_loader: ICascadeClassifiersLoader,
-                 image_processor: IImageProcessor):
+                 image_processor: IImageProcessor, cache: Optional[ResultCache] = None,
+                 parallel_cascades: bool = False, max_workers: Optional[int] = None):
         """
         Initializes the FaceRecognizer with necessary components for face detection.
 
         Args:
             face_classifiers_loader (ICascadeClassifiersLoader): The loader for face cascade classifiers.
             image_processor (IImageProcessor): The image processor for image manipulations.
+            cache (Optional[ResultCache]): A cache of face recognition results, keyed by the image content,
+                                           the detection parameters and the classifier files. If None,
+                                           results are not cached.
+            parallel_cascades (bool): If True, every cascade classifier runs concurrently on a thread pool
+                                      (OpenCV releases the GIL during detection) and the regions are merged.
+            max_workers (Optional[int]): The maximum number of threads used to run the cascade classifiers, or to
+                                         search the tiles in tiled detection. If None, the thread pool default
+                                         is used.
         """
         self.face_classifiers_loader = face_classifiers_loader
         self.image_processor = image_processor
-        self._face_cascade_classifiers = None
+        self.cache = cache
+        self.parallel_cascades = parallel_cascades
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._thread_local = threading.local()
+
+    def close(self):
+        """
+        Shuts down the thread pool used to run the cascade classifiers or the tiles, if any was created.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
 
-    def get_faces_regions(self, image: Image,
-                          scale_factor: float = 1.05, min_neighbors: int = 25) -> FaceRecognitionResult:
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool used to run the cascade classifiers or the tiles, creating it on first use.
+
+        Returns:
+            ThreadPoolExecutor: The thread pool.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def get_faces_regions(self, image: ImageLike, scale_factor: float = 1.05, min_neighbors: int = 25,
+                          overlap_threshold: Optional[float] = None, max_dimension: Optional[int] = None,
+                          min_face_size: Optional[int] = None, max_face_size: Optional[int] = None,
+                          tile_size: Optional[int] = None, tile_overlap: Optional[int] = None) -> FaceRecognitionResult:
         """
         Detects faces in the image and returns their regions.
 
         Args:
-            image (Image): The image to detect faces in.
+            image (ImageLike): The image to detect faces in, as a PIL Image or an RGB, RGBA or grayscale
+                               numpy array.
             scale_factor (float): The scale factor to adjust the image size during detection.
             min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            overlap_threshold (Optional[float]): If set, regions found by different cascade classifiers whose
+                                                 intersection over union is greater than this value (0 to 1)
+                                                 are merged into the largest one. If None, regions are not merged.
+            max_dimension (Optional[int]): If set, images whose width or height is larger than this value are
+                                           downscaled to fit it before detection, and the regions are mapped
+                                           back to the original image coordinates. If None, detection runs on
+                                           the full resolution image.
+            min_face_size (Optional[int]): The minimum face size in pixels of the original image. Smaller faces
+                                           are not searched for.
+            max_face_size (Optional[int]): The maximum face size in pixels of the original image. Larger faces
+                                           are not searched for.
+            tile_size (Optional[int]): If set, the image used for detection is split into square tiles of this
+                                       size, which are searched on a thread pool. If None, the whole image is
+                                       searched at once.
+            tile_overlap (Optional[int]): The overlap in pixels between neighboring tiles. Faces are only found
+                                          if they fit in a tile, so it should be at least the largest face size.
+                                          If None, the scaled max_face_size is used, or a quarter of tile_size.
 
         Returns:
-            FaceRecognitionResult: The result containing the regions of detected faces and detection parameters.
+            FaceRecognitionResult: The result containing the regions of detected faces, as an (N, 4) array of
+                                   (x, y, width, height) rows, and detection parameters.
+
+        Raises:
+            ValueError: If the tile overlap is not smaller than the tile size.
+        """
+        detection_parameters = (scale_factor, min_neighbors, overlap_threshold, max_dimension,
+                                min_face_size, max_face_size, tile_size, tile_overlap)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._get_cache_key(image, *detection_parameters)
+            face_recognition_result = self.cache.get(cache_key)
+            if face_recognition_result is not None:
+                return copy.deepcopy(face_recognition_result)
+
+        face_recognition_result = self._detect_faces(image, *detection_parameters)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, copy.deepcopy(face_recognition_result))
+        return face_recognition_result
+
+    async def get_faces_regions_async(self, image: ImageLike, scale_factor: float = 1.05, min_neighbors: int = 25,
+                                      overlap_threshold: Optional[float] = None, max_dimension: Optional[int] = None,
+                                      min_face_size: Optional[int] = None, max_face_size: Optional[int] = None,
+                                      tile_size: Optional[int] = None, tile_overlap: Optional[int] = None,
+                                      executor: Optional[Executor] = None,
+                                      semaphore: Optional[asyncio.Semaphore] = None) -> FaceRecognitionResult:
         """
-        if not self._face_cascade_classifiers:
-            self._face_cascade_classifiers = self.face_classifiers_loader.load_cascade_classifiers()
+        Detects faces in the image like get_faces_regions, on the executor, without blocking the event loop.
+        Cancelling the task does not interrupt a detection that is already running, but its result is dropped.
+        See get_faces_regions for the description of the detection parameters.
 
+        Args:
+            image (ImageLike): The image to detect faces in, as a PIL Image or an RGB, RGBA or grayscale
+                               numpy array.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            overlap_threshold (Optional[float]): The intersection over union above which regions are merged.
+                                                 If None, regions are not merged.
+            max_dimension (Optional[int]): The maximum width or height of the image used for detection.
+            min_face_size (Optional[int]): The minimum face size in pixels of the original image.
+            max_face_size (Optional[int]): The maximum face size in pixels of the original image.
+            tile_size (Optional[int]): The size of the tiles searched separately. If None, no tiling is done.
+            tile_overlap (Optional[int]): The overlap in pixels between neighboring tiles.
+            executor (Optional[Executor]): The executor running the detection. OpenCV releases the GIL during
+                                           detection, so a thread pool runs detections in parallel. If None,
+                                           the default executor of the event loop is used.
+            semaphore (Optional[asyncio.Semaphore]): A semaphore limiting the number of detections running at
+                                                     the same time, to be shared by all the calls of the event
+                                                     loop. If None, the executor is the only limit.
+
+        Returns:
+            FaceRecognitionResult: The result containing the regions of detected faces, as an (N, 4) array of
+                                   (x, y, width, height) rows, and detection parameters.
+        """
+        return await run_in_executor(self.get_faces_regions, image, scale_factor, min_neighbors, overlap_threshold,
+                                     max_dimension, min_face_size, max_face_size, tile_size, tile_overlap,
+                                     executor=executor, semaphore=semaphore)
+
+    def _get_cache_key(self, image: ImageLike, *detection_parameters) -> str:
+        """
+        Builds the cache key of the face recognition result of an image from the image content,
+        the detection parameters and the identity of the cascade classifiers.
+
+        Args:
+            image (ImageLike): The image to detect faces in.
+            *detection_parameters: The parameters of get_faces_regions, in order.
+
+        Returns:
+            str: The cache key.
+        """
+        return ResultCache.make_key('FaceRecognitionResult', calculate_image_hash(image), detection_parameters,
+                                    self.face_classifiers_loader.cache_identity())
+
+    def _detect_faces(self, image: ImageLike, *detection_parameters) -> FaceRecognitionResult:
+        """
+        Converts the image to a grayscale numpy array and detects the faces in it. The image goes through a
+        single color conversion, and numpy arrays are not copied.
+
+        Args:
+            image (ImageLike): The image to detect faces in.
+            *detection_parameters: The parameters of get_faces_regions, in order.
+
+        Returns:
+            FaceRecognitionResult: The result containing the regions of detected faces and detection parameters.
+        """
         gray_scaled_image = self.image_processor.grayscale_image(image)
         gray_scaled_image_np = self.image_processor.convert_pil_image_to_np_array(gray_scaled_image)
+        return self.get_faces_regions_from_gray_array(gray_scaled_image_np, *detection_parameters)
+
+    def get_faces_regions_from_gray_array(self, gray_scaled_image_np: np.ndarray, scale_factor: float = 1.05,
+                                          min_neighbors: int = 25, overlap_threshold: Optional[float] = None,
+                                          max_dimension: Optional[int] = None, min_face_size: Optional[int] = None,
+                                          max_face_size: Optional[int] = None, tile_size: Optional[int] = None,
+                                          tile_overlap: Optional[int] = None) -> FaceRecognitionResult:
+        """
+        Detects faces in a grayscale numpy array and returns their regions. Results are not cached.
+
+        Runs every face cascade classifier on the grayscale image, downscaled to max_dimension if needed,
+        and merges their regions. See get_faces_regions for the description of the parameters.
 
-        # Find regions containing faces
-        face_regions = []
-        for face_cascade_classifier in self._face_cascade_classifiers:
-            faces = face_cascade_classifier.detectMultiScale(
+        Args:
+            gray_scaled_image_np (ndarray): The grayscale image as a 2D uint8 numpy array.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            overlap_threshold (Optional[float]): The intersection over union above which regions are merged.
+                                                 If None, regions are not merged.
+            max_dimension (Optional[int]): The maximum width or height of the image used for detection.
+            min_face_size (Optional[int]): The minimum face size in pixels of the original image.
+            max_face_size (Optional[int]): The maximum face size in pixels of the original image.
+            tile_size (Optional[int]): The size of the tiles searched separately. If None, no tiling is done.
+            tile_overlap (Optional[int]): The overlap in pixels between neighboring tiles.
+
+        Returns:
+            FaceRecognitionResult: The result containing the regions of detected faces and detection parameters.
+
+        Raises:
+            ValueError: If the tile overlap is not smaller than the tile size.
+        """
+        height, width = gray_scaled_image_np.shape[:2]
+        detection_scale = 1.0
+        if max_dimension is not None and max(height, width) > max_dimension:
+            detection_scale = max_dimension / max(height, width)
+            gray_scaled_image_np = cv2.resize(gray_scaled_image_np,
+                                              (max(1, round(width * detection_scale)),
+                                               max(1, round(height * detection_scale))),
+                                              interpolation=cv2.INTER_AREA)
+
+        min_size = self._scale_face_size(min_face_size, detection_scale)
+        max_size = self._scale_face_size(max_face_size, detection_scale)
+        if tile_size is not None:
+            if tile_overlap is None:
+                tile_overlap = max_size[0] or tile_size // 4
+            if not 0 <= tile_overlap < tile_size:
+                raise ValueError(f"The tile overlap must be smaller than the tile size, got an overlap of "
+                                 f"{tile_overlap} pixels for {tile_size} pixels tiles (the overlap defaults "
+                                 f"to the scaled max_face_size)")
+            face_regions = self._detect_faces_in_tiles(gray_scaled_image_np, scale_factor, min_neighbors,
+                                                       min_size, max_size, tile_size, tile_overlap)
+            # Faces in the overlap bands are found in more than one tile
+            face_regions = merge_overlapping_regions(face_regions, self.TILES_OVERLAP_THRESHOLD)
+        else:
+            face_regions = self._detect_faces_in_array(gray_scaled_image_np, scale_factor, min_neighbors,
+                                                       min_size, max_size)
+        if overlap_threshold is not None:
+            face_regions = merge_overlapping_regions(face_regions, overlap_threshold)
+        if detection_scale != 1.0:
+            face_regions = np.round(face_regions / detection_scale).astype(np.int32)
+
+        return FaceRecognitionResult(face_regions, scale_factor, min_neighbors, overlap_threshold, detection_scale)
+
+    @staticmethod
+    def _scale_face_size(face_size: Optional[int], detection_scale: float) -> tuple[int, int]:
+        """
+        Converts a face size of the original image to the size argument of detectMultiScale.
+
+        Args:
+            face_size (Optional[int]): The face size in pixels of the original image.
+            detection_scale (float): The scale of the image used for detection.
+
+        Returns:
+            tuple[int, int]: The face size in the image used for detection, or (0, 0) (no limit) if not set.
+        """
+        if face_size is None:
+            return 0, 0
+        scaled_face_size = max(1, round(face_size * detection_scale))
+        return scaled_face_size, scaled_face_size
+
+    def _detect_faces_in_tiles(self, gray_scaled_image_np: np.ndarray, scale_factor: float, min_neighbors: int,
+                               min_size: tuple[int, int], max_size: tuple[int, int],
+                               tile_size: int, tile_overlap: int) -> np.ndarray:
+        """
+        Splits the grayscale image into overlapping tiles, which are views of the image (no copy), runs every
+        face cascade classifier on each tile on the thread pool and translates the regions back to image
+        coordinates.
+
+        Args:
+            gray_scaled_image_np (ndarray): The grayscale image as a numpy array.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            min_size (tuple[int, int]): The minimum face size, (0, 0) for no limit.
+            max_size (tuple[int, int]): The maximum face size, (0, 0) for no limit.
+            tile_size (int): The size of the square tiles.
+            tile_overlap (int): The overlap in pixels between neighboring tiles.
+
+        Returns:
+            ndarray: The regions found in all the tiles, as an (N, 4) array. Faces in the overlap bands
+                     may be found more than once.
+        """
+        height, width = gray_scaled_image_np.shape[:2]
+        tile_step = tile_size - tile_overlap
+        tile_origins = [(x, y) for y in self._get_tile_starts(height, tile_size, tile_step)
+                        for x in self._get_tile_starts(width, tile_size, tile_step)]
+
+        def detect(tile_origin):
+            x, y = tile_origin
+            tile = gray_scaled_image_np[y:y + tile_size, x:x + tile_size]
+            tile_face_regions = self._detect_faces_in_array(tile, scale_factor, min_neighbors, min_size, max_size,
+                                                            parallel_cascades=False)
+            return tile_face_regions + np.array([x, y, 0, 0], dtype=np.int32)
+
+        if len(tile_origins) > 1:
+            face_regions_per_tile = self._get_executor().map(detect, tile_origins)
+        else:
+            face_regions_per_tile = map(detect, tile_origins)
+        return np.concatenate([regions_to_array([])] + list(face_regions_per_tile))
+
+    @staticmethod
+    def _get_tile_starts(length: int, tile_size: int, tile_step: int) -> list[int]:
+        """
+        Returns the start positions of the tiles along one dimension, so that the tiles cover it entirely.
+
+        Args:
+            length (int): The size of the dimension.
+            tile_size (int): The size of the tiles.
+            tile_step (int): The distance between the start positions of neighboring tiles.
+
+        Returns:
+            list[int]: The start positions of the tiles.
+        """
+        tile_starts = list(range(0, max(length - tile_size, 0) + 1, tile_step))
+        if tile_starts[-1] + tile_size < length:
+            tile_starts.append(length - tile_size)
+        return tile_starts
+
+    def _detect_faces_in_array(self, gray_scaled_image_np: np.ndarray, scale_factor: float, min_neighbors: int,
+                               min_size: tuple[int, int], max_size: tuple[int, int],
+                               parallel_cascades: Optional[bool] = None) -> np.ndarray:
+        """
+        Runs every face cascade classifier on the grayscale image, concurrently in parallel cascades mode.
+
+        Args:
+            gray_scaled_image_np (ndarray): The grayscale image as a numpy array.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            min_size (tuple[int, int]): The minimum face size, (0, 0) for no limit.
+            max_size (tuple[int, int]): The maximum face size, (0, 0) for no limit.
+            parallel_cascades (Optional[bool]): Overrides the parallel cascades mode. It must be False when
+                                                called from a thread of the pool. If None, the mode of the
+                                                FaceRecognizer is used.
+
+        Returns:
+            ndarray: The regions found by all the classifiers, as an (N, 4) array in classifier order.
+        """
+        classifier_indexes = range(len(self._get_face_cascade_classifiers()))
+
+        def detect(classifier_index):
+            face_cascade_classifier = self._get_face_cascade_classifiers()[classifier_index]
+            return face_cascade_classifier.detectMultiScale(
                 gray_scaled_image_np,
                 scaleFactor=scale_factor,
                 minNeighbors=min_neighbors,
+                minSize=min_size,
+                maxSize=max_size,
             )
-            face_regions += list(faces)
 
-        return FaceRecognitionResult(face_regions, scale_factor, min_neighbors)
+        if parallel_cascades is None:
+            parallel_cascades = self.parallel_cascades
+        if parallel_cascades and len(classifier_indexes) > 1:
+            faces_per_classifier = self._get_executor().map(detect, classifier_indexes)
+        else:
+            faces_per_classifier = map(detect, classifier_indexes)
+
+        return np.concatenate([regions_to_array([])] + [regions_to_array(faces) for faces in faces_per_classifier])
+
+    def _get_face_cascade_classifiers(self) -> list[cv2.CascadeClassifier]:
+        """
+        Returns the face cascade classifiers of the current thread, loading them on first use.
+
+        Returns:
+            list[cv2.CascadeClassifier]: The face cascade classifiers to be used by the current thread only.
+        """
+        face_cascade_classifiers = getattr(self._thread_local, 'face_cascade_classifiers', None)
+        if not face_cascade_classifiers:
+            face_cascade_classifiers = self.face_classifiers_loader.load_cascade_classifiers()
+            self._thread_local.face_cascade_classifiers = face_cascade_classifiers
+        return face_cascade_classifiers
 
     def get_faces_images(self, image, regions_with_faces):
         """
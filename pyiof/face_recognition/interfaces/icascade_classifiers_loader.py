@@ -16,3 +16,15 @@ class ICascadeClassifiersLoader(ABC):
             FileNotFoundError: If a specified classifier file does not exist.
         """
         pass
+
+    def cache_identity(self) -> str:
+        """
+        Returns a stable identity of the cascade classifiers, used in the keys of cached face recognition
+        results, which depend on the classifiers. Two loaders with the same identity must load the same
+        classifiers. Implementations reading their classifiers from files should override it with the files and
+        their content.
+
+        Returns:
+            str: The identity of the cascade classifiers. By default, the class name.
+        """
+        return type(self).__name__
@@ -0,0 +1,178 @@
+from typing import Iterable, Iterator, Optional, Union
+
+import cv2
+import numpy as np
+
+from pyiof.face_recognition.face_recognizer import FaceRecognizer
+from pyiof.models.face_recognition_result import FaceRecognitionResult
+from pyiof.utils.regions_utils import merge_overlapping_regions, regions_to_array
+
+
+class VideoFaceRecognizer:
+    """
+    VideoFaceRecognizer detects faces in video files, camera streams or any sequence of frames.
+
+    Full-frame detection only runs on key frames: every `detection_interval` frames, or on a scene change.
+    On the other frames, faces are tracked by running detection only in
+    small regions of interest around the regions of the previous frame.
+
+    Attributes:
+        face_recognizer (FaceRecognizer): The face recognizer used for detection.
+        detection_interval (int): The number of frames between two full-frame detections.
+        scene_change_threshold (float): The mean absolute difference of gray levels between a frame and the
+                                        last key frame above which a full-frame detection runs.
+        tracking_margin (float): The margin added around the previous regions to search faces in the next
+                                 frame, relative to the region size.
+    """
+
+    # Size of the thumbnails compared to detect scene changes
+    SCENE_THUMBNAIL_SIZE = (64, 64)
+    # Intersection over union above which the regions tracked from previous faces are the same face
+    TRACKING_OVERLAP_THRESHOLD = 0.3
+
+    def __init__(self, face_recognizer: FaceRecognizer, detection_interval: int = 10,
+                 scene_change_threshold: float = 30.0, tracking_margin: float = 0.5):
+        """
+        Initializes the VideoFaceRecognizer.
+
+        Args:
+            face_recognizer (FaceRecognizer): The face recognizer used for detection.
+            detection_interval (int): The number of frames between two full-frame detections.
+            scene_change_threshold (float): The mean absolute difference of gray levels (0 to 255) between a
+                                            frame and the last key frame above which a full-frame detection runs.
+            tracking_margin (float): The margin added on each side of the previous regions to search faces in
+                                     the next frame, relative to the region size.
+        """
+        self.face_recognizer = face_recognizer
+        self.detection_interval = detection_interval
+        self.scene_change_threshold = scene_change_threshold
+        self.tracking_margin = tracking_margin
+
+    def get_faces_regions_from_video(self, video_source: Union[str, int], scale_factor: float = 1.05,
+                                     min_neighbors: int = 25, max_dimension: Optional[int] = None,
+                                     min_face_size: Optional[int] = None,
+                                     max_face_size: Optional[int] = None) -> Iterator[FaceRecognitionResult]:
+        """
+        Reads a video file or a camera stream with cv2.VideoCapture and detects faces on every frame.
+
+        Args:
+            video_source (Union[str, int]): The path or URL of the video, or the index of the camera.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            max_dimension (Optional[int]): The maximum width or height of the frames used for full-frame detection.
+            min_face_size (Optional[int]): The minimum face size in pixels of the frames.
+            max_face_size (Optional[int]): The maximum face size in pixels of the frames.
+
+        Returns:
+            Iterator[FaceRecognitionResult]: One result for each frame, with its frame index.
+
+        Raises:
+            OSError: If the video source cannot be opened.
+        """
+        video_capture = cv2.VideoCapture(video_source)
+        if not video_capture.isOpened():
+            raise OSError(f"Unable to open the video source: {video_source}")
+
+        def read_frames():
+            while True:
+                read, frame = video_capture.read()
+                if not read:
+                    return
+                yield frame
+
+        try:
+            yield from self.get_faces_regions_from_frames(read_frames(), scale_factor, min_neighbors,
+                                                          max_dimension, min_face_size, max_face_size)
+        finally:
+            video_capture.release()
+
+    def get_faces_regions_from_frames(self, frames: Iterable[np.ndarray], scale_factor: float = 1.05,
+                                      min_neighbors: int = 25, max_dimension: Optional[int] = None,
+                                      min_face_size: Optional[int] = None,
+                                      max_face_size: Optional[int] = None) -> Iterator[FaceRecognitionResult]:
+        """
+        Detects faces on every frame of a sequence of frames, tracking them between key frames.
+
+        Args:
+            frames (Iterable[ndarray]): The frames, as BGR (as read by OpenCV) or grayscale numpy arrays.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+            max_dimension (Optional[int]): The maximum width or height of the frames used for full-frame detection.
+            min_face_size (Optional[int]): The minimum face size in pixels of the frames.
+            max_face_size (Optional[int]): The maximum face size in pixels of the frames.
+
+        Returns:
+            Iterator[FaceRecognitionResult]: One result for each frame, with its frame index and the detection
+                                             scale of its last key frame.
+        """
+        key_frame_thumbnail = None
+        frames_since_key_frame = 0
+        face_regions = regions_to_array([])
+        detection_scale = 1.0
+
+        for frame_index, frame in enumerate(frames):
+            gray_frame = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            thumbnail = cv2.resize(gray_frame, self.SCENE_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+            is_key_frame = key_frame_thumbnail is None or frames_since_key_frame >= self.detection_interval or \
+                self._is_scene_change(key_frame_thumbnail, thumbnail)
+
+            if is_key_frame:
+                fr_result = self.face_recognizer.get_faces_regions_from_gray_array(
+                    gray_frame, scale_factor, min_neighbors, self.TRACKING_OVERLAP_THRESHOLD, max_dimension,
+                    min_face_size, max_face_size)
+                face_regions = fr_result.faces_regions
+                detection_scale = fr_result.detection_scale
+                key_frame_thumbnail = thumbnail
+                frames_since_key_frame = 0
+            else:
+                face_regions = self._track_faces(gray_frame, face_regions, scale_factor, min_neighbors)
+
+            frames_since_key_frame += 1
+            yield FaceRecognitionResult(face_regions, scale_factor, min_neighbors, self.TRACKING_OVERLAP_THRESHOLD,
+                                        detection_scale=detection_scale, frame_index=frame_index)
+
+    def _is_scene_change(self, key_frame_thumbnail: np.ndarray, thumbnail: np.ndarray) -> bool:
+        """
+        Checks if a frame belongs to a different scene than the last key frame.
+
+        Args:
+            key_frame_thumbnail (ndarray): The grayscale thumbnail of the last key frame.
+            thumbnail (ndarray): The grayscale thumbnail of the frame.
+
+        Returns:
+            bool: True if the mean absolute difference of the thumbnails is above the scene change threshold.
+        """
+        return float(np.mean(cv2.absdiff(key_frame_thumbnail, thumbnail))) > self.scene_change_threshold
+
+    def _track_faces(self, gray_frame: np.ndarray, previous_face_regions: np.ndarray,
+                     scale_factor: float, min_neighbors: int) -> np.ndarray:
+        """
+        Searches faces only in regions of interest around the faces of the previous frame, with face sizes
+        close to the previous ones. Faces that are not found again are dropped.
+
+        Args:
+            gray_frame (ndarray): The grayscale frame.
+            previous_face_regions (ndarray): The (N, 4) face regions of the previous frame.
+            scale_factor (float): The scale factor to adjust the image size during detection.
+            min_neighbors (int): The minimum number of neighbors each rectangle should have to retain it.
+
+        Returns:
+            ndarray: The (N, 4) face regions found in the frame.
+        """
+        height, width = gray_frame.shape[:2]
+        face_regions = [regions_to_array([])]
+
+        for x, y, region_width, region_height in previous_face_regions:
+            margin = int(max(region_width, region_height) * self.tracking_margin)
+            left, top = max(0, x - margin), max(0, y - margin)
+            right, bottom = min(width, x + region_width + margin), min(height, y + region_height + margin)
+
+            region_of_interest = gray_frame[top:bottom, left:right]
+            fr_result = self.face_recognizer.get_faces_regions_from_gray_array(
+                region_of_interest, scale_factor, min_neighbors,
+                min_face_size=int(min(region_width, region_height) * 0.7),
+                max_face_size=int(max(region_width, region_height) * 1.4))
+            face_regions.append(fr_result.faces_regions + np.array([left, top, 0, 0], dtype=np.int32))
+
+        return merge_overlapping_regions(np.concatenate(face_regions), self.TRACKING_OVERLAP_THRESHOLD)
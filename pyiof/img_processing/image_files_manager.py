@@ -1,6 +1,22 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Union
 from PIL import Image, UnidentifiedImageError
 import os
 
+from pyiof.models.image_load_result import ImageLoadResult
+from pyiof.utils.concurrency_utils import bounded_imap, run_in_executor
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+# PDF page sizes are given in points, 72 per inch
+PDF_POINTS_PER_INCH = 72
+# Default resolution of rendered PDF pages, the usual resolution of scans for OCR
+DEFAULT_DOCUMENT_DPI = 300
+
 
 class ImageFilesManager:
     def __init__(self):
@@ -8,12 +24,21 @@ class ImageFilesManager:
         self.supported_load_formats = self._load_supported_load_formats()
 
     @staticmethod
-    def load_image(image_source: str) -> Image:
+    def load_image(image_source: str, mode: Optional[str] = None, max_size: Optional[int] = None) -> Image:
         """
         Loads an image from the specified source path.
 
+        Without options, the image is opened lazily and its pixels are decoded on first use. With a mode or
+        a maximum size, only what is needed is decoded: JPEG images are decoded straight to grayscale and
+        downscaled by up to 8 while decoding (Image.draft), and other images are downscaled by an integer
+        factor (Image.reduce) before being resized to the final size.
+
         Parameters:
             image_source (str): The file path of the image to be loaded.
+            mode (Optional[str]): The PIL mode of the loaded image, for example "L" for grayscale. If None,
+                                  the mode of the file is kept.
+            max_size (Optional[int]): The maximum width and height of the loaded image. Larger images are
+                                      downscaled, keeping their aspect ratio. If None, the full size is kept.
 
         Returns:
             Image: An Image object loaded from the specified file path.
@@ -24,13 +49,269 @@ class ImageFilesManager:
             OSError: For other types of OS-related errors.
         """
         try:
-            return Image.open(image_source)
+            image = Image.open(image_source)
+            if mode is not None or max_size is not None:
+                image = ImageFilesManager._decode_image(image, mode, max_size)
+            return image
         except FileNotFoundError as e:
             raise FileNotFoundError(f"File does not exist: {image_source}") from e
         except UnidentifiedImageError as e:
             raise UnidentifiedImageError(f"File is not a valid image: {image_source}") from e
         except OSError as e:
             raise OSError(f"An error occurred while trying to open the image: {image_source}") from e
+        except ValueError as e:
+            # Raised by Pillow for image modes an operation does not support
+            raise OSError(f"An error occurred while trying to decode the image: {image_source}") from e
+
+    @staticmethod
+    async def load_image_async(image_source: str, mode: Optional[str] = None, max_size: Optional[int] = None,
+                               executor: Optional[Executor] = None,
+                               semaphore: Optional[asyncio.Semaphore] = None) -> Image:
+        """
+        Loads an image like load_image, on the executor, without blocking the event loop. The pixels are
+        decoded on the executor too, so using the image does not block the event loop. See load_image for
+        the description of the options.
+
+        Parameters:
+            image_source (str): The file path of the image to be loaded.
+            mode (Optional[str]): The PIL mode of the loaded image. If None, the mode of the file is kept.
+            max_size (Optional[int]): The maximum width and height of the loaded image. If None, the full
+                                      size is kept.
+            executor (Optional[Executor]): The executor reading and decoding the image. If None, the default
+                                           executor of the event loop is used.
+            semaphore (Optional[asyncio.Semaphore]): A semaphore limiting the number of images being loaded at
+                                                     the same time. If None, the executor is the only limit.
+
+        Returns:
+            Image: An Image object loaded from the specified file path, with its pixels decoded.
+
+        Raises:
+            FileNotFoundError: If the specified file does not exist.
+            UnidentifiedImageError: If the file is not a valid image or cannot be recognized.
+            OSError: For other types of OS-related errors.
+        """
+        load_result = await run_in_executor(ImageFilesManager._load_decoded_image, image_source, mode, max_size,
+                                            executor=executor, semaphore=semaphore)
+        if load_result.error is not None:
+            raise load_result.error
+        return load_result.image
+
+    @staticmethod
+    def _decode_image(image: Image, mode: Optional[str], max_size: Optional[int]) -> Image:
+        """
+        Private method to decode an opened image in the given mode and downscaled to fit the given size.
+
+        Parameters:
+            image (Image): The opened image, not decoded yet.
+            mode (Optional[str]): The PIL mode of the decoded image. If None, the mode of the image is kept.
+            max_size (Optional[int]): The maximum width and height of the decoded image. If None, the
+                                      full size is kept.
+
+        Returns:
+            Image: The decoded image.
+        """
+        target_size = image.size
+        if max_size is not None and max(image.size) > max_size:
+            scale = max_size / max(image.size)
+            target_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+
+        # JPEG images are decoded in the mode, at the smallest DCT scale not smaller than the target size.
+        # Other formats ignore it.
+        image.draft(mode, target_size if target_size != image.size else None)
+
+        # Converting first makes the image smaller when the mode has fewer channels. Bilevel and palette modes
+        # are converted last, since they can not be resized smoothly.
+        file_mode = image.mode
+        if mode is not None and mode not in ('1', 'P') and image.mode != mode:
+            image = image.convert(mode)
+        if image.mode.startswith('I;16') and image.size != target_size:
+            # 16 bits images can only be reduced and resized as 32 bits images
+            image = image.convert('I')
+
+        factor = min(image.width // target_size[0], image.height // target_size[1])
+        if factor >= 2 and image.mode not in ('1', 'P'):
+            image = image.reduce(factor)
+        if image.size != target_size:
+            # Bilevel and palette images keep their mode, with nearest neighbor resampling
+            resample = Image.NEAREST if image.mode in ('1', 'P') else Image.BICUBIC
+            image = image.resize(target_size, resample)
+        mode = mode or file_mode
+        if image.mode != mode:
+            image = image.convert(mode)
+        return image
+
+    def iter_images(self, images_source: Union[str, Iterable[str]], mode: Optional[str] = None,
+                    max_size: Optional[int] = None, recursive: bool = False, max_workers: int = 4,
+                    prefetch: Optional[int] = None) -> Iterator[ImageLoadResult]:
+        """
+        Loads the images of a directory, or of a list of file paths, ahead of the caller on a thread pool.
+
+        Files whose extension is not in `supported_load_formats` are skipped. Up to `prefetch` images are
+        loaded and decoded in the background while the caller processes the previous ones. A file that can
+        not be loaded does not stop the iteration: its result has the error instead of the image.
+
+        Parameters:
+            images_source (Union[str, Iterable[str]]): A directory path, or the file paths of the images. The
+                                                      paths are read lazily, so it can be a generator.
+            mode (Optional[str]): The PIL mode of the loaded images (see load_image).
+            max_size (Optional[int]): The maximum width and height of the loaded images (see load_image).
+            recursive (bool): Whether the subdirectories of a directory are also walked.
+            max_workers (int): The number of threads loading images.
+            prefetch (Optional[int]): The maximum number of images loaded ahead of the caller. If None, twice
+                                      the number of threads is used.
+
+        Returns:
+            Iterator[ImageLoadResult]: The load result of every image, in the order of the paths. Directories
+                                       are walked in file name order.
+
+        Raises:
+            FileNotFoundError: If images_source is a path that is not a directory.
+        """
+        if isinstance(images_source, (str, os.PathLike)):
+            paths = self._walk_directory(str(images_source), recursive)
+        else:
+            paths = (str(path) for path in images_source)
+        paths = (path for path in paths if os.path.splitext(path)[1].lower() in self.supported_load_formats)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for path, future in bounded_imap(executor, lambda path: self._load_decoded_image(path, mode, max_size),
+                                             paths, prefetch or 2 * max_workers):
+                yield future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _walk_directory(directory: str, recursive: bool) -> Iterator[str]:
+        """
+        Private method to list the file paths of a directory, in file name order.
+
+        Parameters:
+            directory (str): The directory path.
+            recursive (bool): Whether the files of the subdirectories are also listed.
+
+        Returns:
+            Iterator[str]: The file paths.
+
+        Raises:
+            FileNotFoundError: If the directory does not exist or is not a directory.
+        """
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Directory does not exist: {directory}")
+
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if entry.is_dir():
+                if recursive:
+                    yield from ImageFilesManager._walk_directory(entry.path, recursive)
+            else:
+                yield entry.path
+
+    @staticmethod
+    def _load_decoded_image(path: str, mode: Optional[str], max_size: Optional[int]) -> ImageLoadResult:
+        """
+        Private method to load and decode an image, returning the error instead of raising it.
+
+        Parameters:
+            path (str): The file path of the image.
+            mode (Optional[str]): The PIL mode of the loaded image.
+            max_size (Optional[int]): The maximum width and height of the loaded image.
+
+        Returns:
+            ImageLoadResult: The loaded image, or the error raised while loading it.
+        """
+        try:
+            image = ImageFilesManager.load_image(path, mode, max_size)
+            image.load()
+            return ImageLoadResult(path, image)
+        except Exception as e:
+            return ImageLoadResult(path, error=e)
+
+    @staticmethod
+    def iter_document_pages(document_path: str, dpi: int = DEFAULT_DOCUMENT_DPI,
+                            mode: Optional[str] = None) -> Iterator[Image]:
+        """
+        Loads the pages of a multi-page document one at a time, so the whole document is never decoded in memory.
+
+        PDF files are rendered page by page at the given resolution with pypdfium2. Other files, like multi-page
+        TIFF files, are read by seeking from frame to frame, and Pillow memory-maps uncompressed frames. Single
+        image files give one page.
+
+        Parameters:
+            document_path (str): The file path of the document.
+            dpi (int): The resolution, in dots per inch, at which PDF pages are rendered.
+            mode (Optional[str]): The PIL mode of the pages, for example "L" for grayscale. If None, PDF pages
+                                  are RGB and frames keep the mode of the file.
+
+        Returns:
+            Iterator[Image]: The pages, in document order. Each page is an independent image.
+
+        Raises:
+            ImportError: If the document is a PDF file and pypdfium2 is not installed.
+            FileNotFoundError: If the specified file does not exist.
+            UnidentifiedImageError: If the file is not a valid image or cannot be recognized.
+            OSError: For other types of OS-related errors.
+        """
+        if os.path.splitext(document_path)[1].lower() == '.pdf':
+            return ImageFilesManager._iter_pdf_pages(document_path, dpi, mode)
+        return ImageFilesManager._iter_image_frames(document_path, mode)
+
+    @staticmethod
+    def _iter_image_frames(image_source: str, mode: Optional[str]) -> Iterator[Image]:
+        """
+        Private method to load the frames of an image file one at a time.
+
+        Parameters:
+            image_source (str): The file path of the image.
+            mode (Optional[str]): The PIL mode of the frames. If None, the mode of the file is kept.
+
+        Returns:
+            Iterator[Image]: The frames, in file order.
+        """
+        with ImageFilesManager.load_image(image_source) as image:
+            for frame_index in range(getattr(image, 'n_frames', 1)):
+                image.seek(frame_index)
+                yield image.convert(mode) if mode is not None else image.copy()
+
+    @staticmethod
+    def _iter_pdf_pages(pdf_path: str, dpi: int, mode: Optional[str]) -> Iterator[Image]:
+        """
+        Private method to render the pages of a PDF file one at a time.
+
+        Parameters:
+            pdf_path (str): The file path of the PDF document.
+            dpi (int): The resolution, in dots per inch, at which pages are rendered.
+            mode (Optional[str]): The PIL mode of the pages. If None, pages are RGB.
+
+        Returns:
+            Iterator[Image]: The pages, in document order.
+
+        Raises:
+            ImportError: If pypdfium2 is not installed.
+            FileNotFoundError: If the specified file does not exist.
+            OSError: If the file is not a valid PDF document.
+        """
+        if pypdfium2 is None:
+            raise ImportError("pypdfium2 is required to load PDF documents. Install it with 'pip install pypdfium2'.")
+        if not os.path.isfile(pdf_path):
+            raise FileNotFoundError(f"File does not exist: {pdf_path}")
+
+        try:
+            pdf = pypdfium2.PdfDocument(pdf_path)
+        except pypdfium2.PdfiumError as e:
+            raise OSError(f"An error occurred while trying to open the PDF document: {pdf_path}") from e
+
+        try:
+            for page_index in range(len(pdf)):
+                page = pdf[page_index]
+                try:
+                    bitmap = page.render(scale=dpi / PDF_POINTS_PER_INCH, grayscale=mode in ('L', '1'))
+                    # The bitmap buffer is released with the page, so the image is copied out of it
+                    image = bitmap.to_pil().copy()
+                finally:
+                    page.close()
+                yield image.convert(mode or 'RGB') if image.mode != (mode or 'RGB') else image
+        finally:
+            pdf.close()
 
     @staticmethod
     def save_image(image: Image, path: str):
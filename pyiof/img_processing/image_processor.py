@@ -1,9 +1,33 @@
-from PIL import Image, ImageDraw
-from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor
+from functools import lru_cache
+from typing import Iterable
+from PIL import Image, ImageColor, ImageDraw
+from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor, ImageLike
+from pyiof.utils.regions_utils import sort_regions_in_reading_order
+import cv2
 import numpy as np
 
 from cv2.typing import Rect
 
+# PIL modes of numpy arrays by number of channels, used to draw with the same colors as on PIL Images
+_ARRAY_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+
+@lru_cache(maxsize=256)
+def _binarization_lut(threshold: int) -> np.ndarray:
+    """
+    Returns the 256 entries lookup table that maps grayscale values to 255 if they are greater
+    than or equal to the threshold, and to 0 otherwise.
+
+    Parameters:
+        threshold (int): The threshold value used for binarization.
+
+    Returns:
+        ndarray: A read-only uint8 array with 256 entries.
+    """
+    lut = np.where(np.arange(256) >= threshold, 255, 0).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
 
 class ImageProcessor(IImageProcessor):
     """
@@ -11,58 +35,283 @@ class ImageProcessor(IImageProcessor):
     grayscale, binarizing images, converting images to numpy arrays, cropping
     images from specified regions, and drawing rectangles on images.
 
+    Every method accepts PIL Images or numpy arrays (RGB, RGBA or grayscale, as given by
+    `np.asarray` on a PIL Image) and returns results of the same kind, so a pipeline working on
+    numpy arrays never converts back to PIL.
+
     Inherits from IImageProcessor interface.
     """
 
-    def grayscale_image(self, image: Image) -> Image:
+    def grayscale_image(self, image: ImageLike) -> ImageLike:
+        """
+        Converts the given image to grayscale. Numpy arrays are converted with OpenCV, and grayscale
+        arrays are returned as they are.
+
+        Parameters:
+            image (ImageLike): The image to be converted to grayscale.
+
+        Returns:
+            ImageLike: The grayscale version of the image.
+        """
+        if not isinstance(image, np.ndarray):
+            return image.convert("L")
+
+        if image.ndim == 2:
+            return image
+        if image.shape[2] == 1:
+            return image[:, :, 0]
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+    def _get_grayscale_array(self, image: ImageLike) -> np.ndarray:
         """
-        Converts the given image to grayscale.
+        Returns the grayscale version of the image as a numpy array, without copying grayscale arrays.
 
         Parameters:
-            image (Image): The image to be converted to grayscale.
+            image (ImageLike): The image to be converted.
 
         Returns:
-            Image: The grayscale version of the image.
+            ndarray: The grayscale image as a 2D numpy array.
         """
-        return image.convert("L")
+        if isinstance(image, np.ndarray):
+            return self.grayscale_image(image)
+        grayscale = self.grayscale_image(image) if image.mode != "L" else image
+        return np.asarray(grayscale)
 
-    def binarize_image(self, image: Image, threshold: int) -> Image:
+    def binarize_image(self, image: ImageLike, threshold: int) -> ImageLike:
         """
         Converts the given image to a binary image based on the specified threshold.
 
         Parameters:
-            image (Image): The image to be converted.
+            image (ImageLike): The image to be converted.
             threshold (int): The threshold value used for binarization.
 
         Returns:
-            Image: The binarized image.
+            ImageLike: The binarized image.
         """
+        if isinstance(image, np.ndarray):
+            return _binarization_lut(threshold)[self._get_grayscale_array(image)]
+
         grayscale = self.grayscale_image(image) if image.mode != "L" else image
-        result = grayscale.point(lambda x: 255 if x >= threshold else 0)
-        return result
+        return grayscale.point(_binarization_lut(threshold).tolist())
+
+    def binarize_images(self, image: ImageLike, thresholds: Iterable[int]) -> list[ImageLike]:
+        """
+        Converts the given image to one binary image for each of the specified thresholds. The grayscale
+        image is read once and all the binary images are computed in a single lookup table pass.
+
+        Parameters:
+            image (ImageLike): The image to be converted.
+            thresholds (Iterable[int]): The threshold values used for binarization.
+
+        Returns:
+            list[ImageLike]: The binarized images, in the order of the thresholds.
+        """
+        thresholds = list(thresholds)
+        if not thresholds:
+            return []
+
+        luts = np.stack([_binarization_lut(threshold) for threshold in thresholds])
+        binarized_arrays = np.take(luts, self._get_grayscale_array(image), axis=1)
+        if isinstance(image, np.ndarray):
+            return list(binarized_arrays)
+        return [Image.fromarray(binarized_array) for binarized_array in binarized_arrays]
+
+    @staticmethod
+    def _get_local_means_and_stds(grayscale_array: np.ndarray, window_size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the mean and the standard deviation of the square neighborhood of every pixel, from the
+        integral images of the pixels and of their squares. Neighborhoods are clipped at the image borders.
+
+        Parameters:
+            grayscale_array (ndarray): The grayscale image.
+            window_size (int): The odd size, in pixels, of the neighborhoods.
+
+        Returns:
+            tuple[ndarray, ndarray]: The float64 local means and standard deviations.
+        """
+        sums, squared_sums = cv2.integral2(grayscale_array, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+        height, width = grayscale_array.shape
+        radius = window_size // 2
+        # Integral image rows and columns of the window corners of every pixel, clipped at the borders, so
+        # the window sums are differences of shifted slices
+        corner_rows = np.clip(np.arange(-radius, height + radius + 1), 0, height)
+        corner_columns = np.clip(np.arange(-radius, width + radius + 1), 0, width)
+        areas = np.outer(corner_rows[window_size:] - corner_rows[:height],
+                         corner_columns[window_size:] - corner_columns[:width])
+
+        def get_window_sums(integral: np.ndarray) -> np.ndarray:
+            corner_rows_integral = integral[corner_rows]
+            rows_sums = np.take(corner_rows_integral[window_size:] - corner_rows_integral[:height],
+                                corner_columns, axis=1)
+            return rows_sums[:, window_size:] - rows_sums[:, :width]
+
+        means = get_window_sums(sums) / areas
+        variances = get_window_sums(squared_sums) / areas - means ** 2
+        return means, np.sqrt(np.maximum(variances, 0))
+
+    def get_histogram_thresholds(self, image: ImageLike, max_thresholds: int = 2) -> list[int]:
+        """
+        Computes candidate binarization thresholds from the grayscale histogram of the image: the Otsu
+        threshold, and the deepest valley between the two main peaks of the smoothed histogram.
+
+        Parameters:
+            image (ImageLike): The image whose thresholds are to be computed.
+            max_thresholds (int): The maximum number of thresholds to return.
 
-    def convert_pil_image_to_np_array(self, pil_image: Image):
+        Returns:
+            list[int]: The candidate thresholds, the Otsu threshold first. Candidates closer than 8 gray
+                       levels to a previous one are dropped.
+        """
+        histogram = np.bincount(self._get_grayscale_array(image).ravel(), minlength=256).astype(np.float64)
+
+        candidates = [self._get_otsu_threshold(histogram)]
+        valley_threshold = self._get_valley_threshold(histogram)
+        if valley_threshold is not None:
+            candidates.append(valley_threshold)
+
+        thresholds = []
+        for candidate in candidates:
+            if all(abs(candidate - threshold) >= 8 for threshold in thresholds):
+                thresholds.append(candidate)
+        return thresholds[:max_thresholds]
+
+    @staticmethod
+    def _get_otsu_threshold(histogram: np.ndarray) -> int:
+        """
+        Computes the threshold that maximizes the between-class variance of the histogram (Otsu's method).
+
+        Parameters:
+            histogram (ndarray): The 256 bins grayscale histogram.
+
+        Returns:
+            int: The threshold, so that gray values greater than or equal to it belong to the bright class.
+        """
+        probabilities = histogram / histogram.sum()
+        class_probabilities = np.cumsum(probabilities)
+        class_means = np.cumsum(probabilities * np.arange(256))
+        total_mean = class_means[-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            between_class_variance = (total_mean * class_probabilities - class_means) ** 2 / \
+                                     (class_probabilities * (1 - class_probabilities))
+        between_class_variance = np.nan_to_num(between_class_variance, nan=0, posinf=0)
+        return int(np.argmax(between_class_variance)) + 1
+
+    @staticmethod
+    def _get_valley_threshold(histogram: np.ndarray, window: int = 9, min_peaks_distance: int = 16):
+        """
+        Computes the threshold at the deepest valley between the two highest peaks of the smoothed histogram.
+
+        Parameters:
+            histogram (ndarray): The 256 bins grayscale histogram.
+            window (int): The size of the moving average used to smooth the histogram.
+            min_peaks_distance (int): The minimum distance between the two peaks.
+
+        Returns:
+            Optional[int]: The threshold, or None if the histogram does not have two separated peaks.
+        """
+        smoothed = np.convolve(histogram, np.ones(window) / window, mode='same')
+        padded = np.pad(smoothed, 1, constant_values=-1)
+        peaks = np.flatnonzero((smoothed > padded[:-2]) & (smoothed >= padded[2:]))
+        if len(peaks) < 2:
+            return None
+
+        peaks = peaks[np.argsort(smoothed[peaks])[::-1]]
+        highest_peak = peaks[0]
+        separated_peaks = peaks[np.abs(peaks - highest_peak) >= min_peaks_distance]
+        if not len(separated_peaks):
+            return None
+
+        low_peak, high_peak = sorted((highest_peak, separated_peaks[0]))
+        return int(low_peak + np.argmin(smoothed[low_peak:high_peak + 1])) + 1
+
+    def get_text_regions(self, image: ImageLike, min_size: int = 8, merge_distance: int = 16) -> np.ndarray:
+        """
+        Finds the candidate text regions of the image with morphological operations. Character strokes have a
+        strong local contrast, so the morphological gradient of the grayscale image is binarized (Otsu), and
+        closed with a square kernel of merge_distance size, which joins the characters into words, lines and
+        paragraphs. Overlapping bounding boxes of the resulting blobs are merged, and the regions are padded
+        with a margin of a quarter of merge_distance, since OCR engines expect some background around text.
+
+        Parameters:
+            image (ImageLike): The image in which to find text regions.
+            min_size (int): The minimum width and height of a region. Smaller regions are dropped.
+            merge_distance (int): The distance in pixels under which characters and lines are merged into the
+                                  same region.
+
+        Returns:
+            ndarray: An int32 array of shape (N, 4) with the regions, as (x, y, width, height), in reading order.
+        """
+        grayscale_array = self._get_grayscale_array(image)
+        gradient = cv2.morphologyEx(grayscale_array, cv2.MORPH_GRADIENT,
+                                    cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+        _, text_mask = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (merge_distance, merge_distance))
+        text_mask = cv2.morphologyEx(text_mask, cv2.MORPH_CLOSE, kernel)
+
+        regions = self._get_merged_bounding_rects(text_mask)
+        regions = [region for region in regions if region[2] >= min_size and region[3] >= min_size]
+
+        margin = merge_distance // 4
+        image_height, image_width = grayscale_array.shape
+        padded_regions = []
+        for (x, y, width, height) in regions:
+            left, upper = max(x - margin, 0), max(y - margin, 0)
+            right, lower = min(x + width + margin, image_width), min(y + height + margin, image_height)
+            padded_regions.append((left, upper, right - left, lower - upper))
+        return sort_regions_in_reading_order(padded_regions)
+
+    @staticmethod
+    def _get_merged_bounding_rects(mask: np.ndarray) -> list[Rect]:
+        """
+        Computes the bounding rectangles of the blobs of a mask, merging the rectangles that overlap.
+
+        Parameters:
+            mask (ndarray): The uint8 mask, with the blobs as non-zero pixels.
+
+        Returns:
+            list[Rect]: The merged bounding rectangles, as (x, y, width, height) tuples.
         """
-        Converts a PIL image to a numpy array.
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        rects = [cv2.boundingRect(contour) for contour in contours]
+        while True:
+            # Filling the rectangles joins the overlapping ones into a single blob
+            rects_mask = np.zeros_like(mask)
+            for (x, y, width, height) in rects:
+                rects_mask[y:y + height, x:x + width] = 255
+            contours, _ = cv2.findContours(rects_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if len(contours) == len(rects):
+                return rects
+            rects = [cv2.boundingRect(contour) for contour in contours]
+
+    def convert_pil_image_to_np_array(self, pil_image: ImageLike) -> np.ndarray:
+        """
+        Converts a PIL image to a numpy array. Numpy arrays are returned as they are, without a copy.
 
         Parameters:
-            pil_image (Image): The PIL Image object to be converted.
+            pil_image (ImageLike): The PIL Image object to be converted.
 
         Returns:
-            ndarray: The image as a numpy array.
+            ndarray: The image as a writable numpy array.
         """
+        if isinstance(pil_image, np.ndarray):
+            return pil_image
         return np.array(pil_image)
 
-    def get_images_from_regions(self, regions: list[Rect], image: Image) -> list[Image]:
+    def get_images_from_regions(self, regions: list[Rect], image: ImageLike) -> list[ImageLike]:
         """
-        Crops the image based on the specified regions and returns the cropped images.
+        Crops the image based on the specified regions and returns the cropped images. Numpy arrays are
+        cropped as slices, which are views of the image (no copy).
 
         Parameters:
             regions (list[Rect]): A list of rectangles defining the regions to be cropped.
-            image (Image): The image from which regions are to be cropped.
+            image (ImageLike): The image from which regions are to be cropped.
 
         Returns:
-            list[Image]: A list of cropped images.
+            list[ImageLike]: A list of cropped images.
         """
         cropped_images = []
 
@@ -72,35 +321,47 @@ class ImageProcessor(IImageProcessor):
             right = x + width
             lower = y + height
 
-            cropped_image = image.crop((left, upper, right, lower))
+            if isinstance(image, np.ndarray):
+                cropped_image = image[max(upper, 0):lower, max(left, 0):right]
+            else:
+                cropped_image = image.crop((left, upper, right, lower))
             cropped_images.append(cropped_image)
         return cropped_images
 
-    def draw_rectangles_on_image(self, image: Image, regions: list[Rect]) -> Image:
+    def draw_rectangles_on_image(self, image: ImageLike, regions: list[Rect]) -> ImageLike:
         """
-        Draws rectangles on the image as specified by the regions.
+        Draws rectangles on the image as specified by the regions. Numpy arrays are drawn on in place with
+        OpenCV, so they must be writable.
 
         Parameters:
-            image (Image): The image on which to draw rectangles.
+            image (ImageLike): The image on which to draw rectangles.
             regions (list[Rect]): A list of rectangles defining the regions where rectangles are to be drawn.
 
         Returns:
-            Image: The image with rectangles drawn on it.
+            ImageLike: The image with rectangles drawn on it.
         """
+        if isinstance(image, np.ndarray):
+            color = ImageColor.getcolor("red", _ARRAY_MODES[1 if image.ndim == 2 else image.shape[2]])
+            for (x, y, width, height) in regions:
+                cv2.rectangle(image, (int(x), int(y)), (int(x + width), int(y + height)), color, 2)
+            return image
+
         draw = ImageDraw.Draw(image)
         for (x, y, width, height) in regions:
             right, lower = x + width, y + height
             draw.rectangle((x, y, right, lower), outline="red", width=2)
         return image
 
-    def get_image_dimensions(self, image: Image):
+    def get_image_dimensions(self, image: ImageLike):
         """
         Retrieves the dimensions of the given image.
 
         Parameters:
-            image (Image): The image whose dimensions are to be retrieved.
+            image (ImageLike): The image whose dimensions are to be retrieved.
 
         Returns:
             tuple[int, int]: A tuple containing the width and height of the image.
         """
+        if isinstance(image, np.ndarray):
+            return image.shape[1], image.shape[0]
         return image.size
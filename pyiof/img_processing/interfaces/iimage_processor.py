@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Union
+
+import cv2
+import numpy as np
 from PIL import Image
 from cv2.typing import Rect
 
+# Images can be PIL Images or numpy arrays (RGB, RGBA or grayscale)
+ImageLike = Union[Image.Image, np.ndarray]
+
 
 class IImageProcessor(ABC):
     """
@@ -10,43 +17,173 @@ class IImageProcessor(ABC):
     This interface defines the methods for common image processing tasks
     such as converting images to grayscale, binarizing images, converting images
     to numpy arrays, cropping images from specified regions, and drawing rectangles
-    on images.
+    on images. Images can be PIL Images or numpy arrays, and results are of the same
+    kind as the given image.
     """
 
+    ADAPTIVE_METHODS = ('sauvola', 'niblack')
+    # Default k parameters of the local thresholding methods, and the dynamic range of the standard
+    # deviation used by Sauvola's method
+    _ADAPTIVE_DEFAULT_K = {'sauvola': 0.2, 'niblack': -0.2}
+    _SAUVOLA_DYNAMIC_RANGE = 128.0
+
     @abstractmethod
-    def grayscale_image(self, image: Image) -> Image:
+    def grayscale_image(self, image: ImageLike) -> ImageLike:
         """
         Converts the given image to grayscale.
 
         Parameters:
-            image (Image): The image to be converted.
+            image (ImageLike): The image to be converted.
 
         Returns:
-            Image: The grayscale version of the image.
+            ImageLike: The grayscale version of the image.
         """
         pass
 
     @abstractmethod
-    def binarize_image(self, image: Image, threshold: int) -> Image:
+    def binarize_image(self, image: ImageLike, threshold: int) -> ImageLike:
         """
         Converts the given image to a binary image using the specified threshold.
 
         Parameters:
-           image (Image): The image to be converted.
+           image (ImageLike): The image to be converted.
            threshold (int): The threshold value for binarization.
 
         Returns:
-           Image: The binarized image.
+           ImageLike: The binarized image.
        """
         pass
 
+    def binarize_images(self, image: ImageLike, thresholds: Iterable[int]) -> list[ImageLike]:
+        """
+        Converts the given image to one binary image for each of the specified thresholds. The default
+        implementation calls binarize_image for every threshold.
+
+        Parameters:
+            image (ImageLike): The image to be converted.
+            thresholds (Iterable[int]): The threshold values for binarization.
+
+        Returns:
+            list[ImageLike]: The binarized images, in the order of the thresholds.
+        """
+        return [self.binarize_image(image, threshold) for threshold in thresholds]
+
+    def binarize_image_adaptive(self, image: ImageLike, method: str = 'sauvola', window_size: int = 25,
+                                k: Optional[float] = None) -> ImageLike:
+        """
+        Converts the given image to a binary image with a local threshold for every pixel, computed from the
+        mean m and the standard deviation s of its window_size x window_size neighborhood (see
+        _get_local_means_and_stds), so uneven lighting like shadows and gradients does not spoil the result.
+        Pixels brighter than their threshold become white.
+
+        'sauvola' uses m * (1 + k * (s / 128 - 1)), with k = 0.2 by default, and is robust to dark and noisy
+        backgrounds. 'niblack' uses m + k * s, with k = -0.2 by default.
+
+        Parameters:
+            image (ImageLike): The image to be converted.
+            method (str): The local thresholding method, 'sauvola' or 'niblack'.
+            window_size (int): The odd size, in pixels, of the square neighborhood of every pixel. It should be
+                               larger than the characters stroke width, about a character height.
+            k (Optional[float]): The sensitivity parameter of the method. If None, the method default is used.
+
+        Returns:
+            ImageLike: The binarized image.
+
+        Raises:
+            ValueError: If the method is not supported or the window size is not an odd number larger than 1.
+        """
+        if method not in self.ADAPTIVE_METHODS:
+            raise ValueError(f"Unsupported adaptive binarization method '{method}'. "
+                             f"Supported methods: {self.ADAPTIVE_METHODS}")
+        if window_size < 3 or window_size % 2 == 0:
+            raise ValueError(f"The window size must be an odd number larger than 1, got {window_size}")
+        if k is None:
+            k = self._ADAPTIVE_DEFAULT_K[method]
+
+        grayscale_array = self._get_grayscale_array(image)
+        means, stds = self._get_local_means_and_stds(grayscale_array, window_size)
+        if method == 'sauvola':
+            thresholds = means * (1 + k * (stds / self._SAUVOLA_DYNAMIC_RANGE - 1))
+        else:
+            thresholds = means + k * stds
+
+        binarized_array = np.where(grayscale_array > thresholds, 255, 0).astype(np.uint8)
+        if isinstance(image, np.ndarray):
+            return binarized_array
+        return Image.fromarray(binarized_array)
+
+    def _get_local_means_and_stds(self, grayscale_array: np.ndarray,
+                                  window_size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the mean and the standard deviation of the square neighborhood of every pixel. The default
+        implementation uses OpenCV box filters, with the image borders reflected.
+
+        Parameters:
+            grayscale_array (ndarray): The grayscale image.
+            window_size (int): The odd size, in pixels, of the neighborhoods.
+
+        Returns:
+            tuple[ndarray, ndarray]: The float64 local means and standard deviations.
+        """
+        pixels = grayscale_array.astype(np.float64)
+        means = cv2.boxFilter(pixels, -1, (window_size, window_size), borderType=cv2.BORDER_REFLECT)
+        squared_means = cv2.boxFilter(pixels ** 2, -1, (window_size, window_size), borderType=cv2.BORDER_REFLECT)
+        return means, np.sqrt(np.maximum(squared_means - means ** 2, 0))
+
+    def get_histogram_thresholds(self, image: ImageLike, max_thresholds: int = 2) -> list[int]:
+        """
+        Computes candidate binarization thresholds from the grayscale histogram of the given image. The default
+        implementation only returns the Otsu threshold.
+
+        Parameters:
+            image (ImageLike): The image whose thresholds are to be computed.
+            max_thresholds (int): The maximum number of thresholds to return.
+
+        Returns:
+            list[int]: The candidate thresholds, the most likely first.
+        """
+        otsu_threshold, _ = cv2.threshold(self._get_grayscale_array(image), 0, 255,
+                                          cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        # OpenCV whitens the gray values greater than its threshold, binarize_image those greater than or equal
+        return [int(otsu_threshold) + 1][:max_thresholds]
+
+    def get_text_regions(self, image: ImageLike, min_size: int = 8, merge_distance: int = 16) -> np.ndarray:
+        """
+        Finds the candidate text regions of the given image. The default implementation does not look for text
+        and returns the whole image as a single region.
+
+        Parameters:
+            image (ImageLike): The image in which to find text regions.
+            min_size (int): The minimum width and height of a region.
+            merge_distance (int): The distance in pixels under which characters are merged into the same region.
+
+        Returns:
+            ndarray: An int32 array of shape (N, 4) with the regions, as (x, y, width, height), in reading order.
+        """
+        width, height = self.get_image_dimensions(image)
+        if width < min_size or height < min_size:
+            return np.empty((0, 4), dtype=np.int32)
+        return np.array([(0, 0, width, height)], dtype=np.int32)
+
+    def _get_grayscale_array(self, image: ImageLike) -> np.ndarray:
+        """
+        Returns the grayscale version of the given image as a uint8 numpy array.
+
+        Parameters:
+            image (ImageLike): The image to be converted.
+
+        Returns:
+            ndarray: The grayscale image as a 2D numpy array.
+        """
+        return np.asarray(self.convert_pil_image_to_np_array(self.grayscale_image(image)), dtype=np.uint8)
+
     @abstractmethod
-    def convert_pil_image_to_np_array(self, pil_image: Image):
+    def convert_pil_image_to_np_array(self, pil_image: ImageLike):
         """
-        Converts a PIL image to a numpy array.
+        Converts a PIL image to a numpy array. Numpy arrays are returned as they are.
 
         Parameters:
-            pil_image (Image): The PIL Image object to convert.
+            pil_image (ImageLike): The PIL Image object to convert.
 
         Returns:
             numpy.ndarray: The image as a numpy array.
@@ -54,40 +191,40 @@ class IImageProcessor(ABC):
         pass
 
     @abstractmethod
-    def get_images_from_regions(self, regions: list[Rect], image: Image) -> list[Image]:
+    def get_images_from_regions(self, regions: list[Rect], image: ImageLike) -> list[ImageLike]:
         """
         Crops the given image into multiple images based on the specified regions.
 
         Parameters:
             regions (List[Rect]): A list of regions (as x, y, width, height tuples) to crop the image.
-            image (Image): The image from which regions will be cropped.
+            image (ImageLike): The image from which regions will be cropped.
 
         Returns:
-            List[Image]: A list of cropped images.
+            List[ImageLike]: A list of cropped images.
         """
         pass
 
     @abstractmethod
-    def draw_rectangles_on_image(self, image: Image, regions: list[Rect]) -> Image:
+    def draw_rectangles_on_image(self, image: ImageLike, regions: list[Rect]) -> ImageLike:
         """
         Draws rectangles on the given image as specified by the regions.
 
         Parameters:
-            image (Image): The image on which to draw rectangles.
+            image (ImageLike): The image on which to draw rectangles.
             regions (List[Rect]): A list of regions (as x, y, width, height tuples) where rectangles will be drawn.
 
         Returns:
-            Image: The image with rectangles drawn on it.
+            ImageLike: The image with rectangles drawn on it.
         """
         pass
 
     @abstractmethod
-    def get_image_dimensions(self, image: Image) -> tuple[int, int]:
+    def get_image_dimensions(self, image: ImageLike) -> tuple[int, int]:
         """
         Retrieves the dimensions of the given image.
 
         Parameters:
-            image (Image): The image whose dimensions are to be retrieved.
+            image (ImageLike): The image whose dimensions are to be retrieved.
 
         Returns:
             tuple[int, int]: A tuple containing the width and height of the image.
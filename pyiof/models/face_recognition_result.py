@@ -1,12 +1,21 @@
-from cv2.typing import Rect
+from typing import Optional
+
+import numpy as np
 
 
 class FaceRecognitionResult:
-    def __init__(self, faces_regions: list[Rect], scale_factor: float, min_neighbors: int):
+    def __init__(self, faces_regions: np.ndarray, scale_factor: float, min_neighbors: int,
+                 overlap_threshold: Optional[float] = None, detection_scale: float = 1.0,
+                 frame_index: Optional[int] = None):
         self.faces_regions = faces_regions
         self.scale_factor = scale_factor
         self.min_neighbors = min_neighbors
+        self.overlap_threshold = overlap_threshold
+        self.detection_scale = detection_scale
+        self.frame_index = frame_index
 
     def __repr__(self):
-        return f'FaceRecognitionResult(faces_regions={self.faces_regions}, ' \
-               f'scale_factor={self.scale_factor}, min_neighbors={self.min_neighbors})'
+        return f'FaceRecognitionResult(faces_regions={np.asarray(self.faces_regions).tolist()}, ' \
+               f'scale_factor={self.scale_factor}, min_neighbors={self.min_neighbors}, ' \
+               f'overlap_threshold={self.overlap_threshold}, detection_scale={self.detection_scale}, ' \
+               f'frame_index={self.frame_index})'
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from PIL import Image
+
+
+class ImageLoadResult:
+    def __init__(self, path: str, image: Optional[Image.Image] = None, error: Optional[Exception] = None):
+        self.path = path
+        self.image = image
+        self.error = error
+
+    def __repr__(self):
+        return f'ImageLoadResult(path={self.path}, image={self.image}, error={self.error!r})'
@@ -1,11 +1,19 @@
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
 
 class OCRResult:
-    def __init__(self, text: str, accuracy: Tuple[int, int], threshold: int):
+    def __init__(self, text: str, accuracy: Tuple[int, int], threshold: Optional[int], ocr_passes: Optional[int] = None,
+                 source: Optional[Union[str, int]] = None, page_index: Optional[int] = None,
+                 error: Optional[Exception] = None):
         self.text = text
         self.accuracy = accuracy
         self.threshold = threshold
+        self.ocr_passes = ocr_passes
+        self.source = source
+        self.page_index = page_index
+        self.error = error
 
     def __repr__(self):
-        return f'OCRResult(text={self.text}, accuracy={self.accuracy}, threshold={self.threshold})'
+        return f'OCRResult(text={self.text}, accuracy={self.accuracy}, threshold={self.threshold}, ' \
+               f'ocr_passes={self.ocr_passes}, source={self.source}, page_index={self.page_index}, ' \
+               f'error={self.error!r})'
@@ -0,0 +1,63 @@
+"""
+Compiles plain text dictionaries, with one word per line, into DictionaryIndex files that DictionaryManager
+opens without parsing (see DictionaryManager use_index).
+
+Usage:
+    python -m pyiof.ocr.dictionary_compiler words_alpha.txt [-o words_alpha.idx]
+"""
+import argparse
+import sys
+from typing import Optional, Sequence
+
+from pyiof.ocr.dictionary_index import DictionaryIndex
+
+
+def compile_dictionary(dictionary_file: str, index_file: Optional[str] = None) -> DictionaryIndex:
+    """
+    Compiles a plain text dictionary into a DictionaryIndex file, versioned and with the checksum of the
+    dictionary file.
+
+    Args:
+        dictionary_file (str): The file path of the plain text dictionary.
+        index_file (Optional[str]): The file path of the compiled index. If None, the dictionary file path
+                                    with the '.idx' extension is used, which is where DictionaryManager
+                                    looks for it.
+
+    Returns:
+        DictionaryIndex: The compiled index, opened.
+    """
+    return DictionaryIndex.build_from_file(dictionary_file,
+                                           index_file or DictionaryIndex.get_default_index_file(dictionary_file))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the dictionary compiler from the command line.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments. If None, sys.argv is used.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(prog='python -m pyiof.ocr.dictionary_compiler',
+                                     description='Compiles a plain text dictionary, with one word per line, '
+                                                 'into a binary dictionary index.')
+    parser.add_argument('dictionary_file', help='the plain text dictionary file')
+    parser.add_argument('-o', '--output', dest='index_file',
+                        help="the compiled index file (default: the dictionary file with the '.idx' extension)")
+    args = parser.parse_args(argv)
+
+    try:
+        dictionary_index = compile_dictionary(args.dictionary_file, args.index_file)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error compiling dictionary file {args.dictionary_file}: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Compiled {len(dictionary_index)} words from {args.dictionary_file} into {dictionary_index.index_file}")
+    dictionary_index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Iterable
+
+import numpy as np
+
+from pyiof.utils.common_utils import calculate_file_hash
+
+
+class DictionaryIndex:
+    """
+    Read-only index of the words of a dictionary, stored in a compact binary file that is memory-mapped and
+    searched with a binary search. Only the pages of the file that are read are loaded, and they are shared
+    through the OS page cache by every process that opens the same index file.
+
+    The file contains, in little-endian byte order: the MAGIC bytes, the format VERSION (uint32), the BLAKE2b
+    checksum of the source dictionary file (64 bytes, zeros if the words did not come from a file), the number
+    of words (uint32), the offsets of the words in the words block (uint32, one more than the number of words)
+    and the words block, with the UTF-8 encoded words sorted by their bytes.
+
+    Attributes:
+        index_file (str): The file path of the index.
+        source_checksum (bytes): The BLAKE2b checksum of the source dictionary file.
+        _mmap (mmap.mmap): The memory map of the index file.
+        _offsets (memoryview): The offsets of the words, a view of the memory map.
+        _words_start (int): The position of the words block in the index file.
+    """
+
+    MAGIC = b'PYIOFIDX'
+    VERSION = 1
+    _HEADER = struct.Struct('<8sI64sI')
+
+    def __init__(self, index_file: str):
+        """
+        Opens an index file built with DictionaryIndex.build.
+
+        Parameters:
+            index_file (str): The file path of the index.
+
+        Raises:
+            ValueError: If the file is not a dictionary index, or was built with another format version.
+            OSError: If the file can not be opened.
+        """
+        self.index_file = index_file
+        self._offsets = None
+        with open(index_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < self._HEADER.size:
+            self.close()
+            raise ValueError(f"File is not a dictionary index: {index_file}")
+        magic, version, self.source_checksum, words_count = self._HEADER.unpack_from(self._mmap)
+        offsets_size = 4 * (words_count + 1)
+        if magic != self.MAGIC or len(self._mmap) < self._HEADER.size + offsets_size:
+            self.close()
+            raise ValueError(f"File is not a dictionary index: {index_file}")
+        if version != self.VERSION:
+            self.close()
+            raise ValueError(f"Dictionary index {index_file} has format version {version}, "
+                             f"version {self.VERSION} is required")
+
+        self._words_start = self._HEADER.size + offsets_size
+        # Memory views are indexed faster than numpy arrays, but they read the offsets in the native byte
+        # order, so the offsets are only copied on big-endian platforms
+        if sys.byteorder == 'little':
+            self._offsets = memoryview(self._mmap)[self._HEADER.size:self._words_start].cast('I')
+        else:
+            self._offsets = memoryview(np.frombuffer(self._mmap, dtype='<u4', count=words_count + 1,
+                                                     offset=self._HEADER.size).astype('=u4'))
+
+    @staticmethod
+    def get_default_index_file(dictionary_file: str) -> str:
+        """
+        Returns the default file path of the index of a dictionary file: the dictionary file path with
+        the '.idx' extension.
+
+        Parameters:
+            dictionary_file (str): The file path of the plain text dictionary.
+
+        Returns:
+            str: The file path of the index.
+        """
+        return os.path.splitext(dictionary_file)[0] + '.idx'
+
+    @classmethod
+    def build(cls, words: Iterable[str], index_file: str, source_checksum: bytes = bytes(64)) -> 'DictionaryIndex':
+        """
+        Builds the index file of the given words and opens it. The file is written to a temporary file
+        first and then moved, so processes opening the index never see a partial file.
+
+        Parameters:
+            words (Iterable[str]): The words of the dictionary. Surrounding whitespace is removed, and
+                                   empty words and duplicates are ignored.
+            index_file (str): The file path of the index.
+            source_checksum (bytes): The BLAKE2b checksum of the dictionary file the words come from.
+
+        Returns:
+            DictionaryIndex: The opened index.
+        """
+        encoded_words = sorted({word.strip().encode('utf-8') for word in words} - {b''})
+        offsets = np.zeros(len(encoded_words) + 1, dtype='<u4')
+        np.cumsum([len(word) for word in encoded_words], out=offsets[1:])
+
+        index_dir = os.path.dirname(os.path.abspath(index_file))
+        temp_fd, temp_file = tempfile.mkstemp(dir=index_dir, suffix='.tmp')
+        try:
+            with os.fdopen(temp_fd, 'wb') as f:
+                f.write(cls._HEADER.pack(cls.MAGIC, cls.VERSION, source_checksum, len(encoded_words)))
+                f.write(offsets.tobytes())
+                f.write(b''.join(encoded_words))
+            os.replace(temp_file, index_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+        return cls(index_file)
+
+    @classmethod
+    def build_from_file(cls, dictionary_file: str, index_file: str) -> 'DictionaryIndex':
+        """
+        Builds the index file of a plain text dictionary, with one word per line, and opens it. The checksum
+        of the dictionary file is stored in the index, see is_built_from.
+
+        Parameters:
+            dictionary_file (str): The file path of the plain text dictionary.
+            index_file (str): The file path of the index.
+
+        Returns:
+            DictionaryIndex: The opened index.
+        """
+        with open(dictionary_file, 'rb') as f:
+            data = f.read()
+        return cls.build(data.decode('utf-8').split('\n'), index_file, hashlib.blake2b(data).digest())
+
+    def is_built_from(self, dictionary_file: str) -> bool:
+        """
+        Checks if the index was built from the current content of the dictionary file, by comparing checksums.
+
+        Parameters:
+            dictionary_file (str): The file path of the plain text dictionary.
+
+        Returns:
+            bool: True if the checksum of the dictionary file is the one stored in the index, False otherwise.
+        """
+        return bytes.fromhex(calculate_file_hash(dictionary_file, 'blake2b')) == self.source_checksum
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __contains__(self, word: str) -> bool:
+        """
+        Checks if the word is in the index, with a binary search over the sorted words.
+
+        Parameters:
+            word (str): The word to be checked.
+
+        Returns:
+            bool: True if the word is in the index, False otherwise.
+        """
+        encoded_word = word.encode('utf-8')
+        words, offsets, words_start = self._mmap, self._offsets, self._words_start
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            middle_word = words[words_start + offsets[middle]:words_start + offsets[middle + 1]]
+            if middle_word < encoded_word:
+                low = middle + 1
+            elif middle_word > encoded_word:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __getitem__(self, position: int) -> str:
+        """
+        Returns the word at the given position of the sorted words.
+
+        Parameters:
+            position (int): The position of the word.
+
+        Returns:
+            str: The word.
+        """
+        if not 0 <= position < len(self):
+            raise IndexError(f"Word position out of range: {position}")
+        return self._get_encoded_word(position).decode('utf-8')
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self._get_encoded_word(position).decode('utf-8')
+
+    def _get_encoded_word(self, position: int) -> bytes:
+        """
+        Returns the UTF-8 encoded word at the given position of the sorted words.
+
+        Parameters:
+            position (int): The position of the word.
+
+        Returns:
+            bytes: The encoded word.
+        """
+        words_start = self._words_start
+        return self._mmap[words_start + self._offsets[position]:words_start + self._offsets[position + 1]]
+
+    def close(self):
+        """
+        Closes the memory map of the index file.
+        """
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        self._mmap.close()
+
+    def __getstate__(self):
+        # Memory maps can not be pickled, so the index file is opened again when unpickling
+        return {'index_file': self.index_file}
+
+    def __setstate__(self, state):
+        self.__init__(state['index_file'])
@@ -1,6 +1,9 @@
 import os
-from typing import Optional, Set
-from pyiof.utils.common_utils import get_resources_dir
+from collections import Counter
+from typing import Container, Iterable, Optional, Tuple
+from pyiof.utils.common_utils import calculate_file_hash, get_resources_dir
+from pyiof.ocr.dictionary_index import DictionaryIndex
+from pyiof.ocr.fuzzy_dictionary_index import FuzzyDictionaryIndex
 from pyiof.ocr.interfaces.idictionary_manager import IDictionaryManager
 
 
@@ -22,20 +25,56 @@ class DictionaryManager(IDictionaryManager):
     """
     Manages dictionary operations for OCR processing, such as checking if a word exists in the dictionary.
 
+    By default the words are loaded into a set in memory. With `use_index`, they are looked up in a
+    DictionaryIndex instead: a sorted, memory-mapped words file compiled once from the dictionary file (see
+    pyiof.ocr.dictionary_compiler). It loads without parsing and is shared by every process through the OS
+    page cache.
+
+    With `fuzzy_max_edit_distance`, words that are not in the dictionary are also accepted when a dictionary
+    word is within that edit distance, so OCR output with a wrong character still counts. The lookups use a
+    FuzzyDictionaryIndex, built once next to the DictionaryIndex, which is then always used.
+
     Attributes:
         _dictionary_file (str): The file path of the dictionary.
-        _dictionary (Set[str]): The set of words loaded from the dictionary file.
+        _use_index (bool): Whether the words are looked up in a DictionaryIndex.
+        _index_file (str): The file path of the DictionaryIndex.
+        _fuzzy_max_edit_distance (Optional[int]): The maximum edit distance of approximate matches, or None
+                                                  if words must match exactly.
+        _dictionary (Container[str]): The words loaded from the dictionary file, as a set or a DictionaryIndex.
+        _fuzzy_index (Optional[FuzzyDictionaryIndex]): The index of approximate matches, loaded with the
+                                                       dictionary in approximate match mode.
+        _file_checksum (Optional[Tuple[Tuple, str]]): The modification time and size of the dictionary file,
+                                                      or of the index without its dictionary file, with the
+                                                      checksum computed for them.
     """
-    def __init__(self, dictionary_file: Optional[str] = None):
+
+    # Words shorter than this only match exactly, since most short strings are one edit away from some word
+    FUZZY_MIN_WORD_LENGTH = 4
+
+    def __init__(self, dictionary_file: Optional[str] = None, use_index: bool = False,
+                 index_file: Optional[str] = None, fuzzy_max_edit_distance: Optional[int] = None):
         """
         Initializes the DictionaryManager with a specified dictionary file.
 
         Parameters:
             dictionary_file (Optional[str]): The file path of the dictionary. If None,
                                              a default dictionary file is used.
+            use_index (bool): Whether the words are looked up in a memory-mapped DictionaryIndex
+                              instead of a set.
+            index_file (Optional[str]): The file path of the DictionaryIndex. It is rebuilt automatically when
+                                        the dictionary file changes. If None, the dictionary file path with
+                                        the '.idx' extension is used.
+            fuzzy_max_edit_distance (Optional[int]): If set, words within this edit distance (1 or 2 are
+                                                     practical) of a dictionary word are also accepted.
+                                                     If None, words must match exactly.
         """
         self._dictionary_file = dictionary_file or self._default_dictionary_file()
+        self._use_index = use_index or fuzzy_max_edit_distance is not None
+        self._index_file = index_file or DictionaryIndex.get_default_index_file(self._dictionary_file)
+        self._fuzzy_max_edit_distance = fuzzy_max_edit_distance
         self._dictionary = None
+        self._fuzzy_index = None
+        self._file_checksum = None
 
     @classmethod
     def _default_dictionary_file(cls) -> str:
@@ -48,16 +87,18 @@ class DictionaryManager(IDictionaryManager):
         resources_dir = get_resources_dir()
         return os.path.join(resources_dir, 'words_alpha.txt')
 
-    def _load_dictionary(self) -> Set[str]:
+    def _load_dictionary(self) -> Container[str]:
         """
-        Loads the dictionary from the file and returns it as a set of words.
+        Loads the dictionary from the file and returns it as a set of words, or as a DictionaryIndex.
 
         Returns:
-            Set[str]: A set of words read from the dictionary file.
+            Container[str]: The words read from the dictionary file.
 
         Raises:
             DictionaryManagerError: If there is an error reading the dictionary file.
         """
+        if self._use_index:
+            return self._load_dictionary_index()
         try:
             with open(self._dictionary_file, "r") as f:
                 data = f.read()
@@ -66,6 +107,123 @@ class DictionaryManager(IDictionaryManager):
             raise DictionaryManagerError(dictionary_file=self._dictionary_file,
                                          message=f"Error reading dictionary file {self._dictionary_file} {e}")
 
+    def _load_dictionary_index(self) -> DictionaryIndex:
+        """
+        Opens the DictionaryIndex of the dictionary file. The index is built, or rebuilt, when it does not
+        exist, has another format version, or its checksum does not match the dictionary file. An index
+        without its dictionary file is used as it is.
+
+        Returns:
+            DictionaryIndex: The index of the words of the dictionary file.
+
+        Raises:
+            DictionaryManagerError: If there is an error reading the dictionary file or the index.
+        """
+        try:
+            if os.path.exists(self._index_file):
+                try:
+                    dictionary_index = DictionaryIndex(self._index_file)
+                except ValueError:
+                    # Built with another format version, it is rebuilt
+                    pass
+                else:
+                    if not os.path.exists(self._dictionary_file) or \
+                            dictionary_index.is_built_from(self._dictionary_file):
+                        return dictionary_index
+                    dictionary_index.close()
+            return DictionaryIndex.build_from_file(self._dictionary_file, self._index_file)
+        except Exception as e:
+            raise DictionaryManagerError(dictionary_file=self._dictionary_file,
+                                         message=f"Error loading dictionary index {self._index_file} "
+                                                 f"of dictionary file {self._dictionary_file} {e}")
+
+    def _load_fuzzy_index(self, dictionary_index: DictionaryIndex) -> FuzzyDictionaryIndex:
+        """
+        Opens the FuzzyDictionaryIndex of the DictionaryIndex, building it first if it does not exist, or was
+        built from another DictionaryIndex or for a smaller edit distance.
+
+        Parameters:
+            dictionary_index (DictionaryIndex): The index of the words of the dictionary file.
+
+        Returns:
+            FuzzyDictionaryIndex: The index of approximate matches.
+
+        Raises:
+            DictionaryManagerError: If there is an error reading or building the fuzzy index.
+        """
+        fuzzy_index_file = f'{os.path.splitext(self._index_file)[0]}.fuzzy{self._fuzzy_max_edit_distance}.idx'
+        try:
+            if os.path.exists(fuzzy_index_file):
+                try:
+                    fuzzy_index = FuzzyDictionaryIndex(fuzzy_index_file, dictionary_index)
+                except ValueError:
+                    # Built with another format version or from another dictionary, it is rebuilt
+                    pass
+                else:
+                    if fuzzy_index.max_edit_distance >= self._fuzzy_max_edit_distance:
+                        return fuzzy_index
+                    fuzzy_index.close()
+            return FuzzyDictionaryIndex.build(dictionary_index, fuzzy_index_file, self._fuzzy_max_edit_distance)
+        except Exception as e:
+            raise DictionaryManagerError(dictionary_file=self._dictionary_file,
+                                         message=f"Error loading fuzzy dictionary index {fuzzy_index_file} "
+                                                 f"of dictionary file {self._dictionary_file} {e}")
+
+    def _get_dictionary(self) -> Container[str]:
+        """
+        Returns the words of the dictionary, loading them, and the fuzzy index in approximate match mode,
+        on first use.
+
+        Returns:
+            Container[str]: The words of the dictionary, as a set or a DictionaryIndex.
+        """
+        if self._dictionary is None:
+            dictionary = self._load_dictionary()
+            if self._fuzzy_max_edit_distance is not None:
+                self._fuzzy_index = self._load_fuzzy_index(dictionary)
+            self._dictionary = dictionary
+        return self._dictionary
+
+    def cache_identity(self) -> str:
+        """
+        Returns a stable identity of the dictionary for the keys of cached OCR results: the dictionary file
+        path and its BLAKE2b checksum (or those of the index when it is used without its dictionary file),
+        the lookup mode and the fuzzy edit distance. The checksum is computed again only when the file
+        modification time or size changes.
+
+        Returns:
+            str: The identity of the dictionary.
+        """
+        identity_file = self._dictionary_file
+        if self._use_index and not os.path.exists(identity_file):
+            identity_file = self._index_file
+
+        try:
+            stat_result = os.stat(identity_file)
+        except OSError:
+            checksum = ''
+        else:
+            file_stamp = (identity_file, stat_result.st_mtime_ns, stat_result.st_size)
+            if self._file_checksum is None or self._file_checksum[0] != file_stamp:
+                self._file_checksum = (file_stamp, calculate_file_hash(identity_file, 'blake2b'))
+            checksum = self._file_checksum[1]
+
+        return f'{type(self).__name__}:{os.path.abspath(identity_file)}:{checksum}:' \
+               f'{self._use_index}:{self._fuzzy_max_edit_distance}'
+
+    def _is_similar_word_in_dictionary(self, word: str) -> bool:
+        """
+        Checks if a dictionary word is within the fuzzy edit distance of the word, in approximate match mode.
+
+        Parameters:
+            word (str): The word to be checked.
+
+        Returns:
+            bool: True if a similar word exists in the dictionary, False otherwise or if words must match exactly.
+        """
+        return self._fuzzy_index is not None and len(word) >= self.FUZZY_MIN_WORD_LENGTH and \
+            self._fuzzy_index.has_similar_word(word, self._fuzzy_max_edit_distance)
+
     def is_word_in_dictionary(self, word: str) -> bool:
         """
         Checks if the specified word exists in the dictionary.
@@ -74,8 +232,31 @@ class DictionaryManager(IDictionaryManager):
             word (str): The word to be checked.
 
         Returns:
-            bool: True if the word exists in the dictionary, False otherwise.
+            bool: True if the word exists in the dictionary, or a similar word does in approximate match mode,
+                  False otherwise.
         """
-        if self._dictionary is None:
-            self._dictionary = self._load_dictionary()
-        return word in self._dictionary
+        return word in self._get_dictionary() or self._is_similar_word_in_dictionary(word)
+
+    def count_known_words(self, words: Iterable[str]) -> Tuple[int, int]:
+        """
+        Counts the words that are in the dictionary, or that have a similar word in it in approximate match
+        mode. With the set dictionary, the words are checked in a single comprehension. With the DictionaryIndex,
+        whose lookups are slower, repeated words are looked up once.
+
+        Parameters:
+            words (Iterable[str]): The words to check in the dictionary.
+
+        Returns:
+            Tuple[int, int]: The number of words in the dictionary and the total length of those words.
+        """
+        dictionary = self._get_dictionary()
+        if isinstance(dictionary, set):
+            known_words = [word for word in words if word in dictionary]
+            return len(known_words), sum(map(len, known_words))
+
+        word_counts = Counter(words)
+        known_words = [word for word in word_counts
+                       if word in dictionary or self._is_similar_word_in_dictionary(word)]
+        known_words_count = sum(word_counts[word] for word in known_words)
+        known_words_length = sum(len(word) * word_counts[word] for word in known_words)
+        return known_words_count, known_words_length
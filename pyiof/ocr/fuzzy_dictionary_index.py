@@ -0,0 +1,255 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from pyiof.ocr.dictionary_index import DictionaryIndex
+
+
+def _get_deletes(word: str, max_edit_distance: int) -> set[str]:
+    """
+    Returns the word and every string obtained by deleting up to max_edit_distance characters from it.
+
+    Parameters:
+        word (str): The word.
+        max_edit_distance (int): The maximum number of deleted characters.
+
+    Returns:
+        set[str]: The word and its deletes.
+    """
+    deletes = level_deletes = {word}
+    for _ in range(max_edit_distance):
+        level_deletes = {delete[:i] + delete[i + 1:] for delete in level_deletes for i in range(len(delete))}
+        deletes |= level_deletes
+    return deletes
+
+
+def _hash_delete(delete: str) -> int:
+    """
+    Returns the 64 bits hash of a delete, stable across processes.
+
+    Parameters:
+        delete (str): The delete.
+
+    Returns:
+        int: The hash.
+    """
+    return int.from_bytes(hashlib.blake2b(delete.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _get_edit_distance(word: str, other_word: str, max_edit_distance: int) -> int:
+    """
+    Computes the Levenshtein distance between two words, stopping as soon as it exceeds max_edit_distance.
+
+    Parameters:
+        word (str): The first word.
+        other_word (str): The second word.
+        max_edit_distance (int): The maximum distance of interest.
+
+    Returns:
+        int: The distance, or max_edit_distance + 1 if it is larger than max_edit_distance.
+    """
+    if abs(len(word) - len(other_word)) > max_edit_distance:
+        return max_edit_distance + 1
+
+    previous_row = list(range(len(other_word) + 1))
+    for i, char in enumerate(word, 1):
+        row = [i]
+        for j, other_char in enumerate(other_word, 1):
+            row.append(min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + (char != other_char)))
+        if min(row) > max_edit_distance:
+            return max_edit_distance + 1
+        previous_row = row
+    return min(previous_row[-1], max_edit_distance + 1)
+
+
+class FuzzyDictionaryIndex:
+    """
+    Index of the words of a DictionaryIndex that finds the words within a bounded edit (Levenshtein) distance
+    of a given word, with the symmetric delete algorithm (SymSpell): two words are within distance d only if
+    deleting up to d characters from each gives a common string.
+
+    Every delete of every word is precomputed. The index stores the 64 bits hashes of the deletes, sorted, with
+    the position of their word in the DictionaryIndex, in a file that is memory-mapped. A lookup hashes the
+    deletes of the given word, finds them with a binary search, and checks the distance of the few candidate
+    words found. Hash collisions only add candidates, which are then discarded by the distance check.
+
+    The file contains, in little-endian byte order: the MAGIC bytes, the format VERSION (uint32), the maximum
+    edit distance (uint32), the number of deletes (uint64), the source checksum of the DictionaryIndex
+    (64 bytes), the number of words of the DictionaryIndex (uint64), the sorted hashes of the deletes (uint64)
+    and the positions of their words (uint32).
+
+    Attributes:
+        index_file (str): The file path of the fuzzy index.
+        dictionary_index (DictionaryIndex): The index of the words.
+        max_edit_distance (int): The maximum edit distance the index was built for.
+        source_checksum (bytes): The source checksum of the DictionaryIndex the index was built from.
+        _mmap (mmap.mmap): The memory map of the fuzzy index file.
+        _hashes (ndarray): The sorted hashes of the deletes, a view of the memory map.
+        _positions (ndarray): The positions of the words of the deletes, a view of the memory map.
+    """
+
+    MAGIC = b'PYIOFFZY'
+    VERSION = 1
+    _HEADER = struct.Struct('<8sIIQ64sQ')
+
+    def __init__(self, index_file: str, dictionary_index: DictionaryIndex):
+        """
+        Opens a fuzzy index file built with FuzzyDictionaryIndex.build.
+
+        Parameters:
+            index_file (str): The file path of the fuzzy index.
+            dictionary_index (DictionaryIndex): The index of the words the fuzzy index was built from.
+
+        Raises:
+            ValueError: If the file is not a fuzzy index, was built with another format version, or was not
+                        built from the given DictionaryIndex.
+            OSError: If the file can not be opened.
+        """
+        self.index_file = index_file
+        self.dictionary_index = dictionary_index
+        with open(index_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._mmap) < self._HEADER.size:
+                raise ValueError(f"File is not a fuzzy dictionary index: {index_file}")
+            magic, version, self.max_edit_distance, deletes_count, self.source_checksum, words_count = \
+                self._HEADER.unpack_from(self._mmap)
+            if magic != self.MAGIC or len(self._mmap) < self._HEADER.size + 12 * deletes_count:
+                raise ValueError(f"File is not a fuzzy dictionary index: {index_file}")
+            if version != self.VERSION:
+                raise ValueError(f"Fuzzy dictionary index {index_file} has format version {version}, "
+                                 f"version {self.VERSION} is required")
+            if self.source_checksum != dictionary_index.source_checksum or words_count != len(dictionary_index):
+                raise ValueError(f"Fuzzy dictionary index {index_file} was not built from dictionary index "
+                                 f"{dictionary_index.index_file}")
+        except ValueError:
+            self._mmap.close()
+            raise
+
+        self._hashes = np.frombuffer(self._mmap, dtype='<u8', count=deletes_count, offset=self._HEADER.size)
+        self._positions = np.frombuffer(self._mmap, dtype='<u4', count=deletes_count,
+                                        offset=self._HEADER.size + 8 * deletes_count)
+
+    @classmethod
+    def build(cls, dictionary_index: DictionaryIndex, index_file: str,
+              max_edit_distance: int = 1) -> 'FuzzyDictionaryIndex':
+        """
+        Builds the fuzzy index file of the words of a DictionaryIndex and opens it. The file is written to a
+        temporary file first and then moved, so processes opening the index never see a partial file.
+
+        Parameters:
+            dictionary_index (DictionaryIndex): The index of the words.
+            index_file (str): The file path of the fuzzy index.
+            max_edit_distance (int): The maximum edit distance of the lookups. Every word has about
+                                     length^max_edit_distance deletes, so the index grows quickly with it.
+
+        Returns:
+            FuzzyDictionaryIndex: The opened fuzzy index.
+        """
+        hashes = array('Q')
+        positions = array('I')
+        for position, word in enumerate(dictionary_index):
+            for delete in _get_deletes(word, max_edit_distance):
+                hashes.append(_hash_delete(delete))
+                positions.append(position)
+
+        hashes = np.frombuffer(hashes, dtype=np.uint64)
+        order = np.argsort(hashes, kind='stable')
+
+        index_dir = os.path.dirname(os.path.abspath(index_file))
+        temp_fd, temp_file = tempfile.mkstemp(dir=index_dir, suffix='.tmp')
+        try:
+            with os.fdopen(temp_fd, 'wb') as f:
+                f.write(cls._HEADER.pack(cls.MAGIC, cls.VERSION, max_edit_distance, len(hashes),
+                                         dictionary_index.source_checksum, len(dictionary_index)))
+                f.write(hashes[order].astype('<u8').tobytes())
+                f.write(np.frombuffer(positions, dtype=np.uint32)[order].astype('<u4').tobytes())
+            os.replace(temp_file, index_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+        return cls(index_file, dictionary_index)
+
+    def get_similar_words(self, word: str, max_edit_distance: Optional[int] = None) -> list[Tuple[str, int]]:
+        """
+        Finds the words within the given edit distance of a word.
+
+        Parameters:
+            word (str): The word.
+            max_edit_distance (Optional[int]): The maximum edit distance, at most the one the index was built for.
+                                               If None, the one the index was built for is used.
+
+        Returns:
+            list[Tuple[str, int]]: The similar words with their distance, the closest first.
+        """
+        return sorted(self._iter_similar_words(word, max_edit_distance), key=lambda item: (item[1], item[0]))
+
+    def has_similar_word(self, word: str, max_edit_distance: Optional[int] = None) -> bool:
+        """
+        Checks if there is a word within the given edit distance of a word, stopping at the first one found.
+
+        Parameters:
+            word (str): The word.
+            max_edit_distance (Optional[int]): The maximum edit distance, at most the one the index was built for.
+                                               If None, the one the index was built for is used.
+
+        Returns:
+            bool: True if there is a similar word, False otherwise.
+        """
+        return next(self._iter_similar_words(word, max_edit_distance), None) is not None
+
+    def _iter_similar_words(self, word: str, max_edit_distance: Optional[int]) -> Iterator[Tuple[str, int]]:
+        """
+        Yields the words within the given edit distance of a word, in no particular order.
+
+        Parameters:
+            word (str): The word.
+            max_edit_distance (Optional[int]): The maximum edit distance. If None, the one the index was built
+                                               for is used.
+
+        Returns:
+            Iterator[Tuple[str, int]]: The similar words with their distance.
+
+        Raises:
+            ValueError: If max_edit_distance is larger than the one the index was built for.
+        """
+        if max_edit_distance is None:
+            max_edit_distance = self.max_edit_distance
+        if max_edit_distance > self.max_edit_distance:
+            raise ValueError(f"The fuzzy dictionary index supports edit distances up to {self.max_edit_distance}, "
+                             f"{max_edit_distance} was requested")
+
+        delete_hashes = np.fromiter((_hash_delete(delete) for delete in _get_deletes(word, max_edit_distance)),
+                                    dtype=np.uint64)
+        starts = np.searchsorted(self._hashes, delete_hashes, side='left')
+        ends = np.searchsorted(self._hashes, delete_hashes, side='right')
+        candidate_positions = {position for start, end in zip(starts.tolist(), ends.tolist())
+                               for position in self._positions[start:end].tolist()}
+
+        for position in candidate_positions:
+            candidate_word = self.dictionary_index[position]
+            edit_distance = _get_edit_distance(word, candidate_word, max_edit_distance)
+            if edit_distance <= max_edit_distance:
+                yield candidate_word, edit_distance
+
+    def close(self):
+        """
+        Closes the memory map of the fuzzy index file. The DictionaryIndex is not closed.
+        """
+        self._hashes = None
+        self._positions = None
+        self._mmap.close()
+
+    def __getstate__(self):
+        # Memory maps can not be pickled, so the index file is opened again when unpickling
+        return {'index_file': self.index_file, 'dictionary_index': self.dictionary_index}
+
+    def __setstate__(self, state):
+        self.__init__(state['index_file'], state['dictionary_index'])
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Tuple
 
 
 class IDictionaryManager(ABC):
@@ -21,3 +22,28 @@ class IDictionaryManager(ABC):
             bool: True if the word is in the dictionary, False otherwise.
         """
         pass
+
+    def count_known_words(self, words: Iterable[str]) -> Tuple[int, int]:
+        """
+        Counts the words that are in the dictionary. Implementations can override it with a bulk lookup
+        faster than checking every word with is_word_in_dictionary.
+
+        Parameters:
+            words (Iterable[str]): The words to check in the dictionary.
+
+        Returns:
+            Tuple[int, int]: The number of words in the dictionary and the total length of those words.
+        """
+        known_words = [word for word in words if self.is_word_in_dictionary(word)]
+        return len(known_words), sum(map(len, known_words))
+
+    def cache_identity(self) -> str:
+        """
+        Returns a stable identity of the dictionary, used in the keys of cached OCR results, whose accuracy
+        depends on the dictionary. Two dictionary managers with the same identity must accept the same words.
+        Implementations reading their words from files should override it with the files and their content.
+
+        Returns:
+            str: The identity of the dictionary. By default, the class name.
+        """
+        return type(self).__name__
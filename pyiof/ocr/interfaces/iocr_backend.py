@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Optional
+
+from pyiof.img_processing.interfaces.iimage_processor import ImageLike
+from pyiof.utils.concurrency_utils import run_in_executor
+
+
+class IOCRBackend(ABC):
+    """
+    Interface for OCR engines.
+
+    This interface defines the method used by OCRProcessor to extract the text
+    of an image, so the OCR engine can be replaced.
+    """
+
+    @abstractmethod
+    def image_to_string(self, image: ImageLike) -> str:
+        """
+        Extracts the text of the given image.
+
+        Parameters:
+            image (ImageLike): The image (PIL Image or numpy array) from which text needs to be extracted.
+
+        Returns:
+            str: The text found in the image.
+        """
+        pass
+
+    async def image_to_string_async(self, image: ImageLike, executor: Optional[Executor] = None) -> str:
+        """
+        Extracts the text of the given image without blocking the event loop. By default, image_to_string
+        runs on the executor. Backends that can run the OCR engine asynchronously override this method.
+
+        Parameters:
+            image (ImageLike): The image (PIL Image or numpy array) from which text needs to be extracted.
+            executor (Optional[Executor]): The executor running blocking work. If None, the default executor
+                                           of the event loop is used.
+
+        Returns:
+            str: The text found in the image.
+        """
+        return await run_in_executor(self.image_to_string, image, executor=executor)
@@ -1,10 +1,22 @@
-from PIL import Image
-import pytesseract
-from typing import Tuple
+import asyncio
+import copy
+import math
+import os
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from typing import Dict, Generator, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
-from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor
+from pyiof.img_processing.image_files_manager import DEFAULT_DOCUMENT_DPI, ImageFilesManager
+from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor, ImageLike
 from pyiof.models.ocr_result import OCRResult
 from pyiof.ocr.interfaces.idictionary_manager import IDictionaryManager
+from pyiof.ocr.interfaces.iocr_backend import IOCRBackend
+from pyiof.ocr.pytesseract_backend import PytesseractBackend
+from pyiof.utils.common_utils import calculate_image_hash
+from pyiof.utils.concurrency_utils import bounded_imap, bounded_imap_unordered, run_in_executor
+from pyiof.utils.result_cache import ResultCache
 
 
 class OCRProcessorError(Exception):
@@ -25,6 +37,65 @@ class OCRProcessorError(Exception):
         self.message = message
 
 
+# Words without the punctuation at their start or end, like quotes, commas and periods
+_WORD_PATTERN = re.compile(r'\w(?:\S*\w)?')
+
+# OCRProcessor used by the worker processes of OCRProcessor.extract_text_batch
+_batch_worker_ocr_processor = None
+
+
+def _init_batch_worker(ocr_processor: 'OCRProcessor'):
+    """
+    Installs the OCRProcessor used by a batch worker process.
+
+    Args:
+        ocr_processor (OCRProcessor): The OCRProcessor to run in the worker process.
+    """
+    global _batch_worker_ocr_processor
+    _batch_worker_ocr_processor = ocr_processor
+
+
+def _extract_text_in_batch_worker(source_and_image: Tuple[Union[str, int], Union[ImageLike, str]]) -> OCRResult:
+    """
+    Extracts the text of an image, or of an image file, in a batch worker process.
+
+    Args:
+        source_and_image (Tuple[Union[str, int], Union[ImageLike, str]]): The source of the image and
+                                                                          the image or its file path.
+
+    Returns:
+        OCRResult: The OCR result, tagged with its source.
+    """
+    source, image = source_and_image
+    if isinstance(image, str):
+        # Only the grayscale image is used, which JPEG files can decode directly
+        image = ImageFilesManager.load_image(image, mode='L')
+    ocr_result = _batch_worker_ocr_processor.extract_text(image)
+    ocr_result.source = source
+    return ocr_result
+
+
+def _advance_search(search: Generator, ocr_texts: Optional[list[str]]) -> Tuple[Optional[Tuple[list, int]],
+                                                                                 Optional[OCRResult]]:
+    """
+    Sends the texts of the last OCR passes to an OCR passes planner (see OCRProcessor._plan_ocr_passes), and
+    returns its next OCR passes, or its result when it is done. asyncio futures can not hold a StopIteration,
+    so it is turned into a result here.
+
+    Args:
+        search (Generator): The OCR passes planner.
+        ocr_texts (Optional[list[str]]): The texts of the last OCR passes, None on the first call.
+
+    Returns:
+        Tuple[Optional[Tuple[list, int]], Optional[OCRResult]]: The next OCR passes and None, or None and the
+                                                                OCR result.
+    """
+    try:
+        return search.send(ocr_texts), None
+    except StopIteration as stop:
+        return None, stop.value
+
+
 class OCRProcessor:
     """
     OCRProcessor is a class that manages the Optical Character Recognition (OCR) process.
@@ -32,22 +103,121 @@ class OCRProcessor:
     Attributes:
         dictionary_manager (IDictionaryManager): An instance of a dictionary manager to validate words.
         image_processor (IImageProcessor): An instance of an image processor to preprocess images for OCR.
+        ocr_backend (IOCRBackend): The OCR engine used to extract the text of the binarized images.
+        executor (Optional[str]): The executor mode used to run the OCR passes concurrently ('thread' or
+                                  'process'). If None, the OCR passes run serially.
+        max_workers (Optional[int]): The maximum number of workers of the executor.
+        search_strategy (str): The strategy used to search the best threshold ('exhaustive', 'coarse_to_fine',
+                               'golden_section' or 'histogram'), or 'adaptive' for a single pass with local
+                               thresholds.
+        target_hit_ratio (Optional[float]): The ratio of OCR words found in the dictionary at which the
+                                            threshold search stops early.
+        cache (Optional[ResultCache]): A cache of OCR results.
+        text_regions (bool): If True, text regions are found first and OCR only runs on them.
+        _executor (Optional[Executor]): A private executor, created on first use when an executor mode is set.
+        _executor_lock (threading.Lock): Lock protecting the creation and the shutdown of the private executor,
+                                         since the text of several images can be extracted at once.
     """
 
-    def __init__(self, dictionary_manager: IDictionaryManager, image_processor: IImageProcessor):
+    THRESHOLDS = tuple(range(32, 256, 32))
+    # Smallest distance between the thresholds tried by the coarse to fine search
+    MIN_THRESHOLD_STEP = 16
+    EXECUTOR_MODES = ('thread', 'process')
+    SEARCH_STRATEGIES = ('exhaustive', 'coarse_to_fine', 'golden_section', 'histogram', 'adaptive')
+
+    def __init__(self, dictionary_manager: IDictionaryManager, image_processor: IImageProcessor,
+                 executor: Optional[str] = None, max_workers: Optional[int] = None,
+                 search_strategy: str = 'exhaustive', target_hit_ratio: Optional[float] = None,
+                 ocr_backend: Optional[IOCRBackend] = None, cache: Optional[ResultCache] = None,
+                 text_regions: bool = False):
         """
         Initializes the OCRProcessor with necessary components.
 
         Args:
             dictionary_manager (IDictionaryManager): The dictionary manager component.
             image_processor (IImageProcessor): The image processing component.
+            executor (Optional[str]): 'thread' or 'process' to run the OCR pass of every threshold
+                                      concurrently. If None, the OCR passes run one after another.
+            max_workers (Optional[int]): The maximum number of workers of the executor. If None, the
+                                         executor default is used.
+            search_strategy (str): 'exhaustive' runs OCR on every threshold. 'coarse_to_fine' starts on two
+                                   thresholds and refines around the best threshold, one threshold at a
+                                   time, while the accuracy improves. 'golden_section' runs a golden-section
+                                   search over the threshold while the accuracy improves.
+                                   'histogram' only tries the thresholds computed from the image histogram
+                                   (Otsu and histogram valley). 'adaptive' does not search: it runs a single
+                                   OCR pass on the image binarized with a local threshold for every pixel
+                                   (IImageProcessor.binarize_image_adaptive), which suits unevenly lit scans.
+            target_hit_ratio (Optional[float]): If set, the search stops as soon as the ratio of OCR words
+                                                found in the dictionary reaches this value (0 to 1).
+            ocr_backend (Optional[IOCRBackend]): The OCR engine. If None, a PytesseractBackend is used.
+            cache (Optional[ResultCache]): A cache of OCR results, keyed by the image content and the OCR
+                                           parameters. If None, results are not cached.
+            text_regions (bool): If True, the candidate text regions of the image are found first with
+                                 IImageProcessor.get_text_regions, and every OCR pass only runs on the crops of
+                                 those regions, whose texts are joined in reading order. This saves the OCR
+                                 time of large non text areas, like photos and margins. If no text region is
+                                 found, the whole image is used.
+
+        Raises:
+            OCRProcessorError: If the executor mode or the search strategy is not supported.
         """
+        if executor is not None and executor not in self.EXECUTOR_MODES:
+            raise OCRProcessorError(f"Unsupported executor mode '{executor}'. "
+                                    f"Supported modes: {self.EXECUTOR_MODES}")
+        if search_strategy not in self.SEARCH_STRATEGIES:
+            raise OCRProcessorError(f"Unsupported search strategy '{search_strategy}'. "
+                                    f"Supported strategies: {self.SEARCH_STRATEGIES}")
         self.dictionary_manager = dictionary_manager
         self.image_processor = image_processor
+        self.ocr_backend = ocr_backend or PytesseractBackend()
+        self.executor = executor
+        self.max_workers = max_workers
+        self.search_strategy = search_strategy
+        self.target_hit_ratio = target_hit_ratio
+        self.cache = cache
+        self.text_regions = text_regions
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        del state['_executor_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor_lock = threading.Lock()
+
+    def close(self):
+        """
+        Shuts down the executor used to run the OCR passes, if any was created.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _get_executor(self) -> Executor:
+        """
+        Returns the executor used to run the OCR passes, creating it on first use.
+
+        Returns:
+            Executor: A thread or process pool executor, depending on the executor mode.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    executor_class = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+                    self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
 
     def _calculate_ocr_accuracy(self, text: str) -> Tuple[int, int]:
         """
         Calculates the accuracy of OCR by counting the number of recognized words present in the dictionary.
+        The words are split, without their surrounding punctuation, in a single pass over the whole text, and
+        they are looked up in bulk with count_known_words.
 
         Args:
             text (str): The text obtained from OCR to evaluate.
@@ -59,42 +229,533 @@ class OCRProcessor:
         if not text or type(text) != str:
             return 0, 0
 
-        words_in_dict = 0
-        words_length = 0
-        text = text.lower()
-        words = text.split()
+        words = _WORD_PATTERN.findall(text.lower())
+        return self.dictionary_manager.count_known_words(words)
 
-        for word in words:
-            if self.dictionary_manager.is_word_in_dictionary(word):
-                words_in_dict += 1
-                words_length += len(word)
+    def extract_text(self, image: ImageLike) -> OCRResult:
+        """
+        Extracts text from an image using OCR, optimizing for the best accuracy by adjusting the threshold.
 
-        return words_in_dict, words_length
+        The image is converted to a grayscale numpy array once, and every binarized image given to the OCR
+        backend is a numpy array.
 
-    def extract_text(self, image: Image) -> OCRResult:
+        Args:
+            image (ImageLike): The image (PIL Image or RGB, RGBA or grayscale numpy array) from which text
+                               needs to be extracted.
+
+        Returns:
+            OCRResult: An instance of OCRResult containing the extracted text, its accuracy, the best threshold
+                       and the number of OCR passes used.
         """
-        Extracts text from an image using OCR, optimizing for the best accuracy by adjusting the threshold.
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._get_cache_key(image)
+            ocr_result = self.cache.get(cache_key)
+            if ocr_result is not None:
+                return copy.copy(ocr_result)
+
+        ocr_result = self._search_best_threshold(self._get_grayscale_array(image))
+
+        if cache_key is not None:
+            self.cache.set(cache_key, copy.copy(ocr_result))
+        return ocr_result
+
+    async def extract_text_async(self, image: ImageLike, executor: Optional[Executor] = None,
+                                 semaphore: Optional[asyncio.Semaphore] = None) -> OCRResult:
+        """
+        Extracts text from an image like extract_text, without blocking the event loop. The OCR passes run
+        concurrently with IOCRBackend.image_to_string_async (asyncio subprocesses with PytesseractBackend),
+        and the image operations, the dictionary lookups and the cache accesses run on the executor.
+
+        The executor mode of the OCRProcessor is not used. Cancelling the task stops the OCR passes that are
+        running, and the remaining ones are not started.
 
         Args:
-            image (Image): The image from which text needs to be extracted.
+            image (ImageLike): The image (PIL Image or RGB, RGBA or grayscale numpy array) from which text
+                               needs to be extracted.
+            executor (Optional[Executor]): The executor of the image operations, and of the OCR passes of
+                                           backends without asynchronous OCR. It must run in this process,
+                                           like a ThreadPoolExecutor, since the search state is not picklable.
+                                           If None, the default executor of the event loop is used.
+            semaphore (Optional[asyncio.Semaphore]): A semaphore limiting the number of OCR passes running at
+                                                     the same time, to be shared by all the calls of the event
+                                                     loop. If None, every call runs at most as many OCR passes
+                                                     at the same time as there are CPUs.
 
         Returns:
-            OCRResult: An instance of OCRResult containing the extracted text, its accuracy, and the best threshold.
+            OCRResult: An instance of OCRResult containing the extracted text, its accuracy, the best threshold
+                       and the number of OCR passes used.
+
+        Raises:
+            OCRProcessorError: If the executor is a ProcessPoolExecutor.
         """
-        best_accuracy = (0, 0)
-        best_threshold = 64
-        text = ''
+        if isinstance(executor, ProcessPoolExecutor):
+            raise OCRProcessorError("extract_text_async requires an executor running in this process, like a "
+                                    "ThreadPoolExecutor, ProcessPoolExecutor is not supported")
+        semaphore = semaphore or asyncio.Semaphore(os.cpu_count() or 1)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = await run_in_executor(self._get_cache_key, image, executor=executor)
+            ocr_result = await run_in_executor(self.cache.get, cache_key, executor=executor)
+            if ocr_result is not None:
+                return copy.copy(ocr_result)
 
+        grayscale_img = await run_in_executor(self._get_grayscale_array, image, executor=executor)
+        # The search runs on the executor between the OCR passes, which run on the event loop
+        search = self._plan_ocr_passes(grayscale_img)
+        ocr_texts = None
+        while True:
+            ocr_passes, ocr_result = await run_in_executor(_advance_search, search, ocr_texts, executor=executor)
+            if ocr_passes is None:
+                break
+            ocr_texts = await self._extract_texts_async(*ocr_passes, semaphore, executor)
+
+        if cache_key is not None:
+            await run_in_executor(self.cache.set, cache_key, copy.copy(ocr_result), executor=executor)
+        return ocr_result
+
+    def _get_grayscale_array(self, image: ImageLike) -> np.ndarray:
+        """
+        Converts the image to a grayscale numpy array, without copying grayscale arrays.
+
+        Args:
+            image (ImageLike): The image from which text needs to be extracted.
+
+        Returns:
+            ndarray: The grayscale image.
+        """
         grayscale_img = self.image_processor.grayscale_image(image)
+        return self.image_processor.convert_pil_image_to_np_array(grayscale_img)
+
+    def _get_cache_key(self, image: ImageLike) -> str:
+        """
+        Builds the cache key of the OCR result of an image from the image content and the OCR parameters.
+
+        Args:
+            image (ImageLike): The image from which text needs to be extracted.
 
-        for threshold in range(32, 256, 32):
-            binarized_img = self.image_processor.binarize_image(grayscale_img, threshold)
-            ocr_text = pytesseract.image_to_string(binarized_img)
-            ocr_accuracy = self._calculate_ocr_accuracy(ocr_text)
+        Returns:
+            str: The cache key.
+        """
+        return ResultCache.make_key('OCRResult', calculate_image_hash(image), self.THRESHOLDS, self.search_strategy,
+                                    self.target_hit_ratio, self.text_regions, self.dictionary_manager.cache_identity(),
+                                    type(self.ocr_backend).__name__, sorted(vars(self.ocr_backend).items()))
+
+    def _search_best_threshold(self, grayscale_img: np.ndarray) -> OCRResult:
+        """
+        Runs the OCR passes planned by _plan_ocr_passes and returns the most accurate text.
+
+        Args:
+            grayscale_img (ndarray): The grayscale image from which text needs to be extracted.
+
+        Returns:
+            OCRResult: An instance of OCRResult containing the extracted text, its accuracy, the best threshold
+                       and the number of OCR passes used.
+        """
+        search = self._plan_ocr_passes(grayscale_img)
+        ocr_texts = None
+        while True:
+            ocr_passes, ocr_result = _advance_search(search, ocr_texts)
+            if ocr_passes is None:
+                return ocr_result
+            ocr_texts = self._extract_texts(*ocr_passes)
+
+    def _plan_ocr_passes(self, grayscale_img: np.ndarray) -> Generator[Tuple[list[ImageLike], int], list[str],
+                                                                      OCRResult]:
+        """
+        Returns a generator that searches the most accurate text of the image without running OCR itself, so
+        the same search runs with blocking and with asynchronous OCR. The generator yields the binarized
+        images of the next OCR passes with the number of passes, receives the text of each pass, and returns
+        the OCR result.
+
+        OCR runs on the thresholds planned by the search strategy, or on a single adaptive binarization. If
+        text regions are enabled, the regions are found once, and every OCR pass runs on their crops only.
+        The thresholds are still planned from the whole image.
+
+        Args:
+            grayscale_img (ndarray): The grayscale image from which text needs to be extracted.
+
+        Returns:
+            Generator[Tuple[list[ImageLike], int], list[str], OCRResult]: The OCR passes planner.
+        """
+        regions = None
+        if self.text_regions:
+            regions = self.image_processor.get_text_regions(grayscale_img)
+            if not len(regions):
+                regions = None
+
+        if self.search_strategy == 'adaptive':
+            return (yield from self._plan_adaptive_ocr_pass(grayscale_img, regions))
+
+        ocr_imgs = [grayscale_img]
+        if regions is not None:
+            ocr_imgs = self.image_processor.get_images_from_regions(regions, grayscale_img)
+
+        ocr_texts = {}
+        ocr_accuracies = {}
+        planner = self._plan_thresholds(grayscale_img)
+        thresholds = next(planner)
+        while True:
+            pending_thresholds = [threshold for threshold in thresholds if threshold not in ocr_texts]
+            binarized_imgs = self._binarize_for_ocr_passes(ocr_imgs, pending_thresholds)
+            pending_ocr_texts = yield binarized_imgs, len(pending_thresholds)
+            for threshold, ocr_text in zip(pending_thresholds, pending_ocr_texts):
+                ocr_texts[threshold] = ocr_text
+                ocr_accuracies[threshold] = self._calculate_ocr_accuracy(ocr_text)
+            if self._is_target_hit_ratio_reached(ocr_texts, ocr_accuracies, pending_thresholds):
+                break
+            try:
+                thresholds = planner.send(ocr_accuracies)
+            except StopIteration:
+                break
+
+        best_threshold = self._get_best_threshold(ocr_accuracies)
+        if best_threshold is None:
+            return OCRResult('', (0, 0), 64, len(ocr_texts))
+        return OCRResult(ocr_texts[best_threshold], ocr_accuracies[best_threshold], best_threshold, len(ocr_texts))
+
+    def _plan_adaptive_ocr_pass(self, grayscale_img: np.ndarray,
+                                regions: Optional[np.ndarray]) -> Generator[Tuple[list[ImageLike], int], list[str],
+                                                                            OCRResult]:
+        """
+        Plans a single OCR pass on the image binarized with local thresholds. The whole image is binarized,
+        so the thresholds near the borders of the text regions see their real neighborhood, and then the text
+        regions, if any, are cropped. There is no global threshold, so the threshold of the result is None.
+
+        Args:
+            grayscale_img (ndarray): The grayscale image from which text needs to be extracted.
+            regions (Optional[ndarray]): The text regions of the image, or None to use the whole image.
+
+        Returns:
+            Generator[Tuple[list[ImageLike], int], list[str], OCRResult]: The OCR pass planner.
+        """
+        binarized_img = self.image_processor.binarize_image_adaptive(grayscale_img)
+        binarized_imgs = [binarized_img]
+        if regions is not None:
+            binarized_imgs = self.image_processor.get_images_from_regions(regions, binarized_img)
+
+        ocr_text = (yield binarized_imgs, 1)[0]
+        return OCRResult(ocr_text, self._calculate_ocr_accuracy(ocr_text), None, 1)
+
+    def extract_text_batch(self, images: Iterable[Union[ImageLike, str]], max_workers: Optional[int] = None,
+                           max_in_flight: Optional[int] = None, collect_errors: bool = False) -> Iterator[OCRResult]:
+        """
+        Extracts text from many images, or image files, on a pool of worker processes. Images are read lazily
+        from `images` and at most `max_in_flight` of them are being processed at the same time, so the whole
+        collection is never loaded in memory.
+
+        Args:
+            images (Iterable[Union[ImageLike, str]]): The images, or the paths of the image files, from which
+                                                      text needs to be extracted. Files are loaded in the
+                                                      worker processes with ImageFilesManager.load_image.
+            max_workers (Optional[int]): The number of worker processes. If None, the number of CPUs is used.
+            max_in_flight (Optional[int]): The maximum number of images being processed at the same time.
+                                           If None, twice the number of worker processes is used.
+            collect_errors (bool): If True, an image that can not be loaded or processed gives an empty OCRResult
+                                   with its `error`, and the batch continues. If False, it stops the batch.
 
-            if ocr_accuracy > best_accuracy:
-                best_accuracy = ocr_accuracy
+        Returns:
+            Iterator[OCRResult]: The OCR results, in completion order. The source of each result is the file
+                                 path of the image, or its position in `images` if an image was given.
+
+        Raises:
+            OCRProcessorError: If the text of an image could not be extracted and collect_errors is False.
+        """
+        # Each worker runs the OCR passes of an image serially, the parallelism comes from the batch
+        worker_ocr_processor = copy.copy(self)
+        worker_ocr_processor.executor = None
+        worker_ocr_processor._executor = None
+
+        sources_and_images = ((image if isinstance(image, str) else index, image)
+                              for index, image in enumerate(images))
+
+        max_workers = max_workers or os.cpu_count() or 1
+        max_in_flight = max_in_flight or 2 * max_workers
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker,
+                                 initargs=(worker_ocr_processor,)) as executor:
+            for (source, _), future in bounded_imap_unordered(executor, _extract_text_in_batch_worker,
+                                                              sources_and_images, max_in_flight):
+                try:
+                    ocr_result = future.result()
+                except Exception as e:
+                    if not collect_errors:
+                        raise OCRProcessorError(f"Error extracting text from {source}: {e}") from e
+                    ocr_result = OCRResult('', (0, 0), None, 0, source=source, error=e)
+                yield ocr_result
+
+    def extract_text_from_paths(self, image_paths: Iterable[str], max_workers: Optional[int] = None,
+                                max_in_flight: Optional[int] = None,
+                                collect_errors: bool = False) -> Iterator[OCRResult]:
+        """
+        Extracts text from many image files on a pool of worker processes. See extract_text_batch.
+
+        Args:
+            image_paths (Iterable[str]): The paths of the image files from which text needs to be extracted.
+            max_workers (Optional[int]): The number of worker processes. If None, the number of CPUs is used.
+            max_in_flight (Optional[int]): The maximum number of images being processed at the same time.
+                                           If None, twice the number of worker processes is used.
+            collect_errors (bool): If True, a file that can not be loaded or processed gives an empty OCRResult
+                                   with its `error`, and the batch continues. If False, it stops the batch.
+
+        Returns:
+            Iterator[OCRResult]: The OCR results, in completion order, tagged with their file path.
+
+        Raises:
+            OCRProcessorError: If the text of an image could not be extracted and collect_errors is False.
+        """
+        return self.extract_text_batch(image_paths, max_workers, max_in_flight, collect_errors)
+
+    def extract_text_from_document(self, document_path: str, dpi: int = DEFAULT_DOCUMENT_DPI,
+                                   max_workers: Optional[int] = None,
+                                   max_in_flight: Optional[int] = None) -> Iterator[OCRResult]:
+        """
+        Extracts text from every page of a multi-page document (PDF or multi-page TIFF file), on a pool of
+        page worker threads. Pages are loaded lazily and in grayscale with ImageFilesManager.iter_document_pages,
+        and at most `max_in_flight` of them are in memory at the same time.
+
+        Threads are used instead of processes so pages are not copied to other processes. The OCR engine and
+        the image operations release the GIL while they run.
+
+        Args:
+            document_path (str): The file path of the document.
+            dpi (int): The resolution, in dots per inch, at which PDF pages are rendered.
+            max_workers (Optional[int]): The number of page worker threads. If None, the number of CPUs is used.
+            max_in_flight (Optional[int]): The maximum number of pages loaded or being processed at the same time.
+                                           If None, twice the number of page worker threads is used.
+
+        Returns:
+            Iterator[OCRResult]: The OCR results, in page order, tagged with the document path as source and
+                                 with their page index.
+
+        Raises:
+            OCRProcessorError: If a page could not be loaded or its text could not be extracted.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        max_in_flight = max_in_flight or 2 * max_workers
+
+        try:
+            pages = enumerate(ImageFilesManager.iter_document_pages(document_path, dpi, mode='L'))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for (page_index, _), future in bounded_imap(executor, lambda page: self.extract_text(page[1]),
+                                                            pages, max_in_flight):
+                    try:
+                        ocr_result = future.result()
+                    except Exception as e:
+                        raise OCRProcessorError(f"Error extracting text from page {page_index} of "
+                                                f"{document_path}: {e}") from e
+                    ocr_result.source = document_path
+                    ocr_result.page_index = page_index
+                    yield ocr_result
+        except (ImportError, OSError) as e:
+            raise OCRProcessorError(f"Error loading the pages of {document_path}: {e}") from e
+
+    @staticmethod
+    def _get_best_threshold(ocr_accuracies: Dict[int, Tuple[int, int]]) -> Optional[int]:
+        """
+        Returns the threshold with the best OCR accuracy. Thresholds are compared in ascending order,
+        so ties keep the lowest threshold.
+
+        Args:
+            ocr_accuracies (Dict[int, Tuple[int, int]]): The OCR accuracy for each threshold.
+
+        Returns:
+            Optional[int]: The best threshold, or None if no threshold has an accuracy better than (0, 0).
+        """
+        best_accuracy = (0, 0)
+        best_threshold = None
+        for threshold in sorted(ocr_accuracies):
+            if ocr_accuracies[threshold] > best_accuracy:
+                best_accuracy = ocr_accuracies[threshold]
                 best_threshold = threshold
-                text = ocr_text
+        return best_threshold
+
+    def _is_target_hit_ratio_reached(self, ocr_texts: Dict[int, str], ocr_accuracies: Dict[int, Tuple[int, int]],
+                                     thresholds: Iterable[int]) -> bool:
+        """
+        Checks if the OCR text of any of the given thresholds reached the target hit ratio.
+
+        Args:
+            ocr_texts (Dict[int, str]): The OCR text for each threshold.
+            ocr_accuracies (Dict[int, Tuple[int, int]]): The OCR accuracy for each threshold.
+            thresholds (Iterable[int]): The thresholds to check.
+
+        Returns:
+            bool: True if a target hit ratio is set and was reached, False otherwise.
+        """
+        if self.target_hit_ratio is None:
+            return False
+        for threshold in thresholds:
+            # The words are counted like in _calculate_ocr_accuracy, so punctuation alone is not a word
+            words_count = len(_WORD_PATTERN.findall(ocr_texts[threshold].lower()))
+            if words_count and ocr_accuracies[threshold][0] / words_count >= self.target_hit_ratio:
+                return True
+        return False
+
+    def _plan_thresholds(self, grayscale_img: np.ndarray) -> Generator[Sequence[int], Dict[int, Tuple[int, int]], None]:
+        """
+        Returns a generator with the thresholds to try according to the search strategy. The generator yields
+        the next thresholds to run OCR on and receives the OCR accuracy of every threshold tried so far.
+
+        Args:
+            grayscale_img (ndarray): The grayscale image from which text needs to be extracted.
+
+        Returns:
+            Generator[Sequence[int], Dict[int, Tuple[int, int]], None]: The thresholds planner.
+        """
+        if self.search_strategy == 'coarse_to_fine':
+            return self._plan_coarse_to_fine_thresholds()
+        if self.search_strategy == 'golden_section':
+            return self._plan_golden_section_thresholds()
+        if self.search_strategy == 'histogram':
+            return self._plan_histogram_thresholds(grayscale_img)
+        return self._plan_exhaustive_thresholds()
+
+    def _plan_exhaustive_thresholds(self) -> Generator[Sequence[int], Dict[int, Tuple[int, int]], None]:
+        """
+        Plans OCR passes on every threshold at once.
+        """
+        yield self.THRESHOLDS
+
+    def _plan_histogram_thresholds(self, grayscale_img: np.ndarray) -> Generator[Sequence[int],
+                                                                            Dict[int, Tuple[int, int]], None]:
+        """
+        Plans OCR passes on the thresholds computed from the histogram of the image at once. The dictionary
+        accuracy decides between them.
+        """
+        yield self.image_processor.get_histogram_thresholds(grayscale_img)
+
+    def _plan_coarse_to_fine_thresholds(self) -> Generator[Sequence[int], Dict[int, Tuple[int, int]], None]:
+        """
+        Plans OCR passes on two thresholds, at a third and at two thirds of the thresholds range, then on one
+        threshold at a time, halfway between the best threshold and the farthest of its tried neighbors (or
+        of the ends of the 0-256 range). It stops as soon as a threshold does not improve the best accuracy,
+        or the next threshold would be closer than MIN_THRESHOLD_STEP to the best one.
+        """
+        low, high = self.THRESHOLDS[0], self.THRESHOLDS[-1]
+        ocr_accuracies = yield round(low + (high - low) / 3), round(high - (high - low) / 3)
+
+        best_threshold = self._get_best_threshold(ocr_accuracies)
+        while best_threshold is not None:
+            tried_thresholds = [0] + sorted(ocr_accuracies) + [256]
+            best_index = tried_thresholds.index(best_threshold)
+            left, right = tried_thresholds[best_index - 1], tried_thresholds[best_index + 1]
+            if best_threshold - left > right - best_threshold:
+                probe = (best_threshold + left) // 2
+            else:
+                probe = (best_threshold + right) // 2
+            if abs(probe - best_threshold) < self.MIN_THRESHOLD_STEP:
+                return
+
+            ocr_accuracies = yield probe,
+            if ocr_accuracies[probe] <= ocr_accuracies[best_threshold]:
+                return
+            best_threshold = probe
+
+    def _plan_golden_section_thresholds(self) -> Generator[Sequence[int], Dict[int, Tuple[int, int]], None]:
+        """
+        Plans OCR passes following a golden-section search for the maximum accuracy between the lowest and
+        the highest thresholds. It stops as soon as a probed threshold does not improve the best accuracy,
+        or the search interval is narrower than the thresholds grid step.
+        """
+        inverse_golden_ratio = (math.sqrt(5) - 1) / 2
+        tolerance = self.THRESHOLDS[1] - self.THRESHOLDS[0]
+        low, high = self.THRESHOLDS[0], self.THRESHOLDS[-1]
+        left = round(high - inverse_golden_ratio * (high - low))
+        right = round(low + inverse_golden_ratio * (high - low))
+        ocr_accuracies = yield left, right
+
+        while high - low > tolerance:
+            best_accuracy = max(ocr_accuracies.values())
+            if ocr_accuracies[left] >= ocr_accuracies[right]:
+                high, right = right, left
+                left = round(high - inverse_golden_ratio * (high - low))
+                probe = left
+            else:
+                low, left = left, right
+                right = round(low + inverse_golden_ratio * (high - low))
+                probe = right
+            if left >= right:
+                return
+            ocr_accuracies = yield probe,
+            if ocr_accuracies[probe] <= best_accuracy:
+                return
+
+    def _binarize_for_ocr_passes(self, grayscale_imgs: Sequence[np.ndarray],
+                                 thresholds: Sequence[int]) -> list[ImageLike]:
+        """
+        Binarizes the grayscale images with every threshold.
+
+        Args:
+            grayscale_imgs (Sequence[ndarray]): The grayscale image, or the crops of its text regions in reading
+                                                order, from which text needs to be extracted.
+            thresholds (Sequence[int]): The thresholds of the OCR passes.
+
+        Returns:
+            list[ImageLike]: The binarized images, ordered by image, then by threshold.
+        """
+        return [binarized_img for grayscale_img in grayscale_imgs
+                for binarized_img in self.image_processor.binarize_images(grayscale_img, thresholds)]
+
+    def _extract_texts(self, binarized_imgs: Sequence[ImageLike], passes_count: int) -> list[str]:
+        """
+        Extracts the text of the binarized images of one or more OCR passes, concurrently if an executor mode
+        is set. The images are the crops of the text regions in reading order, or the whole image, each
+        binarized for every pass.
+
+        Args:
+            binarized_imgs (Sequence[ImageLike]): The binarized images, ordered by crop, then by pass.
+            passes_count (int): The number of OCR passes.
+
+        Returns:
+            list[str]: The text of each pass. The texts of several crops are joined with blank lines.
+        """
+        if self.executor is None or len(binarized_imgs) < 2:
+            ocr_texts = [self.ocr_backend.image_to_string(binarized_img) for binarized_img in binarized_imgs]
+        else:
+            ocr_texts = list(self._get_executor().map(self.ocr_backend.image_to_string, binarized_imgs))
+        return self._join_regions_texts(ocr_texts, passes_count)
+
+    async def _extract_texts_async(self, binarized_imgs: Sequence[ImageLike], passes_count: int,
+                                   semaphore: asyncio.Semaphore, executor: Optional[Executor]) -> list[str]:
+        """
+        Extracts the text of the binarized images of one or more OCR passes concurrently, like _extract_texts,
+        with IOCRBackend.image_to_string_async.
+
+        Args:
+            binarized_imgs (Sequence[ImageLike]): The binarized images, ordered by crop, then by pass.
+            passes_count (int): The number of OCR passes.
+            semaphore (asyncio.Semaphore): The semaphore limiting the number of OCR passes running at once.
+            executor (Optional[Executor]): The executor given to the OCR backend.
+
+        Returns:
+            list[str]: The text of each pass. The texts of several crops are joined with blank lines.
+        """
+        async def image_to_string(binarized_img: ImageLike) -> str:
+            async with semaphore:
+                return await self.ocr_backend.image_to_string_async(binarized_img, executor=executor)
+
+        ocr_texts = await asyncio.gather(*(image_to_string(binarized_img) for binarized_img in binarized_imgs))
+        return self._join_regions_texts(ocr_texts, passes_count)
+
+    @staticmethod
+    def _join_regions_texts(ocr_texts: Sequence[str], passes_count: int) -> list[str]:
+        """
+        Joins the texts of the crops of every OCR pass, in reading order, separated by blank lines.
+
+        Args:
+            ocr_texts (Sequence[str]): The texts of the binarized images, ordered by crop, then by pass.
+            passes_count (int): The number of OCR passes.
+
+        Returns:
+            list[str]: The text of each pass. Texts of passes on the whole image are returned as they are.
+        """
+        if len(ocr_texts) == passes_count:
+            return list(ocr_texts)
 
-        return OCRResult(text, best_accuracy, best_threshold)
+        passes_texts = []
+        for pass_index in range(passes_count):
+            region_texts = (ocr_text.strip() for ocr_text in ocr_texts[pass_index::passes_count])
+            passes_texts.append('\n\n'.join(region_text for region_text in region_texts if region_text))
+        return passes_texts
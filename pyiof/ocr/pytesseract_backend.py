@@ -0,0 +1,114 @@
+import asyncio
+import io
+import shlex
+from concurrent.futures import Executor
+from typing import Optional
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from pyiof.img_processing.interfaces.iimage_processor import ImageLike
+from pyiof.ocr.interfaces.iocr_backend import IOCRBackend
+from pyiof.utils.concurrency_utils import run_in_executor
+
+
+class PytesseractBackend(IOCRBackend):
+    """
+    OCR backend that runs the tesseract command line program through pytesseract.
+    Every call starts a new tesseract process, which loads the language model again.
+
+    Attributes:
+        lang (Optional[str]): The tesseract language. If None, the tesseract default is used.
+        config (str): Additional tesseract command line options.
+    """
+
+    def __init__(self, lang: Optional[str] = None, config: str = ''):
+        """
+        Initializes the PytesseractBackend.
+
+        Parameters:
+            lang (Optional[str]): The tesseract language. If None, the tesseract default is used.
+            config (str): Additional tesseract command line options.
+        """
+        self.lang = lang
+        self.config = config
+
+    def image_to_string(self, image: ImageLike) -> str:
+        """
+        Extracts the text of the given image with a new tesseract process. The image is written to a
+        temporary file for the tesseract program.
+
+        Parameters:
+            image (ImageLike): The image (PIL Image or numpy array) from which text needs to be extracted.
+
+        Returns:
+            str: The text found in the image.
+        """
+        return pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+    async def image_to_string_async(self, image: ImageLike, executor: Optional[Executor] = None) -> str:
+        """
+        Extracts the text of the given image with a new tesseract process run as an asyncio subprocess, so the
+        event loop is not blocked while tesseract runs. The image is piped to tesseract, without a temporary
+        file. If the awaiting task is cancelled, the tesseract process is killed.
+
+        Parameters:
+            image (ImageLike): The image (PIL Image or numpy array) from which text needs to be extracted.
+            executor (Optional[Executor]): The executor encoding the image. If None, the default executor of
+                                           the event loop is used.
+
+        Returns:
+            str: The text found in the image.
+
+        Raises:
+            pytesseract.TesseractNotFoundError: If the tesseract program is not found.
+            pytesseract.TesseractError: If tesseract fails.
+        """
+        encoded_image = await run_in_executor(self._encode_image, image, executor=executor)
+
+        tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+        cmd_args = [tesseract_cmd, 'stdin', 'stdout']
+        if self.lang is not None:
+            cmd_args += ['-l', self.lang]
+        cmd_args += shlex.split(self.config)
+
+        try:
+            process = await asyncio.create_subprocess_exec(*cmd_args, stdin=asyncio.subprocess.PIPE,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE)
+        except FileNotFoundError as e:
+            raise pytesseract.TesseractNotFoundError() from e
+
+        try:
+            stdout, stderr = await process.communicate(encoded_image)
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode:
+            raise pytesseract.TesseractError(process.returncode, pytesseract.pytesseract.get_errors(stderr))
+        return stdout.decode('utf-8')
+
+    @staticmethod
+    def _encode_image(image: ImageLike) -> bytes:
+        """
+        Encodes the image for the standard input of tesseract. Grayscale arrays, like the binarized images of
+        OCRProcessor, are encoded as uncompressed PGM, and other images as PNG.
+
+        Parameters:
+            image (ImageLike): The image to be encoded.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        if isinstance(image, np.ndarray) and image.ndim == 2 and image.dtype == np.uint8:
+            height, width = image.shape
+            return f'P5\n{width} {height}\n255\n'.encode('ascii') + np.ascontiguousarray(image).tobytes()
+
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        with io.BytesIO() as buffer:
+            image.save(buffer, format='PNG')
+            return buffer.getvalue()
@@ -0,0 +1,92 @@
+import threading
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from pyiof.img_processing.interfaces.iimage_processor import ImageLike
+from pyiof.ocr.interfaces.iocr_backend import IOCRBackend
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Tesseract APIs are not thread safe, so each thread keeps its own APIs. They live at module level
+# so they are shared by every backend instance of a thread or of a worker process.
+_thread_local = threading.local()
+
+
+class TesserocrBackend(IOCRBackend):
+    """
+    OCR backend that calls the tesseract C API through tesserocr. The language model is loaded once per
+    thread and kept in memory, instead of starting a tesseract process for every image.
+
+    Attributes:
+        lang (str): The tesseract language.
+        path (Optional[str]): The tessdata directory. If None, the tesseract default is used.
+        psm (Optional[int]): The tesseract page segmentation mode. If None, the tesseract default is used.
+    """
+
+    def __init__(self, lang: str = 'eng', path: Optional[str] = None, psm: Optional[int] = None):
+        """
+        Initializes the TesserocrBackend.
+
+        Parameters:
+            lang (str): The tesseract language.
+            path (Optional[str]): The tessdata directory. If None, the tesseract default is used.
+            psm (Optional[int]): The tesseract page segmentation mode. If None, the tesseract default is used.
+
+        Raises:
+            ImportError: If tesserocr is not installed.
+        """
+        if tesserocr is None:
+            raise ImportError("tesserocr is required to use TesserocrBackend. Install it with "
+                              "'pip install tesserocr' or use PytesseractBackend instead.")
+        self.lang = lang
+        self.path = path
+        self.psm = psm
+
+    def _get_api(self):
+        """
+        Returns the tesseract API of the current thread for this backend settings, creating it on first use.
+
+        Returns:
+            tesserocr.PyTessBaseAPI: The tesseract API with the language model loaded.
+        """
+        apis = getattr(_thread_local, 'apis', None)
+        if apis is None:
+            apis = _thread_local.apis = {}
+
+        key = (self.lang, self.path, self.psm)
+        api = apis.get(key)
+        if api is None:
+            kwargs = {'lang': self.lang}
+            if self.path is not None:
+                kwargs['path'] = self.path
+            if self.psm is not None:
+                kwargs['psm'] = self.psm
+            api = apis[key] = tesserocr.PyTessBaseAPI(**kwargs)
+        return api
+
+    def image_to_string(self, image: ImageLike) -> str:
+        """
+        Extracts the text of the given image with the resident tesseract API of the current thread.
+        Grayscale uint8 numpy arrays are given to tesseract as raw pixels, without encoding them.
+
+        Parameters:
+            image (ImageLike): The image (PIL Image or numpy array) from which text needs to be extracted.
+
+        Returns:
+            str: The text found in the image.
+        """
+        api = self._get_api()
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2 and image.dtype == np.uint8:
+                image = np.ascontiguousarray(image)
+                height, width = image.shape
+                api.SetImageBytes(image.tobytes(), width, height, 1, width)
+                return api.GetUTF8Text()
+            image = Image.fromarray(image)
+        api.SetImage(image)
+        return api.GetUTF8Text()
@@ -1,13 +1,25 @@
 import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+HASH_BUFFER_SIZE = 1024 * 1024
 
 
 def calculate_md5(file_path: str):
     """
     Calculate the MD5 checksum of a file.
 
-    This function reads the file specified by `file_path` in binary mode, processes it in chunks to
+    This function reads the file specified by `file_path` in binary mode, processes it in large chunks to
     efficiently handle large files, and calculates the MD5 checksum of its contents.
 
     Args:
@@ -16,11 +28,115 @@ def calculate_md5(file_path: str):
     Returns:
         str: The hexadecimal MD5 checksum string of the file's contents.
     """
-    hash_md5 = hashlib.md5()
+    return calculate_file_hash(file_path, 'md5')
+
+
+def calculate_file_hash(file_path: str, algorithm: str = 'md5') -> str:
+    """
+    Calculate the hash of a file with the given algorithm.
+
+    The file is hashed with `hashlib.file_digest` when available (Python 3.11+), which reads it with its own
+    buffer. Otherwise it is read in HASH_BUFFER_SIZE (1 MiB) chunks into a reused buffer. hashlib releases
+    the GIL while hashing large chunks, so several files can be hashed in parallel threads
+    (see `calculate_files_hashes`).
+
+    Args:
+        file_path (str): The path to the file whose hash is to be calculated.
+        algorithm (str): Any algorithm supported by `hashlib.new` (e.g. 'md5', 'sha256', 'blake2b'), or an
+                         xxHash algorithm ('xxh64', 'xxh3_64', 'xxh3_128') if the xxhash package is installed.
+
+    Returns:
+        str: The hexadecimal hash string of the file's contents.
+
+    Raises:
+        ValueError: If the algorithm is not supported.
+        ImportError: If an xxHash algorithm is requested and xxhash is not installed.
+    """
+    hasher = _new_hasher(algorithm)
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, lambda: hasher).hexdigest()
+
+        buffer = bytearray(HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while size := f.readinto(buffer):
+            hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def calculate_files_hashes(file_paths: Iterable[str], algorithm: str = 'md5',
+                           max_workers: Optional[int] = None) -> dict[str, str]:
+    """
+    Calculate the hashes of many files in parallel on a thread pool.
+
+    Args:
+        file_paths (Iterable[str]): The paths to the files whose hashes are to be calculated.
+        algorithm (str): The hash algorithm. See `calculate_file_hash`.
+        max_workers (Optional[int]): The maximum number of threads. If None, the thread pool default is used.
+
+    Returns:
+        dict[str, str]: The hexadecimal hash string of each file, by file path.
+    """
+    file_paths = list(file_paths)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        file_hashes = executor.map(calculate_file_hash, file_paths, [algorithm] * len(file_paths))
+        return dict(zip(file_paths, file_hashes))
+
+
+def _new_hasher(algorithm: str):
+    """
+    Creates a new hash object for the given algorithm.
+
+    Args:
+        algorithm (str): The hash algorithm. See `calculate_file_hash`.
+
+    Returns:
+        A hash object with `update` and `hexdigest` methods.
+
+    Raises:
+        ValueError: If the algorithm is not supported.
+        ImportError: If an xxHash algorithm is requested and xxhash is not installed.
+    """
+    if algorithm.startswith('xxh'):
+        if xxhash is None:
+            raise ImportError(f"xxhash is required to use the {algorithm} algorithm. "
+                              f"Install it with 'pip install xxhash'")
+        if not hasattr(xxhash, algorithm):
+            raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+        return getattr(xxhash, algorithm)()
+    try:
+        return hashlib.new(algorithm)
+    except ValueError as e:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}") from e
+
+
+def calculate_image_hash(image: Union[Image.Image, np.ndarray]) -> str:
+    """
+    Calculate a hash of the content of an image.
+
+    The hash covers the image mode, size and pixel data, and the palette and the transparency of palette
+    images, so two images with the same pixels have the same hash whatever file they were loaded from.
+    Numpy arrays are hashed from their buffer (dtype, shape and data), without a copy when they are contiguous.
+
+    Args:
+        image (Union[Image.Image, np.ndarray]): The image whose hash is to be calculated.
+
+    Returns:
+        str: The hexadecimal BLAKE2b hash of the image content.
+    """
+    image_hash = hashlib.blake2b(digest_size=20)
+    if isinstance(image, np.ndarray):
+        image_hash.update(f'{image.dtype}{image.shape}'.encode())
+        image_hash.update(np.ascontiguousarray(image).data)
+    else:
+        image_hash.update(f'{image.mode}{image.size}'.encode())
+        image_hash.update(image.tobytes())
+        # Palette images store indices, their colors are in the palette
+        palette = image.getpalette()
+        if palette is not None:
+            image_hash.update(bytes(palette))
+            image_hash.update(repr(image.info.get('transparency')).encode())
+    return image_hash.hexdigest()
 
 
 def get_resources_dir() -> str:
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, as_completed, wait
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+def bounded_imap(executor: Executor, fn: Callable, items: Iterable, max_in_flight: int) -> Iterator[Tuple[Any, Future]]:
+    """
+    Submits `fn(item)` to the executor for every item, keeping at most `max_in_flight` items submitted
+    and not yet yielded, and yields the items with their futures in the order of `items`.
+
+    Items are read lazily from `items`, so it can be a generator over a large collection. The futures
+    yielded may not be completed yet.
+
+    Args:
+        executor (Executor): The executor that runs `fn`.
+        fn (Callable): The function to run on each item.
+        items (Iterable): The items to process.
+        max_in_flight (int): The maximum number of items submitted at the same time.
+
+    Returns:
+        Iterator[Tuple[Any, Future]]: The items with their futures, in the order of `items`.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft()
+        pending.append((item, executor.submit(fn, item)))
+
+    while pending:
+        yield pending.popleft()
+
+
+def bounded_imap_unordered(executor: Executor, fn: Callable, items: Iterable,
+                           max_in_flight: int) -> Iterator[Tuple[Any, Future]]:
+    """
+    Submits `fn(item)` to the executor for every item, keeping at most `max_in_flight` items submitted
+    and not yet yielded, and yields the items with their futures as they complete.
+
+    Items are read lazily from `items`, so it can be a generator over a large collection.
+
+    Args:
+        executor (Executor): The executor that runs `fn`.
+        fn (Callable): The function to run on each item.
+        items (Iterable): The items to process.
+        max_in_flight (int): The maximum number of items submitted at the same time.
+
+    Returns:
+        Iterator[Tuple[Any, Future]]: The items with their completed futures, in completion order.
+    """
+    pending = {}
+    for item in items:
+        if len(pending) >= max_in_flight:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+        pending[executor.submit(fn, item)] = item
+
+    for future in as_completed(pending):
+        yield pending[future], future
+
+
+async def run_in_executor(fn: Callable, *args, executor: Optional[Executor] = None,
+                          semaphore: Optional[asyncio.Semaphore] = None, **kwargs) -> Any:
+    """
+    Runs `fn(*args, **kwargs)` on an executor without blocking the event loop, after acquiring the semaphore
+    if one is given.
+
+    Cancelling the awaiting task does not interrupt `fn` if it is already running, but its result is dropped
+    and the semaphore is released.
+
+    Args:
+        fn (Callable): The blocking function to run.
+        *args: The positional arguments of `fn`.
+        executor (Optional[Executor]): The executor that runs `fn`. If None, the default executor of the
+                                       event loop is used.
+        semaphore (Optional[asyncio.Semaphore]): A semaphore limiting the number of concurrent calls, shared
+                                                 by the callers to be limited together.
+        **kwargs: The keyword arguments of `fn`.
+
+    Returns:
+        Any: The result of `fn`.
+    """
+    call = functools.partial(fn, *args, **kwargs)
+    if semaphore is None:
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+    async with semaphore:
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
@@ -0,0 +1,93 @@
+from typing import Iterable
+
+import numpy as np
+
+
+def regions_to_array(regions: Iterable) -> np.ndarray:
+    """
+    Converts regions, given as (x, y, width, height) sequences, to a compact array.
+
+    Args:
+        regions (Iterable): The regions, such as a list of tuples or the output of detectMultiScale.
+
+    Returns:
+        ndarray: An int32 array of shape (N, 4).
+    """
+    regions = np.asarray(regions if len(regions) else np.empty((0, 4)), dtype=np.int32)
+    return regions.reshape(-1, 4)
+
+
+def get_regions_iou(regions: np.ndarray) -> np.ndarray:
+    """
+    Computes the intersection over union (IoU) of every pair of regions.
+
+    Args:
+        regions (ndarray): An array of shape (N, 4) with (x, y, width, height) regions.
+
+    Returns:
+        ndarray: A float array of shape (N, N) with the IoU of each pair of regions.
+    """
+    x1, y1 = regions[:, 0], regions[:, 1]
+    x2, y2 = x1 + regions[:, 2], y1 + regions[:, 3]
+    areas = (regions[:, 2] * regions[:, 3]).astype(np.float64)
+
+    intersection_width = np.clip(np.minimum(x2[:, None], x2) - np.maximum(x1[:, None], x1), 0, None)
+    intersection_height = np.clip(np.minimum(y2[:, None], y2) - np.maximum(y1[:, None], y1), 0, None)
+    intersections = intersection_width * intersection_height
+    unions = areas[:, None] + areas - intersections
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(unions > 0, intersections / unions, 0.0)
+
+
+def merge_overlapping_regions(regions: np.ndarray, overlap_threshold: float) -> np.ndarray:
+    """
+    Merges overlapping regions with non-maximum suppression: regions are visited from the largest to the
+    smallest, and every region whose IoU with an already kept region is greater than the threshold is dropped.
+
+    Args:
+        regions (ndarray): An array of shape (N, 4) with (x, y, width, height) regions.
+        overlap_threshold (float): The IoU above which two regions are considered the same (0 to 1).
+
+    Returns:
+        ndarray: An int32 array of shape (M, 4) with the kept regions, in their original order.
+    """
+    regions = regions_to_array(regions)
+    if len(regions) < 2:
+        return regions
+
+    ious = get_regions_iou(regions)
+    order = np.argsort(-(regions[:, 2] * regions[:, 3]), kind='stable')
+    suppressed = np.zeros(len(regions), dtype=bool)
+    for index in order:
+        if suppressed[index]:
+            continue
+        overlapping = ious[index] > overlap_threshold
+        overlapping[index] = False
+        suppressed |= overlapping
+
+    return regions[~suppressed]
+
+
+def sort_regions_in_reading_order(regions: Iterable) -> np.ndarray:
+    """
+    Sorts regions in reading order: lines from top to bottom, and regions from left to right in each line.
+    A region is in the same line as the top region of the line if its vertical center is above the bottom
+    of that region.
+
+    Args:
+        regions (Iterable): The regions, as (x, y, width, height) sequences.
+
+    Returns:
+        ndarray: An int32 array of shape (N, 4) with the regions in reading order.
+    """
+    regions = regions_to_array(regions)
+    lines = []
+    line_bottom = None
+    for region in regions[np.argsort(regions[:, 1], kind='stable')]:
+        if line_bottom is None or region[1] + region[3] / 2 > line_bottom:
+            lines.append([])
+            line_bottom = region[1] + region[3]
+        lines[-1].append(region)
+
+    sorted_regions = [region for line in lines for region in sorted(line, key=lambda line_region: line_region[0])]
+    return regions_to_array(sorted_regions)
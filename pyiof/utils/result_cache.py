@@ -0,0 +1,236 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Two-tier cache for processing results: an in-memory LRU tier and an optional on-disk tier bounded
+    in size. Results are stored by key, usually built with `make_key` from a hash of the image content
+    and the processing parameters.
+
+    Attributes:
+        max_entries (int): The maximum number of results kept in memory.
+        cache_dir (Optional[str]): The directory of the on-disk tier. If None, results are only kept in memory.
+        max_disk_bytes (int): The maximum size in bytes of the on-disk tier. The least recently used results
+                              are deleted when it is exceeded. The size is tracked in memory, so files written
+                              by other processes sharing cache_dir are only counted at the next eviction.
+        _memory_cache (OrderedDict): The in-memory results, the most recently used last.
+        _lock (threading.Lock): Lock protecting the in-memory tier.
+        _disk_bytes (Optional[int]): The size of the on-disk tier, counted when the directory was last scanned
+                                     plus the files written since then, or None before the first scan.
+        _disk_lock (threading.Lock): Lock protecting the size of the on-disk tier and its eviction.
+    """
+
+    # When the on-disk tier exceeds max_disk_bytes, it is shrunk to this fraction of it, so the directory is
+    # only scanned once for many writes
+    DISK_EVICTION_RATIO = 0.8
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Initializes the ResultCache.
+
+        Args:
+            max_entries (int): The maximum number of results kept in memory.
+            cache_dir (Optional[str]): The directory of the on-disk tier. It is created if it does not exist.
+                                       If None, results are only kept in memory.
+            max_disk_bytes (int): The maximum size in bytes of the on-disk tier.
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory_cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self._disk_lock = threading.Lock()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_disk_lock']
+        # Other processes write to the on-disk tier too, so it is scanned again
+        state['_disk_bytes'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Builds a cache key from the given parts, which must have a stable representation.
+
+        Args:
+            *parts (Any): The parts of the key, such as an image hash and processing parameters.
+
+        Returns:
+            str: The hexadecimal key.
+        """
+        return hashlib.blake2b(repr(parts).encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the result stored for the key, looking in memory first and then on disk.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Any]: The stored result, or None if there is no result for the key.
+        """
+        with self._lock:
+            if key in self._memory_cache:
+                self._memory_cache.move_to_end(key)
+                return self._memory_cache[key]
+
+        if self.cache_dir is None:
+            return None
+
+        result_file = self._get_result_file(key)
+        try:
+            with open(result_file, 'rb') as f:
+                result = pickle.load(f)
+            # The modification time tracks the last use for the eviction of the on-disk tier
+            os.utime(result_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        self._set_in_memory(key, result)
+        return result
+
+    def set(self, key: str, result: Any):
+        """
+        Stores a result for the key in memory and, if the on-disk tier is enabled, on disk. Errors writing to
+        disk, such as a full or read-only cache directory, are logged and the result is only kept in memory.
+
+        Args:
+            key (str): The cache key.
+            result (Any): The result to store. It must be picklable if the on-disk tier is enabled.
+        """
+        self._set_in_memory(key, result)
+        if self.cache_dir is None:
+            return
+
+        try:
+            self._set_on_disk(key, result)
+        except OSError as e:
+            logger.warning("Could not write the result %s to the cache directory %s: %s", key, self.cache_dir, e)
+
+    def _set_on_disk(self, key: str, result: Any):
+        """
+        Writes a result for the key to the on-disk tier, atomically, and evicts the least recently used results
+        if the on-disk tier exceeds max_disk_bytes.
+
+        Args:
+            key (str): The cache key.
+            result (Any): The result to store.
+
+        Raises:
+            OSError: If the result could not be written.
+        """
+        result_file = self._get_result_file(key)
+        file_descriptor, temp_file = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                written_bytes = f.tell()
+            replaced_bytes = os.path.getsize(result_file) if os.path.exists(result_file) else 0
+            os.replace(temp_file, result_file)
+        except OSError:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += written_bytes - replaced_bytes
+            if self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes:
+                self._evict_from_disk()
+
+    def clear(self):
+        """
+        Removes all the results from memory and from disk.
+        """
+        with self._lock:
+            self._memory_cache.clear()
+        if self.cache_dir is not None:
+            with self._disk_lock:
+                for result_file in self._list_result_files():
+                    os.remove(result_file)
+                self._disk_bytes = 0
+
+    def _set_in_memory(self, key: str, result: Any):
+        """
+        Stores a result in the in-memory tier, evicting the least recently used results beyond max_entries.
+
+        Args:
+            key (str): The cache key.
+            result (Any): The result to store.
+        """
+        with self._lock:
+            self._memory_cache[key] = result
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.max_entries:
+                self._memory_cache.popitem(last=False)
+
+    def _get_result_file(self, key: str) -> str:
+        """
+        Returns the path of the on-disk result file of a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The path of the result file.
+        """
+        return os.path.join(self.cache_dir, f'{key}.pickle')
+
+    def _list_result_files(self) -> list[str]:
+        """
+        Lists the result files of the on-disk tier.
+
+        Returns:
+            list[str]: The paths of the result files.
+        """
+        return [os.path.join(self.cache_dir, file_name) for file_name in os.listdir(self.cache_dir)
+                if file_name.endswith('.pickle')]
+
+    def _evict_from_disk(self):
+        """
+        Scans the on-disk tier and, if it exceeds max_disk_bytes, deletes the least recently used result files
+        until it fits in DISK_EVICTION_RATIO of max_disk_bytes. The size of the remaining files is kept, so
+        the next writes do not scan the directory until the size is exceeded again. It must be called with
+        the disk lock held.
+        """
+        result_files = []
+        for result_file in self._list_result_files():
+            try:
+                stat = os.stat(result_file)
+            except FileNotFoundError:
+                continue
+            result_files.append((stat.st_mtime, stat.st_size, result_file))
+
+        total_bytes = sum(size for _, size, _ in result_files)
+        target_bytes = self.max_disk_bytes if total_bytes <= self.max_disk_bytes \
+            else self.max_disk_bytes * self.DISK_EVICTION_RATIO
+        for _, size, result_file in sorted(result_files):
+            if total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(result_file)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+        self._disk_bytes = total_bytes
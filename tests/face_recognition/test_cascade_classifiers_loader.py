@@ -1,3 +1,6 @@
+import os
+import shutil
+
 import pytest
 from unittest.mock import patch, MagicMock
 from pyiof.face_recognition.cascade_classifiers_loader import CascadeClassifiersLoader
@@ -23,3 +26,29 @@ def test_load_cascade_classifiers_file_not_found():
 
         with pytest.raises(FileNotFoundError):
             loader.load_cascade_classifiers()
+
+
+def test_load_shared_cascade_classifiers():
+    loader = CascadeClassifiersLoader(shared=True)
+    classifiers = loader.load_cascade_classifiers()
+
+    assert len(classifiers) == 2
+    assert all(not classifier.empty() for classifier in classifiers)
+    # Other loaders of the same thread get the same classifiers
+    assert CascadeClassifiersLoader(shared=True).load_cascade_classifiers() == classifiers
+
+
+def test_cache_identity_changes_with_classifier_file(tmp_path):
+    frontal_classifier_file, profile_classifier_file = CascadeClassifiersLoader().face_cascade_classifier_files
+    classifier_file = shutil.copy(frontal_classifier_file, tmp_path / 'classifier.xml')
+    loader = CascadeClassifiersLoader([str(classifier_file)])
+
+    cache_identity = loader.cache_identity()
+    assert loader.cache_identity() == cache_identity
+    assert CascadeClassifiersLoader([str(classifier_file)]).cache_identity() == cache_identity
+
+    # Replaced in place, with another modification time and size
+    shutil.copy(profile_classifier_file, classifier_file)
+    stat_result = os.stat(classifier_file)
+    os.utime(classifier_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert loader.cache_identity() != cache_identity
@@ -0,0 +1,45 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from pyiof.face_recognition.cascade_classifiers_registry import CascadeClassifiersRegistry
+from pyiof.utils.common_utils import get_resources_dir
+
+
+@pytest.fixture
+def classifier_file(tmp_path):
+    default_classifier_file = os.path.join(get_resources_dir(), 'haarcascades', 'haarcascade_frontalface_default.xml')
+    return shutil.copy(default_classifier_file, tmp_path / 'classifier.xml')
+
+
+def test_one_classifier_per_thread(classifier_file):
+    registry = CascadeClassifiersRegistry()
+    classifier = registry.get_cascade_classifier(classifier_file)
+
+    assert not classifier.empty()
+    assert registry.get_cascade_classifier(classifier_file) is classifier
+
+    other_thread_classifiers = []
+    thread = threading.Thread(
+        target=lambda: other_thread_classifiers.append(registry.get_cascade_classifier(classifier_file)))
+    thread.start()
+    thread.join()
+    assert other_thread_classifiers[0] is not classifier
+    assert not other_thread_classifiers[0].empty()
+
+
+def test_changed_classifier_file_is_reloaded(classifier_file):
+    registry = CascadeClassifiersRegistry()
+    classifier = registry.get_cascade_classifier(classifier_file)
+
+    with open(classifier_file, 'a') as f:
+        f.write('\n')
+
+    assert registry.get_cascade_classifier(classifier_file) is not classifier
+
+
+def test_classifier_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        CascadeClassifiersRegistry().get_cascade_classifier('nonexistent_file.xml')
@@ -1,8 +1,18 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 import pytest
+from PIL import Image
 
 from pyiof.face_recognition.face_recognizer import FaceRecognizer
 from pyiof.models.face_recognition_result import FaceRecognitionResult
 from pyiof.face_recognition.cascade_classifiers_loader import CascadeClassifiersLoader
+from pyiof.utils.common_utils import get_test_resources_dir
+from pyiof.utils.result_cache import ResultCache
 
 
 @pytest.fixture
@@ -15,6 +25,22 @@ def face_recognizer(cascade_classifiers_loader, image_processor):
     return FaceRecognizer(face_classifiers_loader=cascade_classifiers_loader, image_processor=image_processor)
 
 
+@pytest.fixture
+def mock_cascade_classifiers_loader():
+    def make_cascade_classifiers_loader(*classifiers_detections):
+        """Returns a mock loader of one mock classifier per list of detections, returned by detectMultiScale."""
+        cascade_classifiers = []
+        for detections in classifiers_detections:
+            cascade_classifier = MagicMock()
+            cascade_classifier.detectMultiScale.return_value = detections
+            cascade_classifiers.append(cascade_classifier)
+        cascade_classifiers_loader = MagicMock()
+        cascade_classifiers_loader.load_cascade_classifiers.return_value = cascade_classifiers
+        return cascade_classifiers_loader
+
+    return make_cascade_classifiers_loader
+
+
 @pytest.fixture
 def image_with_faces(image_files_manager, scientists_image_path):
     return image_files_manager.load_image(scientists_image_path)
@@ -29,3 +55,166 @@ def test_get_face_recognition_result(face_recognizer, image_with_faces):
     assert len(fr_result.faces_regions) == 29
     assert fr_result.scale_factor == scale_factor
     assert fr_result.min_neighbors == min_neighbors
+
+
+def test_get_faces_regions_with_cache(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(10, 10, 20, 20)])
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor, cache=ResultCache())
+    image = Image.new('RGB', (50, 50))
+
+    fr_result = face_recognizer.get_faces_regions(image)
+    cached_fr_result = face_recognizer.get_faces_regions(image)
+    other_parameters_fr_result = face_recognizer.get_faces_regions(image, min_neighbors=5)
+
+    cascade_classifier, = cascade_classifiers_loader.load_cascade_classifiers.return_value
+    assert cascade_classifier.detectMultiScale.call_count == 2
+    assert cached_fr_result.faces_regions.tolist() == fr_result.faces_regions.tolist()
+    assert other_parameters_fr_result.min_neighbors == 5
+
+
+def test_cache_key_depends_on_cascade_classifiers(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader()
+    cascade_classifiers_loader.cache_identity.return_value = 'classifier.xml:1'
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor, cache=ResultCache())
+    image = Image.new('RGB', (50, 50))
+
+    cache_key = face_recognizer._get_cache_key(image)
+    assert face_recognizer._get_cache_key(image) == cache_key
+    cascade_classifiers_loader.cache_identity.return_value = 'classifier.xml:2'
+    assert face_recognizer._get_cache_key(image) != cache_key
+
+
+def test_get_faces_regions_from_np_array(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(10, 10, 20, 20)])
+    cascade_classifier, = cascade_classifiers_loader.load_cascade_classifiers.return_value
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor)
+    gray_array = np.zeros((50, 50), dtype=np.uint8)
+
+    rgb_fr_result = face_recognizer.get_faces_regions(np.zeros((50, 50, 3), dtype=np.uint8))
+    gray_fr_result = face_recognizer.get_faces_regions(gray_array)
+
+    assert cascade_classifier.detectMultiScale.call_args_list[0].args[0].shape == (50, 50)
+    # Grayscale arrays are searched without a copy
+    assert cascade_classifier.detectMultiScale.call_args_list[1].args[0] is gray_array
+    assert rgb_fr_result.faces_regions.tolist() == gray_fr_result.faces_regions.tolist() == [[10, 10, 20, 20]]
+
+
+def test_get_faces_regions_from_several_threads(image_processor, image_files_manager):
+    face_recognizer = FaceRecognizer(CascadeClassifiersLoader(shared=True), image_processor)
+    image_path = os.path.join(get_test_resources_dir(), 'test_images', 'monthy-python.webp')
+    image = image_files_manager.load_image(image_path)
+    image = image.resize((image.width // 3, image.height // 3))
+
+    expected_regions = sorted(map(tuple, face_recognizer.get_faces_regions(image, min_neighbors=5).faces_regions))
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        fr_results = list(executor.map(lambda img: face_recognizer.get_faces_regions(img, min_neighbors=5),
+                                       [image] * 3))
+
+    assert expected_regions
+    for fr_result in fr_results:
+        assert sorted(map(tuple, fr_result.faces_regions)) == expected_regions
+
+
+def test_thread_pool_is_created_once_by_concurrent_threads(face_recognizer):
+    def slow_thread_pool_executor(*args, **kwargs):
+        time.sleep(0.05)
+        return MagicMock()
+
+    with patch('pyiof.face_recognition.face_recognizer.ThreadPoolExecutor',
+               side_effect=slow_thread_pool_executor) as executor_class:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            executors = list(executor.map(lambda _: face_recognizer._get_executor(), range(4)))
+
+    assert executor_class.call_count == 1
+    assert all(executor is executors[0] for executor in executors)
+    face_recognizer.close()
+    executors[0].shutdown.assert_called_once()
+
+
+def test_get_faces_regions_with_parallel_cascades(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(10, 10, 20, 20)], [(30, 30, 10, 10)])
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor, parallel_cascades=True)
+
+    fr_result = face_recognizer.get_faces_regions(Image.new('RGB', (50, 50)))
+    face_recognizer.close()
+
+    assert [tuple(region) for region in fr_result.faces_regions] == [(10, 10, 20, 20), (30, 30, 10, 10)]
+
+
+def test_get_faces_regions_merges_overlapping_regions(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(10, 10, 20, 20)],
+                                                                 [(11, 12, 20, 20), (40, 40, 5, 5)])
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor)
+    image = Image.new('RGB', (50, 50))
+
+    fr_result = face_recognizer.get_faces_regions(image)
+    merged_fr_result = face_recognizer.get_faces_regions(image, overlap_threshold=0.5)
+
+    assert fr_result.faces_regions.shape == (3, 4)
+    assert merged_fr_result.faces_regions.tolist() == [[10, 10, 20, 20], [40, 40, 5, 5]]
+    assert merged_fr_result.overlap_threshold == 0.5
+
+
+def test_get_faces_regions_with_max_dimension(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(10, 20, 30, 30)])
+    cascade_classifier, = cascade_classifiers_loader.load_cascade_classifiers.return_value
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor)
+
+    fr_result = face_recognizer.get_faces_regions(Image.new('RGB', (400, 200)), max_dimension=100,
+                                                  min_face_size=40, max_face_size=200)
+
+    detection_image = cascade_classifier.detectMultiScale.call_args.args[0]
+    detection_kwargs = cascade_classifier.detectMultiScale.call_args.kwargs
+    assert detection_image.shape == (50, 100)
+    assert detection_kwargs['minSize'] == (10, 10)
+    assert detection_kwargs['maxSize'] == (50, 50)
+    assert fr_result.detection_scale == 0.25
+    assert fr_result.faces_regions.tolist() == [[40, 80, 120, 120]]
+
+
+def test_get_faces_regions_with_tiles(image_processor, mock_cascade_classifiers_loader):
+    cascade_classifiers_loader = mock_cascade_classifiers_loader([(0, 0, 10, 10)])
+    cascade_classifier, = cascade_classifiers_loader.load_cascade_classifiers.return_value
+    face_recognizer = FaceRecognizer(cascade_classifiers_loader, image_processor)
+
+    fr_result = face_recognizer.get_faces_regions(Image.new('RGB', (100, 100)), tile_size=60, tile_overlap=20)
+    face_recognizer.close()
+
+    tiles = [call.args[0] for call in cascade_classifier.detectMultiScale.call_args_list]
+    assert [tile.shape for tile in tiles] == [(60, 60)] * 4
+    assert sorted(fr_result.faces_regions.tolist()) == [[0, 0, 10, 10], [0, 40, 10, 10],
+                                                        [40, 0, 10, 10], [40, 40, 10, 10]]
+
+
+def test_get_faces_regions_with_tile_overlap_not_smaller_than_tile_size(face_recognizer):
+    image = Image.new('RGB', (4000, 4000))
+
+    with pytest.raises(ValueError):
+        face_recognizer.get_faces_regions(image, tile_size=256, max_face_size=300)
+    with pytest.raises(ValueError):
+        face_recognizer.get_faces_regions(image, tile_size=256, tile_overlap=256)
+
+
+def test_get_faces_regions_with_tiles_finds_same_faces(face_recognizer, image_files_manager):
+    image_path = os.path.join(get_test_resources_dir(), 'test_images', 'monthy-python.webp')
+    image = image_files_manager.load_image(image_path)
+
+    fr_result = face_recognizer.get_faces_regions(image, max_dimension=400,
+                                                  overlap_threshold=FaceRecognizer.TILES_OVERLAP_THRESHOLD)
+    tiles_fr_result = face_recognizer.get_faces_regions(image, max_dimension=400, tile_size=250, tile_overlap=130)
+    face_recognizer.close()
+
+    assert len(tiles_fr_result.faces_regions) == len(fr_result.faces_regions)
+
+
+def test_get_faces_regions_async(face_recognizer, image_with_faces):
+    async def get_faces_regions():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return await asyncio.gather(*(face_recognizer.get_faces_regions_async(image_with_faces, max_dimension=800,
+                                                                                  executor=executor,
+                                                                                  semaphore=asyncio.Semaphore(1))
+                                          for _ in range(2)))
+
+    fr_result = face_recognizer.get_faces_regions(image_with_faces, max_dimension=800)
+    for async_fr_result in asyncio.run(get_faces_regions()):
+        assert np.array_equal(async_fr_result.faces_regions, fr_result.faces_regions)
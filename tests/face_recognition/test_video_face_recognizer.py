@@ -0,0 +1,82 @@
+import os
+from unittest.mock import MagicMock
+
+import cv2
+import numpy as np
+import pytest
+
+from pyiof.face_recognition.cascade_classifiers_loader import CascadeClassifiersLoader
+from pyiof.face_recognition.face_recognizer import FaceRecognizer
+from pyiof.face_recognition.video_face_recognizer import VideoFaceRecognizer
+from pyiof.models.face_recognition_result import FaceRecognitionResult
+from pyiof.utils.common_utils import get_test_resources_dir
+
+
+@pytest.fixture
+def face_recognizer(image_processor):
+    face_recognizer = FaceRecognizer(CascadeClassifiersLoader(), image_processor)
+    face_recognizer.get_faces_regions_from_gray_array = MagicMock(
+        wraps=face_recognizer.get_faces_regions_from_gray_array)
+    return face_recognizer
+
+
+@pytest.fixture
+def frame():
+    image_path = os.path.join(get_test_resources_dir(), 'test_images', 'monthy-python.webp')
+    return cv2.resize(cv2.imread(image_path), (400, 400), interpolation=cv2.INTER_AREA)
+
+
+def test_get_faces_regions_from_frames(face_recognizer, frame):
+    video_face_recognizer = VideoFaceRecognizer(face_recognizer, detection_interval=3)
+
+    fr_results = list(video_face_recognizer.get_faces_regions_from_frames([frame] * 5, min_neighbors=10))
+
+    assert [fr_result.frame_index for fr_result in fr_results] == list(range(5))
+    assert all(isinstance(fr_result, FaceRecognitionResult) for fr_result in fr_results)
+    key_frame_faces = len(fr_results[0].faces_regions)
+    assert key_frame_faces > 0
+    # Faces of the first key frame are tracked in the next frames
+    assert len(fr_results[1].faces_regions) == key_frame_faces
+
+    full_frame_calls = [call for call in face_recognizer.get_faces_regions_from_gray_array.call_args_list
+                        if call.args[0].shape == (400, 400)]
+    assert len(full_frame_calls) == 2
+
+
+def test_get_faces_regions_from_frames_keeps_detection_scale(face_recognizer, frame):
+    video_face_recognizer = VideoFaceRecognizer(face_recognizer, detection_interval=2)
+
+    fr_results = list(video_face_recognizer.get_faces_regions_from_frames([frame] * 3, min_neighbors=10,
+                                                                          max_dimension=200))
+
+    # Key frames and tracked frames carry the scale of the last full-frame detection
+    assert [fr_result.detection_scale for fr_result in fr_results] == [0.5, 0.5, 0.5]
+
+
+def test_scene_change_runs_full_frame_detection(face_recognizer, frame):
+    video_face_recognizer = VideoFaceRecognizer(face_recognizer, detection_interval=100)
+    black_frame = np.zeros_like(frame)
+
+    list(video_face_recognizer.get_faces_regions_from_frames([frame, black_frame, black_frame], min_neighbors=10))
+
+    full_frame_calls = [call for call in face_recognizer.get_faces_regions_from_gray_array.call_args_list
+                        if call.args[0].shape == (400, 400)]
+    assert len(full_frame_calls) == 2
+
+
+def test_get_faces_regions_from_video(face_recognizer, frame, tmp_path):
+    video_path = str(tmp_path / 'video.avi')
+    video_writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (400, 400))
+    for _ in range(3):
+        video_writer.write(frame)
+    video_writer.release()
+
+    fr_results = list(VideoFaceRecognizer(face_recognizer).get_faces_regions_from_video(video_path,
+                                                                                        min_neighbors=10))
+
+    assert len(fr_results) == 3
+
+
+def test_get_faces_regions_from_not_existing_video(face_recognizer):
+    with pytest.raises(OSError):
+        list(VideoFaceRecognizer(face_recognizer).get_faces_regions_from_video('not_existing_video.avi'))
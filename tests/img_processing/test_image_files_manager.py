@@ -1,8 +1,11 @@
+import asyncio
+
 import pytest
 from pyiof.utils.common_utils import get_test_resources_dir
 import os
 from pyiof.img_processing.image_files_manager import UnidentifiedImageError
 from PIL import Image
+import numpy as np
 
 
 @pytest.fixture
@@ -60,3 +63,127 @@ def test_save_image_non_existent_directory(image_files_manager, pil_image):
         image_files_manager.save_image(pil_image, non_existent_path)
     # Ensure no directory or file was created
     assert not os.path.exists(non_existent_path), "Non-existent directory was incorrectly handled."
+
+
+def test_load_image_in_mode(image_files_manager, scientists_image_path):
+    image = image_files_manager.load_image(scientists_image_path, mode='L')
+    assert image.mode == 'L'
+    assert image.size == Image.open(scientists_image_path).size
+
+
+@pytest.mark.parametrize('file_name', ['large.jpg', 'large.png', 'large.gif'])
+def test_load_image_with_max_size(image_files_manager, tmp_path, file_name):
+    image_path = str(tmp_path / file_name)
+    Image.radial_gradient('L').resize((2000, 1000)).convert('RGB').save(image_path)
+
+    image = image_files_manager.load_image(image_path, mode='L', max_size=300)
+
+    assert image.size == (300, 150)
+    assert image.mode == 'L'
+
+
+def test_load_16_bits_image_with_max_size(image_files_manager, tmp_path):
+    image_path = str(tmp_path / 'scan.tif')
+    Image.fromarray(np.tile(np.arange(0, 65536, 64, dtype=np.uint16), (500, 1))).save(image_path)
+    assert Image.open(image_path).mode == 'I;16'
+
+    image = image_files_manager.load_image(image_path, mode='L', max_size=256)
+    full_size_image = image_files_manager.load_image(image_path, max_size=256)
+
+    assert image.size == (256, 125)
+    assert image.mode == 'L'
+    assert full_size_image.size == (256, 125)
+    assert full_size_image.mode == 'I;16'
+
+
+@pytest.mark.parametrize('image_mode', ['1', 'P'])
+def test_load_image_with_max_size_keeps_mode(image_files_manager, tmp_path, image_mode):
+    image_path = str(tmp_path / 'large.png')
+    Image.radial_gradient('L').resize((2000, 1000)).convert(image_mode).save(image_path)
+
+    image = image_files_manager.load_image(image_path, max_size=300)
+
+    assert image.size == (300, 150)
+    assert image.mode == image_mode
+
+
+def test_load_small_image_with_max_size(image_files_manager, scientists_image_path):
+    image = image_files_manager.load_image(scientists_image_path, max_size=10000)
+    assert image.size == Image.open(scientists_image_path).size
+    assert image.mode == 'RGB'
+
+
+@pytest.fixture
+def images_dir(tmp_path):
+    Image.new('RGB', (40, 20)).save(tmp_path / 'b.png')
+    Image.new('RGB', (40, 20)).save(tmp_path / 'a.jpg')
+    (tmp_path / 'c.png').write_text('not an image')
+    (tmp_path / 'notes.txt').write_text('not an image')
+    (tmp_path / 'sub').mkdir()
+    Image.new('L', (10, 10)).save(tmp_path / 'sub' / 'd.bmp')
+    return tmp_path
+
+
+def test_iter_images_from_directory(image_files_manager, images_dir):
+    results = list(image_files_manager.iter_images(str(images_dir), mode='L', max_workers=2, prefetch=1))
+
+    assert [os.path.basename(result.path) for result in results] == ['a.jpg', 'b.png', 'c.png']
+    assert [result.image.mode for result in results[:2]] == ['L', 'L']
+    # A file that can not be loaded is reported without stopping the iteration
+    assert results[2].image is None
+    assert isinstance(results[2].error, UnidentifiedImageError)
+
+
+def test_iter_images_recursive_and_from_paths(image_files_manager, images_dir):
+    recursive_results = list(image_files_manager.iter_images(str(images_dir), recursive=True))
+    paths = [str(images_dir / 'sub' / 'd.bmp'), str(images_dir / 'notes.txt'), str(images_dir / 'missing.png')]
+    paths_results = list(image_files_manager.iter_images(iter(paths)))
+
+    assert len(recursive_results) == 4
+    assert [result.path for result in paths_results] == [paths[0], paths[2]]
+    assert paths_results[0].image.size == (10, 10)
+    assert isinstance(paths_results[1].error, FileNotFoundError)
+
+
+def test_iter_images_from_not_existing_directory(image_files_manager):
+    with pytest.raises(FileNotFoundError):
+        next(image_files_manager.iter_images('not_existing_dir'))
+
+
+@pytest.fixture
+def pages():
+    return [Image.new('L', (100, 50), color) for color in (0, 128, 255)]
+
+
+def test_iter_tiff_pages(image_files_manager, tmp_path, pages):
+    tiff_path = str(tmp_path / 'document.tif')
+    pages[0].save(tiff_path, save_all=True, append_images=pages[1:])
+
+    loaded_pages = list(image_files_manager.iter_document_pages(tiff_path, mode='RGB'))
+
+    assert [page.getpixel((0, 0)) for page in loaded_pages] == [(0, 0, 0), (128, 128, 128), (255, 255, 255)]
+
+
+def test_iter_pdf_pages(image_files_manager, tmp_path, pages):
+    pytest.importorskip('pypdfium2')
+    pdf_path = str(tmp_path / 'document.pdf')
+    pages[0].save(pdf_path, save_all=True, append_images=pages[1:], resolution=72)
+
+    loaded_pages = list(image_files_manager.iter_document_pages(pdf_path, dpi=144, mode='L'))
+
+    assert [page.size for page in loaded_pages] == [(200, 100)] * 3
+    assert [page.getpixel((0, 0)) for page in loaded_pages] == [0, 128, 255]
+
+
+def test_load_image_async(image_files_manager, scientists_image_path):
+    image = asyncio.run(image_files_manager.load_image_async(scientists_image_path, mode='L', max_size=100))
+
+    assert image.mode == 'L'
+    assert max(image.size) == 100
+    # The pixels are already decoded
+    assert image.im is not None
+
+
+def test_load_not_existing_image_async(image_files_manager):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(image_files_manager.load_image_async('not_existing_image.png'))
@@ -1,7 +1,10 @@
 import pytest
-from PIL import Image
+from PIL import Image, ImageDraw
 import numpy as np
 
+from pyiof.img_processing.image_processor import ImageProcessor
+from pyiof.img_processing.interfaces.iimage_processor import IImageProcessor
+
 
 @pytest.fixture()
 def red_pil_image():
@@ -37,6 +40,17 @@ def test_convert_pil_image_to_np_array(image_processor, red_pil_image):
     assert result_array.shape == (100, 100, 3)
 
 
+def test_convert_pil_image_to_np_array_is_writable(image_processor):
+    white_pil_image = Image.new(mode='RGB', size=(100, 100), color=(255, 255, 255))
+    result_array = image_processor.convert_pil_image_to_np_array(white_pil_image)
+    image_processor.draw_rectangles_on_image(result_array, [(10, 10, 20, 20)])
+    result_array[0, 0] = (0, 0, 255)
+
+    assert tuple(result_array[10, 10]) == (255, 0, 0)
+    assert tuple(result_array[0, 0]) == (0, 0, 255)
+    assert white_pil_image.getpixel((0, 0)) == (255, 255, 255)
+
+
 def test_get_regions_images(image_processor, red_pil_image):
     regions = [(10, 10, 50, 50), (60, 60, 30, 30)]
     images = image_processor.get_images_from_regions(regions, red_pil_image)
@@ -57,3 +71,227 @@ def test_get_image_size(image_processor, red_pil_image):
     expected_height = 100
     assert width == expected_width, f"Expected width {expected_width}. Actual width {width}"
     assert height == expected_height, f"Expected height {expected_height}. Actual height {height}"
+
+
+def test_binarize_images(image_processor):
+    gradient_image = Image.fromarray(np.tile(np.arange(256, dtype=np.uint8), (4, 1)))
+    thresholds = [32, 128, 200]
+
+    binary_images = image_processor.binarize_images(gradient_image, thresholds)
+
+    assert len(binary_images) == len(thresholds)
+    for threshold, binary_image in zip(thresholds, binary_images):
+        assert binary_image.mode == 'L'
+        assert binary_image.size == gradient_image.size
+        assert list(binary_image.getdata()) == list(image_processor.binarize_image(gradient_image, threshold).getdata())
+        assert list(binary_image.getdata())[:256] == [255 if x >= threshold else 0 for x in range(256)]
+
+
+def test_get_histogram_thresholds(image_processor):
+    # Dark text on a bright background
+    bimodal_array = np.full((100, 100), 220, dtype=np.uint8)
+    bimodal_array[40:60, 10:90] = 30
+
+    thresholds = image_processor.get_histogram_thresholds(Image.fromarray(bimodal_array))
+
+    assert 1 <= len(thresholds) <= 2
+    assert 30 < thresholds[0] <= 220
+    for threshold in thresholds:
+        binary_array = np.asarray(image_processor.binarize_image(Image.fromarray(bimodal_array), threshold))
+        assert (binary_array == np.where(bimodal_array == 220, 255, 0)).all()
+
+
+def test_grayscale_image_from_np_array(image_processor, red_pil_image):
+    rgb_array = np.asarray(red_pil_image)
+    grayscale_array = image_processor.grayscale_image(rgb_array)
+
+    assert isinstance(grayscale_array, np.ndarray)
+    assert grayscale_array.shape == (100, 100)
+    assert np.abs(grayscale_array.astype(int) - np.asarray(red_pil_image.convert('L'))).max() <= 1
+    # Grayscale arrays are returned without a copy
+    assert image_processor.grayscale_image(grayscale_array) is grayscale_array
+
+
+def test_binarize_np_array(image_processor):
+    gradient_array = np.tile(np.arange(256, dtype=np.uint8), (4, 1))
+
+    binary_array = image_processor.binarize_image(gradient_array, 128)
+    binary_arrays = image_processor.binarize_images(gradient_array, [64, 128])
+
+    assert isinstance(binary_array, np.ndarray)
+    assert np.array_equal(binary_array, np.asarray(image_processor.binarize_image(Image.fromarray(gradient_array), 128)))
+    assert all(isinstance(array, np.ndarray) for array in binary_arrays)
+    assert np.array_equal(binary_arrays[1], binary_array)
+    assert image_processor.get_histogram_thresholds(gradient_array) == \
+           image_processor.get_histogram_thresholds(Image.fromarray(gradient_array))
+
+
+def test_convert_np_array_is_not_copied(image_processor):
+    array = np.zeros((10, 10), dtype=np.uint8)
+    assert image_processor.convert_pil_image_to_np_array(array) is array
+
+
+def test_get_regions_images_from_np_array(image_processor, red_pil_image):
+    rgb_array = np.array(red_pil_image)
+    regions = [(10, 10, 50, 50), (60, 60, 30, 30)]
+    images = image_processor.get_images_from_regions(regions, rgb_array)
+
+    for (x, y, w, h), image in zip(regions, images):
+        assert image.shape == (h, w, 3)
+        # Crops are views of the image
+        assert np.shares_memory(image, rgb_array)
+
+
+def test_draw_rectangles_on_np_array(image_processor):
+    array = np.zeros((50, 50, 3), dtype=np.uint8)
+    pil_image = Image.new('RGB', (50, 50))
+    regions = [(10, 10, 20, 20)]
+
+    image_processor.draw_rectangles_on_image(array, regions)
+    image_processor.draw_rectangles_on_image(pil_image, regions)
+
+    assert tuple(array[10, 15]) == pil_image.getpixel((15, 10)) == (255, 0, 0)
+    assert image_processor.get_image_dimensions(np.zeros((20, 30), dtype=np.uint8)) == (30, 20)
+
+
+def test_get_text_regions(image_processor):
+    image = Image.new('L', (400, 300), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.text((250, 20), 'second block', fill=0)
+    draw.text((20, 20), 'first block', fill=0)
+    draw.text((20, 32), 'first block, second line', fill=0)
+    draw.text((100, 200), 'third block', fill=0)
+
+    regions = image_processor.get_text_regions(image)
+
+    assert regions.dtype == np.int32
+    assert len(regions) == 3
+    first_region, second_region, third_region = regions
+    assert first_region[0] <= 20 and first_region[1] <= 20 and first_region[1] + first_region[3] >= 42
+    assert second_region[0] <= 250 <= second_region[0] + second_region[2]
+    assert third_region[1] <= 200 <= third_region[1] + third_region[3]
+    assert image_processor.get_text_regions(np.asarray(image)).tolist() == regions.tolist()
+
+
+def test_get_text_regions_without_text(image_processor):
+    assert image_processor.get_text_regions(np.full((100, 100), 255, dtype=np.uint8)).shape == (0, 4)
+
+
+@pytest.fixture
+def unevenly_lit_text():
+    # Dark strokes on a background lit from the right, darker on the left than the strokes on the right
+    text_mask = np.zeros((60, 300), dtype=bool)
+    for x in range(10, 290, 20):
+        text_mask[10:50, x:x + 3] = True
+        text_mask[28:31, x:x + 12] = True
+    background = np.tile(np.linspace(90, 250, 300), (60, 1))
+    return np.where(text_mask, background - 70, background).astype(np.uint8), text_mask
+
+
+@pytest.mark.parametrize('method', ['sauvola', 'niblack'])
+def test_binarize_image_adaptive(image_processor, unevenly_lit_text, method):
+    image, text_mask = unevenly_lit_text
+
+    binarized_image = image_processor.binarize_image_adaptive(image, method=method)
+
+    assert binarized_image.dtype == np.uint8
+    assert set(np.unique(binarized_image)) <= {0, 255}
+    assert np.array_equal(binarized_image[text_mask], np.zeros(np.count_nonzero(text_mask)))
+    if method == 'sauvola':
+        assert np.count_nonzero(binarized_image[~text_mask] == 0) == 0
+    global_binarized_image = image_processor.binarize_image(image, image_processor.get_histogram_thresholds(image)[0])
+    assert np.count_nonzero((global_binarized_image == 0) != text_mask) > text_mask.size / 10
+
+
+def test_binarize_pil_image_adaptive(image_processor, unevenly_lit_text):
+    image, _ = unevenly_lit_text
+
+    binarized_image = image_processor.binarize_image_adaptive(Image.fromarray(image), window_size=15, k=0.3)
+
+    assert isinstance(binarized_image, Image.Image)
+    assert np.array_equal(np.asarray(binarized_image),
+                          image_processor.binarize_image_adaptive(image, window_size=15, k=0.3))
+
+
+def test_binarize_image_adaptive_invalid_parameters(image_processor, unevenly_lit_text):
+    image, _ = unevenly_lit_text
+    with pytest.raises(ValueError):
+        image_processor.binarize_image_adaptive(image, method='otsu')
+    with pytest.raises(ValueError):
+        image_processor.binarize_image_adaptive(image, window_size=10)
+
+
+class MinimalImageProcessor(IImageProcessor):
+    """Implements only the abstract methods, like image processors written before the optional methods."""
+
+    def __init__(self):
+        self._image_processor = ImageProcessor()
+
+    def grayscale_image(self, image):
+        return self._image_processor.grayscale_image(image)
+
+    def binarize_image(self, image, threshold):
+        return self._image_processor.binarize_image(image, threshold)
+
+    def convert_pil_image_to_np_array(self, pil_image):
+        return self._image_processor.convert_pil_image_to_np_array(pil_image)
+
+    def get_images_from_regions(self, regions, image):
+        return self._image_processor.get_images_from_regions(regions, image)
+
+    def draw_rectangles_on_image(self, image, regions):
+        return self._image_processor.draw_rectangles_on_image(image, regions)
+
+    def get_image_dimensions(self, image):
+        return self._image_processor.get_image_dimensions(image)
+
+
+@pytest.mark.parametrize('as_array', [False, True])
+def test_default_binarize_images(image_processor, as_array):
+    gradient_array = np.tile(np.arange(256, dtype=np.uint8), (4, 1))
+    image = gradient_array if as_array else Image.fromarray(gradient_array)
+
+    binarized_images = MinimalImageProcessor().binarize_images(image, [64, 128])
+
+    expected_images = image_processor.binarize_images(image, [64, 128])
+    assert [np.array_equal(np.asarray(binarized), np.asarray(expected))
+            for binarized, expected in zip(binarized_images, expected_images)] == [True, True]
+
+
+def test_default_get_histogram_thresholds(image_processor):
+    image = Image.new('L', (100, 100), color=40)
+    ImageDraw.Draw(image).rectangle((20, 20, 60, 60), fill=200)
+
+    thresholds = MinimalImageProcessor().get_histogram_thresholds(image)
+
+    assert len(thresholds) == 1
+    assert 40 < thresholds[0] <= 200
+    assert thresholds[0] == image_processor.get_histogram_thresholds(image)[0]
+    assert MinimalImageProcessor().get_histogram_thresholds(image, max_thresholds=0) == []
+
+
+@pytest.mark.parametrize('as_array', [False, True])
+def test_default_get_text_regions(red_pil_image, as_array):
+    image = np.array(red_pil_image) if as_array else red_pil_image
+
+    regions = MinimalImageProcessor().get_text_regions(image)
+
+    assert regions.dtype == np.int32
+    assert regions.tolist() == [[0, 0, 100, 100]]
+    assert MinimalImageProcessor().get_text_regions(image, min_size=200).shape == (0, 4)
+
+
+def test_default_binarize_image_adaptive(image_processor, unevenly_lit_text):
+    image, text_mask = unevenly_lit_text
+
+    binarized_image = MinimalImageProcessor().binarize_image_adaptive(Image.fromarray(image))
+
+    assert isinstance(binarized_image, Image.Image)
+    binarized_array = np.asarray(binarized_image)
+    assert np.array_equal(binarized_array[text_mask], np.zeros(np.count_nonzero(text_mask)))
+    assert np.count_nonzero(binarized_array[~text_mask] == 0) == 0
+    # Only the borders, reflected instead of clipped, can differ from ImageProcessor
+    inner = (slice(12, -12), slice(12, -12))
+    assert np.array_equal(binarized_array[inner], image_processor.binarize_image_adaptive(image)[inner])
+    with pytest.raises(ValueError):
+        MinimalImageProcessor().binarize_image_adaptive(image, window_size=10)
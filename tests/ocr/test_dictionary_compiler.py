@@ -0,0 +1,31 @@
+import os
+
+from pyiof.ocr.dictionary_compiler import compile_dictionary, main
+from pyiof.ocr.dictionary_index import DictionaryIndex
+
+
+def test_compile_dictionary(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\nword\n', encoding='utf-8')
+
+    dictionary_index = compile_dictionary(str(dictionary_file))
+
+    assert dictionary_index.index_file == str(tmp_path / 'words.idx')
+    assert 'computer' in dictionary_index
+    assert dictionary_index.is_built_from(str(dictionary_file))
+    dictionary_file.write_text('computer\nwords\n', encoding='utf-8')
+    assert not dictionary_index.is_built_from(str(dictionary_file))
+
+
+def test_compile_dictionary_from_command_line(tmp_path, capsys):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\nword\n', encoding='utf-8')
+    index_file = tmp_path / 'compiled' / 'dictionary.idx'
+    index_file.parent.mkdir()
+
+    assert main([str(dictionary_file), '-o', str(index_file)]) == 0
+    assert 'Compiled 2 words' in capsys.readouterr().out
+    assert len(DictionaryIndex(str(index_file))) == 2
+
+    assert main([str(tmp_path / 'missing.txt')]) == 1
+    assert not os.path.exists(tmp_path / 'missing.idx')
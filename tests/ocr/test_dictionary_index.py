@@ -0,0 +1,38 @@
+import os
+import pickle
+
+import pytest
+
+from pyiof.ocr.dictionary_index import DictionaryIndex
+
+
+@pytest.fixture
+def dictionary_index(tmp_path):
+    return DictionaryIndex.build(['word', 'computer', ' spaced \r', '', 'word', 'ñandú'], str(tmp_path / 'words.idx'))
+
+
+def test_word_in_dictionary_index(dictionary_index):
+    assert len(dictionary_index) == 4
+    assert all(word in dictionary_index for word in ['word', 'computer', 'spaced', 'ñandú'])
+    assert not any(word in dictionary_index for word in ['', 'computadora', 'a', 'zzz', 'words'])
+    assert list(dictionary_index) == sorted(['word', 'computer', 'spaced', 'ñandú'], key=str.encode)
+
+
+def test_dictionary_index_from_file(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('apple\nbanana\ncherry\n', encoding='utf-8')
+    dictionary_index = DictionaryIndex.build_from_file(str(dictionary_file), str(tmp_path / 'words.idx'))
+
+    # The index file is opened again, instead of being copied, when pickled
+    unpickled_dictionary_index = pickle.loads(pickle.dumps(dictionary_index))
+
+    assert 'banana' in unpickled_dictionary_index
+    assert unpickled_dictionary_index.index_file == dictionary_index.index_file
+    assert sorted(os.listdir(tmp_path)) == ['words.idx', 'words.txt']
+
+
+def test_invalid_dictionary_index(tmp_path):
+    index_file = tmp_path / 'words.idx'
+    index_file.write_bytes(b'not an index')
+    with pytest.raises(ValueError):
+        DictionaryIndex(str(index_file))
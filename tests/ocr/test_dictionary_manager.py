@@ -2,6 +2,7 @@ import os.path
 
 import pytest
 
+from pyiof.ocr.dictionary_index import DictionaryIndex
 from pyiof.ocr.dictionary_manager import DictionaryManager, DictionaryManagerError
 from pyiof.utils.common_utils import get_test_resources_dir
 
@@ -33,3 +34,81 @@ def test_invalid_dictionary_exception():
     dme = e.value
     assert dme.dictionary_file == scientist_image, \
         f"Not found dictionary expected to be {scientist_image} \n In exception {e}"
+
+
+def test_dictionary_manager_with_index(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\nword\n', encoding='utf-8')
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), use_index=True)
+
+    assert dictionary_manager.is_word_in_dictionary('computer')
+    assert not dictionary_manager.is_word_in_dictionary('computadora')
+    assert os.path.exists(tmp_path / 'words.idx')
+
+    # The index is rebuilt when the dictionary file changes
+    dictionary_file.write_text('computadora\n', encoding='utf-8')
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), use_index=True)
+    assert dictionary_manager.is_word_in_dictionary('computadora')
+
+    # The index is used as it is without its dictionary file
+    os.remove(dictionary_file)
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), use_index=True)
+    assert dictionary_manager.is_word_in_dictionary('computadora')
+
+
+def test_dictionary_index_with_other_version_is_rebuilt(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\n', encoding='utf-8')
+    index_file = tmp_path / 'words.idx'
+    index_file.write_bytes(DictionaryIndex.MAGIC + bytes(100))
+
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), use_index=True)
+
+    assert dictionary_manager.is_word_in_dictionary('computer')
+    assert DictionaryIndex(str(index_file)).is_built_from(str(dictionary_file))
+
+
+def test_invalid_dictionary_index_exception(tmp_path):
+    with pytest.raises(DictionaryManagerError):
+        DictionaryManager(dictionary_file=str(tmp_path / 'words.txt'), use_index=True).is_word_in_dictionary("word")
+
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_count_known_words(tmp_path, use_index):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\nword\n', encoding='utf-8')
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), use_index=use_index)
+
+    assert dictionary_manager.count_known_words(['word', 'computer', 'computadora', 'word']) == (3, 16)
+    assert dictionary_manager.count_known_words([]) == (0, 0)
+
+
+def test_dictionary_manager_with_fuzzy_matching(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('computer\nword\nat\n', encoding='utf-8')
+    dictionary_manager = DictionaryManager(dictionary_file=str(dictionary_file), fuzzy_max_edit_distance=1)
+
+    assert dictionary_manager.is_word_in_dictionary('c0mputer')
+    assert not dictionary_manager.is_word_in_dictionary('c0mpute')
+    # Short words only match exactly
+    assert dictionary_manager.is_word_in_dictionary('at')
+    assert not dictionary_manager.is_word_in_dictionary('an')
+    assert dictionary_manager.count_known_words(['c0mputer', 'wordd', 'an', 'at']) == (3, 15)
+    assert os.path.exists(tmp_path / 'words.fuzzy1.idx')
+
+
+def test_cache_identity(tmp_path):
+    dictionary_file = tmp_path / 'words.txt'
+    dictionary_file.write_text('hello\n', encoding='utf-8')
+    other_dictionary_file = tmp_path / 'other_words.txt'
+    other_dictionary_file.write_text('hello\n', encoding='utf-8')
+
+    cache_identity = DictionaryManager(dictionary_file=str(dictionary_file)).cache_identity()
+
+    assert DictionaryManager(dictionary_file=str(dictionary_file)).cache_identity() == cache_identity
+    assert DictionaryManager(dictionary_file=str(other_dictionary_file)).cache_identity() != cache_identity
+    assert DictionaryManager(dictionary_file=str(dictionary_file), use_index=True).cache_identity() != cache_identity
+    assert DictionaryManager(dictionary_file=str(dictionary_file),
+                             fuzzy_max_edit_distance=1).cache_identity() != cache_identity
+    dictionary_file.write_text('hello\nworld\n', encoding='utf-8')
+    assert DictionaryManager(dictionary_file=str(dictionary_file)).cache_identity() != cache_identity
@@ -0,0 +1,38 @@
+import pickle
+
+import pytest
+
+from pyiof.ocr.dictionary_index import DictionaryIndex
+from pyiof.ocr.fuzzy_dictionary_index import FuzzyDictionaryIndex
+
+
+@pytest.fixture
+def dictionary_index(tmp_path):
+    return DictionaryIndex.build(['computer', 'compute', 'word', 'world', 'sword'], str(tmp_path / 'words.idx'))
+
+
+def test_get_similar_words(dictionary_index, tmp_path):
+    fuzzy_index = FuzzyDictionaryIndex.build(dictionary_index, str(tmp_path / 'words.fuzzy2.idx'), 2)
+
+    assert fuzzy_index.get_similar_words('word') == [('word', 0), ('sword', 1), ('world', 1)]
+    assert fuzzy_index.get_similar_words('c0mputer') == [('computer', 1), ('compute', 2)]
+    assert fuzzy_index.get_similar_words('c0mputer', max_edit_distance=1) == [('computer', 1)]
+    assert fuzzy_index.has_similar_word('wrd')
+    assert not fuzzy_index.has_similar_word('keyboard')
+    with pytest.raises(ValueError):
+        fuzzy_index.has_similar_word('word', max_edit_distance=3)
+
+
+def test_fuzzy_index_from_other_dictionary_index(dictionary_index, tmp_path):
+    fuzzy_index_file = str(tmp_path / 'words.fuzzy1.idx')
+    FuzzyDictionaryIndex.build(dictionary_index, fuzzy_index_file)
+    other_dictionary_index = DictionaryIndex.build(['word'], str(tmp_path / 'other_words.idx'))
+
+    with pytest.raises(ValueError):
+        FuzzyDictionaryIndex(fuzzy_index_file, other_dictionary_index)
+
+
+def test_pickle_fuzzy_index(dictionary_index, tmp_path):
+    fuzzy_index = FuzzyDictionaryIndex.build(dictionary_index, str(tmp_path / 'words.fuzzy1.idx'))
+    unpickled_fuzzy_index = pickle.loads(pickle.dumps(fuzzy_index))
+    assert unpickled_fuzzy_index.get_similar_words('wordd') == [('word', 1), ('world', 1)]
@@ -1,9 +1,21 @@
+import asyncio
 import os.path
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
+from PIL import Image, ImageDraw
 
-from pyiof.ocr.ocr_processor import OCRProcessor
+from pyiof.ocr.dictionary_manager import DictionaryManager
+from pyiof.ocr.interfaces.idictionary_manager import IDictionaryManager
+from pyiof.ocr.interfaces.iocr_backend import IOCRBackend
+from pyiof.ocr.ocr_processor import OCRProcessor, OCRProcessorError
 from pyiof.utils.common_utils import get_test_resources_dir
+from pyiof.utils.result_cache import ResultCache
 from pyiof.ocr.ocr_processor import OCRResult
 
 
@@ -24,3 +36,330 @@ def test_get_ocr_result(ocr_processor, image_with_text):
     assert isinstance(ocr_result, OCRResult)
     assert len(ocr_result.text) > 0, "Text should not be empty"
     assert ocr_result.accuracy[0] >= 154, f"Accuracy should be at least 191. Actual accuracy {ocr_result.accuracy[0]}"
+
+
+class FakeDictionaryManager(IDictionaryManager):
+    def is_word_in_dictionary(self, word: str) -> bool:
+        return word == 'word'
+
+
+def test_calculate_ocr_accuracy(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor)
+
+    assert ocr_processor._calculate_ocr_accuracy('"Word," words (word)... wo-rd word\'s -- WORD!') == (3, 12)
+    assert ocr_processor._calculate_ocr_accuracy('') == (0, 0)
+
+
+def fake_image_to_string(image, **kwargs):
+    # The number of recognized words peaks when about 40% of the pixels are white
+    white_ratio = np.count_nonzero(np.asarray(image)) / np.asarray(image).size
+    return ' '.join(['word'] * int(10 - abs(white_ratio - 0.4) * 10))
+
+
+@pytest.fixture
+def gradient_image():
+    return Image.fromarray(np.tile(np.arange(256, dtype=np.uint8), (16, 1)))
+
+
+def test_extract_text_with_thread_executor_matches_serial(image_processor, gradient_image):
+    serial_processor = OCRProcessor(FakeDictionaryManager(), image_processor)
+    parallel_processor = OCRProcessor(FakeDictionaryManager(), image_processor, executor='thread', max_workers=4)
+
+    with patch('pytesseract.image_to_string', side_effect=fake_image_to_string):
+        serial_result = serial_processor.extract_text(gradient_image)
+        parallel_result = parallel_processor.extract_text(gradient_image)
+    parallel_processor.close()
+
+    assert parallel_result.threshold == serial_result.threshold
+    assert parallel_result.accuracy == serial_result.accuracy
+    assert parallel_result.text == serial_result.text
+
+
+def test_process_executor_is_not_pickled(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, executor='process', max_workers=2)
+    assert isinstance(ocr_processor._get_executor(), ProcessPoolExecutor)
+
+    unpickled_processor = pickle.loads(pickle.dumps(ocr_processor))
+    assert unpickled_processor._executor is None
+    assert unpickled_processor.executor == 'process'
+    ocr_processor.close()
+
+
+def test_executor_is_created_once_by_concurrent_threads(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, executor='thread', max_workers=2)
+
+    def slow_thread_pool_executor(*args, **kwargs):
+        time.sleep(0.05)
+        return MagicMock()
+
+    with patch('pyiof.ocr.ocr_processor.ThreadPoolExecutor', side_effect=slow_thread_pool_executor) as executor_class:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            executors = list(executor.map(lambda _: ocr_processor._get_executor(), range(4)))
+
+    assert executor_class.call_count == 1
+    assert all(executor is executors[0] for executor in executors)
+    ocr_processor.close()
+    executors[0].shutdown.assert_called_once()
+
+
+def test_unsupported_executor_mode(image_processor):
+    with pytest.raises(OCRProcessorError):
+        OCRProcessor(FakeDictionaryManager(), image_processor, executor='gpu')
+
+
+@pytest.mark.parametrize('search_strategy', ['coarse_to_fine', 'golden_section'])
+def test_extract_text_search_strategy_uses_fewer_passes(image_processor, gradient_image, search_strategy):
+    exhaustive_processor = OCRProcessor(FakeDictionaryManager(), image_processor)
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, search_strategy=search_strategy)
+
+    with patch('pytesseract.image_to_string', side_effect=fake_image_to_string) as image_to_string:
+        exhaustive_result = exhaustive_processor.extract_text(gradient_image)
+        image_to_string.reset_mock()
+        ocr_result = ocr_processor.extract_text(gradient_image)
+
+    assert exhaustive_result.ocr_passes == len(OCRProcessor.THRESHOLDS)
+    assert ocr_result.ocr_passes == image_to_string.call_count
+    assert ocr_result.ocr_passes <= 3
+    assert ocr_result.accuracy == exhaustive_result.accuracy
+
+
+def test_extract_text_stops_at_target_hit_ratio(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor,
+                                 search_strategy='coarse_to_fine', target_hit_ratio=0.9)
+
+    with patch('pytesseract.image_to_string', side_effect=fake_image_to_string):
+        ocr_result = ocr_processor.extract_text(gradient_image)
+
+    # Without the target hit ratio, the coarse to fine search tries a third threshold
+    assert ocr_result.ocr_passes == 2
+
+
+def test_target_hit_ratio_ignores_punctuation(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, target_hit_ratio=1.0)
+    ocr_texts = {128: 'word -- word, - word!'}
+    ocr_accuracies = {128: ocr_processor._calculate_ocr_accuracy(ocr_texts[128])}
+
+    assert ocr_processor._is_target_hit_ratio_reached(ocr_texts, ocr_accuracies, [128])
+
+
+def test_unsupported_search_strategy(image_processor):
+    with pytest.raises(OCRProcessorError):
+        OCRProcessor(FakeDictionaryManager(), image_processor, search_strategy='random')
+
+
+class FakeOCRBackend(IOCRBackend):
+    def image_to_string(self, image) -> str:
+        return fake_image_to_string(image)
+
+
+def test_extract_text_with_ocr_backend(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+
+    with patch('pytesseract.image_to_string') as image_to_string:
+        ocr_result = ocr_processor.extract_text(gradient_image)
+
+    image_to_string.assert_not_called()
+    assert ocr_result.threshold == 128
+    assert ocr_result.accuracy == (9, 36)
+
+
+def test_extract_text_from_np_array(image_processor, gradient_image):
+    ocr_backend = MagicMock(wraps=FakeOCRBackend())
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=ocr_backend)
+
+    ocr_result = ocr_processor.extract_text(np.asarray(gradient_image.convert('RGB')))
+
+    assert all(isinstance(call.args[0], np.ndarray) for call in ocr_backend.image_to_string.call_args_list)
+    assert ocr_result.threshold == ocr_processor.extract_text(gradient_image).threshold == 128
+
+
+def test_extract_text_batch(image_processor, gradient_image, image_with_text):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+    images = [gradient_image, image_with_text.filename, gradient_image]
+
+    ocr_results = list(ocr_processor.extract_text_batch(images, max_workers=2, max_in_flight=2))
+
+    assert sorted(map(str, (ocr_result.source for ocr_result in ocr_results))) == \
+           sorted(['0', image_with_text.filename, '2'])
+    for ocr_result in ocr_results:
+        assert isinstance(ocr_result, OCRResult)
+        if ocr_result.source != image_with_text.filename:
+            assert ocr_result.threshold == 128
+
+
+def test_extract_text_from_paths_not_existing_file(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+
+    with pytest.raises(OCRProcessorError):
+        list(ocr_processor.extract_text_from_paths(['not_existing_image.png'], max_workers=1))
+
+
+def test_extract_text_from_paths_collects_errors(image_processor, image_with_text):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+    image_paths = ['not_existing_image.png', image_with_text.filename]
+
+    ocr_results = {ocr_result.source: ocr_result
+                   for ocr_result in ocr_processor.extract_text_from_paths(image_paths, max_workers=1,
+                                                                           collect_errors=True)}
+
+    assert isinstance(ocr_results['not_existing_image.png'].error, FileNotFoundError)
+    assert ocr_results['not_existing_image.png'].text == ''
+    assert ocr_results[image_with_text.filename].error is None
+
+
+def test_extract_text_histogram_search_strategy(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, search_strategy='histogram')
+
+    with patch('pytesseract.image_to_string', side_effect=fake_image_to_string):
+        ocr_result = ocr_processor.extract_text(gradient_image)
+
+    assert ocr_result.ocr_passes <= 2
+    assert ocr_result.threshold in image_processor.get_histogram_thresholds(gradient_image)
+
+
+def test_extract_text_with_cache(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, cache=ResultCache())
+
+    with patch('pytesseract.image_to_string', side_effect=fake_image_to_string) as image_to_string:
+        ocr_result = ocr_processor.extract_text(gradient_image)
+        image_to_string.reset_mock()
+        cached_ocr_result = ocr_processor.extract_text(gradient_image.copy())
+
+    image_to_string.assert_not_called()
+    assert cached_ocr_result.text == ocr_result.text
+    assert cached_ocr_result.threshold == ocr_result.threshold
+
+
+def test_extract_text_from_document(image_processor, gradient_image, tmp_path):
+    document_path = str(tmp_path / 'document.tif')
+    pages = [gradient_image, Image.new('L', gradient_image.size), gradient_image]
+    pages[0].save(document_path, save_all=True, append_images=pages[1:])
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+
+    ocr_results = list(ocr_processor.extract_text_from_document(document_path, max_workers=2, max_in_flight=2))
+
+    assert [ocr_result.page_index for ocr_result in ocr_results] == [0, 1, 2]
+    assert all(ocr_result.source == document_path for ocr_result in ocr_results)
+    assert [ocr_result.threshold for ocr_result in ocr_results] == [128, 32, 128]
+
+
+def test_extract_text_from_not_existing_document(image_processor):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+    with pytest.raises(OCRProcessorError):
+        list(ocr_processor.extract_text_from_document('not_existing_document.tif'))
+
+
+def test_extract_text_with_text_regions(image_processor):
+    image = Image.new('L', (400, 300), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.text((20, 20), 'first block', fill=0)
+    draw.text((100, 200), 'second block', fill=0)
+    ocr_backend = MagicMock(wraps=FakeOCRBackend())
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=ocr_backend,
+                                 search_strategy='histogram', text_regions=True)
+
+    ocr_result = ocr_processor.extract_text(image)
+
+    ocr_images = [call.args[0] for call in ocr_backend.image_to_string.call_args_list]
+    assert len(ocr_images) == 2 * ocr_result.ocr_passes
+    assert all(ocr_image.size < np.asarray(image).size / 10 for ocr_image in ocr_images)
+    assert len(ocr_result.text.split('\n\n')) == 2
+
+
+def test_extract_text_with_text_regions_falls_back_to_whole_image(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend(),
+                                 text_regions=True)
+
+    with patch.object(image_processor, 'get_text_regions', return_value=np.empty((0, 4), dtype=np.int32)):
+        ocr_result = ocr_processor.extract_text(gradient_image)
+
+    assert ocr_result.threshold == 128
+    assert ocr_result.accuracy == (9, 36)
+
+
+def test_extract_text_adaptive_search_strategy(image_processor, gradient_image):
+    ocr_backend = MagicMock(wraps=FakeOCRBackend())
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=ocr_backend,
+                                 search_strategy='adaptive')
+
+    ocr_result = ocr_processor.extract_text(gradient_image)
+
+    ocr_backend.image_to_string.assert_called_once()
+    assert np.array_equal(ocr_backend.image_to_string.call_args.args[0],
+                          image_processor.binarize_image_adaptive(np.asarray(gradient_image)))
+    assert ocr_result.ocr_passes == 1
+    assert ocr_result.threshold is None
+    assert ocr_result.accuracy == ocr_processor._calculate_ocr_accuracy(ocr_result.text)
+
+
+@pytest.mark.parametrize('search_strategy', ['exhaustive', 'coarse_to_fine', 'adaptive'])
+def test_extract_text_async_matches_extract_text(image_processor, gradient_image, search_strategy):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend(),
+                                 search_strategy=search_strategy, text_regions=True)
+
+    async def extract_texts():
+        semaphore = asyncio.Semaphore(2)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return await asyncio.gather(*(ocr_processor.extract_text_async(gradient_image, executor, semaphore)
+                                          for _ in range(3)))
+
+    ocr_result = ocr_processor.extract_text(gradient_image)
+    for async_ocr_result in asyncio.run(extract_texts()):
+        assert async_ocr_result.text == ocr_result.text
+        assert async_ocr_result.threshold == ocr_result.threshold
+        assert async_ocr_result.ocr_passes == ocr_result.ocr_passes
+
+
+def test_extract_text_async_with_cache(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend(),
+                                 cache=ResultCache())
+
+    with patch.object(FakeOCRBackend, 'image_to_string', side_effect=fake_image_to_string) as image_to_string:
+        ocr_result = asyncio.run(ocr_processor.extract_text_async(gradient_image))
+        image_to_string.reset_mock()
+        cached_ocr_result = asyncio.run(ocr_processor.extract_text_async(gradient_image.copy()))
+
+    image_to_string.assert_not_called()
+    assert cached_ocr_result.threshold == ocr_result.threshold == 128
+
+
+def test_extract_text_cache_depends_on_dictionary(image_processor, gradient_image, tmp_path):
+    first_dictionary_file = tmp_path / 'first_words.txt'
+    first_dictionary_file.write_text('word\n', encoding='utf-8')
+    second_dictionary_file = tmp_path / 'second_words.txt'
+    second_dictionary_file.write_text('zzzzz\n', encoding='utf-8')
+    cache = ResultCache()
+    first_ocr_processor = OCRProcessor(DictionaryManager(str(first_dictionary_file)), image_processor,
+                                       ocr_backend=FakeOCRBackend(), cache=cache)
+    second_ocr_processor = OCRProcessor(DictionaryManager(str(second_dictionary_file), fuzzy_max_edit_distance=1),
+                                        image_processor, ocr_backend=FakeOCRBackend(), cache=cache)
+
+    assert first_ocr_processor.extract_text(gradient_image).accuracy == (9, 36)
+    assert second_ocr_processor.extract_text(gradient_image).accuracy == (0, 0)
+
+
+def test_extract_text_async_uses_executor_for_ocr(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+    ocr_threads = set()
+
+    def image_to_string(image):
+        ocr_threads.add(threading.current_thread().name)
+        return fake_image_to_string(image)
+
+    async def extract_text():
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr_executor') as executor:
+            return await ocr_processor.extract_text_async(gradient_image, executor)
+
+    with patch.object(FakeOCRBackend, 'image_to_string', side_effect=image_to_string):
+        ocr_result = asyncio.run(extract_text())
+
+    assert ocr_result.threshold == 128
+    assert ocr_threads and all(name.startswith('ocr_executor') for name in ocr_threads)
+
+
+def test_extract_text_async_with_process_executor(image_processor, gradient_image):
+    ocr_processor = OCRProcessor(FakeDictionaryManager(), image_processor, ocr_backend=FakeOCRBackend())
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(OCRProcessorError):
+            asyncio.run(ocr_processor.extract_text_async(gradient_image, executor))
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytesseract
+import pytest
+
+from PIL import Image
+
+from pyiof.ocr.pytesseract_backend import PytesseractBackend
+
+
+def test_image_to_string_calls_pytesseract():
+    image = Image.new('L', (10, 10))
+    backend = PytesseractBackend(lang='eng', config='--psm 6')
+
+    with patch('pytesseract.image_to_string', return_value='text') as image_to_string:
+        assert backend.image_to_string(image) == 'text'
+
+    image_to_string.assert_called_once_with(image, lang='eng', config='--psm 6')
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path, monkeypatch):
+    # Prints its arguments and the PGM header of the image read from stdin, or fails or sleeps if asked to
+    tesseract_path = tmp_path / 'tesseract'
+    tesseract_path.write_text(f"""#!{sys.executable}
+import sys, time
+if '--fail' in sys.argv:
+    sys.stderr.write('Error opening data file')
+    sys.exit(1)
+if '--sleep' in sys.argv:
+    time.sleep(10)
+image = sys.stdin.buffer.read()
+print(' '.join(sys.argv[1:]), image.split(b'\\n')[1].decode(), len(image))
+""")
+    tesseract_path.chmod(0o755)
+    monkeypatch.setattr(pytesseract.pytesseract, 'tesseract_cmd', str(tesseract_path))
+    return tesseract_path
+
+
+def test_image_to_string_async_runs_tesseract_subprocess(fake_tesseract):
+    image = np.zeros((10, 20), dtype=np.uint8)
+    backend = PytesseractBackend(lang='eng', config='--psm 6')
+
+    text = asyncio.run(backend.image_to_string_async(image))
+
+    assert text.split() == ['stdin', 'stdout', '-l', 'eng', '--psm', '6', '20', '10', str(len(b'P5\n20 10\n255\n') + 200)]
+
+
+def test_image_to_string_async_encodes_pil_images(fake_tesseract):
+    image = Image.new('RGB', (10, 10))
+
+    text = asyncio.run(PytesseractBackend().image_to_string_async(image))
+
+    assert text.startswith('stdin stdout')
+
+
+def test_image_to_string_async_errors(fake_tesseract, monkeypatch):
+    image = np.zeros((10, 20), dtype=np.uint8)
+
+    with pytest.raises(pytesseract.TesseractError):
+        asyncio.run(PytesseractBackend(config='--fail').image_to_string_async(image))
+
+    monkeypatch.setattr(pytesseract.pytesseract, 'tesseract_cmd', str(fake_tesseract) + '_not_existing')
+    with pytest.raises(pytesseract.TesseractNotFoundError):
+        asyncio.run(PytesseractBackend().image_to_string_async(image))
+
+
+def test_image_to_string_async_cancellation_kills_tesseract(fake_tesseract):
+    image = np.zeros((10, 20), dtype=np.uint8)
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def create_tracked_subprocess_exec(*args, **kwargs):
+        processes.append(await create_subprocess_exec(*args, **kwargs))
+        return processes[-1]
+
+    async def cancel_after_start():
+        task = asyncio.create_task(PytesseractBackend(config='--sleep').image_to_string_async(image))
+        while not processes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with patch('asyncio.create_subprocess_exec', side_effect=create_tracked_subprocess_exec):
+        asyncio.run(cancel_after_start())
+
+    assert processes[0].returncode is not None
@@ -0,0 +1,47 @@
+import threading
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from pyiof.ocr import tesserocr_backend
+from pyiof.ocr.tesserocr_backend import TesserocrBackend
+
+
+@pytest.fixture
+def tesserocr_mock():
+    tesserocr = MagicMock()
+    tesserocr.PyTessBaseAPI.side_effect = lambda **kwargs: MagicMock(**{'GetUTF8Text.return_value': 'text'})
+    with patch.object(tesserocr_backend, 'tesserocr', tesserocr), \
+            patch.object(tesserocr_backend, '_thread_local', threading.local()):
+        yield tesserocr
+
+
+def test_tesserocr_not_installed():
+    with patch.object(tesserocr_backend, 'tesserocr', None):
+        with pytest.raises(ImportError):
+            TesserocrBackend()
+
+
+def test_api_is_loaded_once_per_thread(tesserocr_mock):
+    image = Image.new('L', (10, 10))
+
+    assert TesserocrBackend().image_to_string(image) == 'text'
+    assert TesserocrBackend().image_to_string(image) == 'text'
+    assert tesserocr_mock.PyTessBaseAPI.call_count == 1
+
+    thread = threading.Thread(target=TesserocrBackend().image_to_string, args=(image,))
+    thread.start()
+    thread.join()
+    assert tesserocr_mock.PyTessBaseAPI.call_count == 2
+
+
+def test_np_array_is_given_as_raw_pixels(tesserocr_mock):
+    backend = TesserocrBackend()
+
+    assert backend.image_to_string(np.zeros((10, 20), dtype=np.uint8)) == 'text'
+
+    api = backend._get_api()
+    api.SetImageBytes.assert_called_once_with(bytes(200), 20, 10, 1, 20)
+    api.SetImage.assert_not_called()
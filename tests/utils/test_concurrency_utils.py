@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pyiof.utils.concurrency_utils import bounded_imap, bounded_imap_unordered, run_in_executor
+
+
+def test_bounded_imap_unordered():
+    consumed = []
+
+    def items():
+        for item in range(20):
+            consumed.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = bounded_imap_unordered(executor, lambda item: item * item, items(), max_in_flight=3)
+        first_result = next(results)
+        # Items are read lazily, one more than the in-flight limit at most
+        assert len(consumed) <= 4
+        results = [first_result] + list(results)
+
+    assert sorted(item for item, _ in results) == list(range(20))
+    assert all(future.result() == item * item for item, future in results)
+
+
+def test_bounded_imap():
+    consumed = []
+
+    def items():
+        for item in range(20):
+            consumed.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = bounded_imap(executor, lambda item: item * item, items(), max_in_flight=3)
+        first_result = next(results)
+        assert len(consumed) <= 4
+        results = [first_result] + list(results)
+
+    assert [item for item, _ in results] == list(range(20))
+    assert all(future.result() == item * item for item, future in results)
+
+
+def test_run_in_executor_with_semaphore():
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def work(item, offset=0):
+        with lock:
+            running.append(item)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(item)
+        return item + offset
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return await asyncio.gather(*(run_in_executor(work, item, offset=1, executor=executor,
+                                                          semaphore=semaphore) for item in range(8)))
+
+    assert asyncio.run(run_all()) == list(range(1, 9))
+    assert max(max_running) <= 2
+
+
+def test_run_in_executor_without_semaphore():
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return await run_in_executor(threading.current_thread, executor=executor)
+
+    assert asyncio.run(run()) is not threading.current_thread()
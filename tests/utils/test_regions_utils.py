@@ -0,0 +1,41 @@
+import numpy as np
+
+from pyiof.utils.regions_utils import get_regions_iou, merge_overlapping_regions, regions_to_array, \
+    sort_regions_in_reading_order
+
+
+def test_regions_to_array():
+    assert regions_to_array(()).shape == (0, 4)
+    regions = regions_to_array([np.array([1, 2, 3, 4]), (5, 6, 7, 8)])
+    assert regions.dtype == np.int32
+    assert regions.tolist() == [[1, 2, 3, 4], [5, 6, 7, 8]]
+
+
+def test_get_regions_iou():
+    regions = regions_to_array([(0, 0, 10, 10), (5, 0, 10, 10), (20, 20, 5, 5)])
+    ious = get_regions_iou(regions)
+
+    assert ious.shape == (3, 3)
+    assert np.allclose(np.diag(ious), 1)
+    assert np.isclose(ious[0, 1], 50 / 150)
+    assert ious[0, 2] == 0
+
+
+def test_merge_overlapping_regions():
+    regions = regions_to_array([(0, 0, 10, 10), (100, 100, 20, 20), (1, 1, 10, 10), (102, 101, 19, 19)])
+
+    merged_regions = merge_overlapping_regions(regions, overlap_threshold=0.5)
+
+    assert merged_regions.tolist() == [[0, 0, 10, 10], [100, 100, 20, 20]]
+    assert len(merge_overlapping_regions(regions, overlap_threshold=0.9)) == 4
+    assert merge_overlapping_regions(regions_to_array([]), overlap_threshold=0.5).shape == (0, 4)
+
+
+def test_sort_regions_in_reading_order():
+    regions = [(200, 102, 50, 20), (0, 100, 50, 20), (100, 0, 50, 20), (0, 5, 50, 20), (100, 95, 50, 20)]
+
+    sorted_regions = sort_regions_in_reading_order(regions)
+
+    assert sorted_regions.tolist() == [[0, 5, 50, 20], [100, 0, 50, 20],
+                                       [0, 100, 50, 20], [100, 95, 50, 20], [200, 102, 50, 20]]
+    assert sort_regions_in_reading_order([]).shape == (0, 4)
@@ -0,0 +1,76 @@
+import os
+from unittest.mock import patch
+
+from pyiof.utils.result_cache import ResultCache
+
+
+def test_make_key_depends_on_all_parts():
+    assert ResultCache.make_key('a', 1) == ResultCache.make_key('a', 1)
+    assert ResultCache.make_key('a', 1) != ResultCache.make_key('a', 2)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_disk_tier(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    cache.set('a', {'text': 'result'})
+
+    # A new cache on the same directory finds the result on disk
+    assert ResultCache(cache_dir=str(tmp_path)).get('a') == {'text': 'result'}
+    assert ResultCache(cache_dir=str(tmp_path)).get('b') is None
+
+
+def test_disk_tier_is_bounded_in_size(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path), max_disk_bytes=3000)
+    for index in range(10):
+        cache.set(str(index), b'x' * 1000)
+
+    assert sum(os.path.getsize(tmp_path / file_name) for file_name in os.listdir(tmp_path)) <= 3000
+    assert ResultCache(cache_dir=str(tmp_path)).get('9') == b'x' * 1000
+
+
+def test_disk_tier_is_only_scanned_when_exceeded(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path), max_disk_bytes=20_000)
+    with patch.object(ResultCache, '_list_result_files', autospec=True,
+                      side_effect=ResultCache._list_result_files) as list_result_files:
+        for index in range(10):
+            cache.set(str(index), b'x' * 1000)
+        assert list_result_files.call_count == 1
+
+        cache.set('large', b'x' * 12_000)
+        assert list_result_files.call_count == 2
+
+    # The oldest results are deleted down to DISK_EVICTION_RATIO of the budget
+    assert sum(os.path.getsize(tmp_path / file_name) for file_name in os.listdir(tmp_path)) <= 16_000
+    disk_cache = ResultCache(cache_dir=str(tmp_path))
+    assert disk_cache.get('0') is None
+    assert disk_cache.get('large') == b'x' * 12_000
+
+
+def test_disk_write_errors_fall_back_to_memory(tmp_path, caplog):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    with patch('tempfile.mkstemp', side_effect=OSError(28, 'No space left on device')):
+        cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert os.listdir(tmp_path) == []
+    assert 'No space left on device' in caplog.text
+
+
+def test_clear(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    cache.set('a', 1)
+    cache.clear()
+
+    assert cache.get('a') is None
+    assert os.listdir(tmp_path) == []
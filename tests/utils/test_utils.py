@@ -1,6 +1,12 @@
+import hashlib
 import os
-from pyiof.utils.common_utils import get_resources_dir, get_test_resources_dir, calculate_md5
+
+import numpy as np
+import pytest
+from pyiof.utils.common_utils import get_resources_dir, get_test_resources_dir, calculate_md5, \
+    calculate_image_hash, calculate_file_hash, calculate_files_hashes
 from pathlib import Path
+from PIL import Image
 
 
 def test_get_test_resources_dir():
@@ -25,3 +31,59 @@ def test_calculate_md5(scientists_image_path):
     expected_md5 = '18059918cc26f67b78f6f2378b1a8e5b'
     assert md5 == expected_md5, f'Calculated MD5 for scientists.jpeg is {md5} \n' \
                                 f'Expected {expected_md5}'
+
+
+def test_calculate_image_hash():
+    image = Image.new('RGB', (10, 10), color=(255, 0, 0))
+    assert calculate_image_hash(image) == calculate_image_hash(image.copy())
+    assert calculate_image_hash(image) != calculate_image_hash(image.convert('L'))
+    assert calculate_image_hash(image) != calculate_image_hash(Image.new('RGB', (10, 10), color=(0, 255, 0)))
+
+
+def test_calculate_palette_image_hash():
+    black_image = Image.new('P', (10, 10), color=0)
+    black_image.putpalette([0, 0, 0] * 256)
+    white_image = Image.new('P', (10, 10), color=0)
+    white_image.putpalette([255, 255, 255] * 256)
+    transparent_image = black_image.copy()
+    transparent_image.info['transparency'] = 0
+
+    assert calculate_image_hash(black_image) == calculate_image_hash(black_image.copy())
+    assert calculate_image_hash(black_image) != calculate_image_hash(white_image)
+    assert calculate_image_hash(black_image) != calculate_image_hash(transparent_image)
+
+
+def test_calculate_np_array_hash():
+    array = np.arange(100, dtype=np.uint8).reshape(10, 10)
+    assert calculate_image_hash(array) == calculate_image_hash(array.copy())
+    assert calculate_image_hash(array.T) == calculate_image_hash(np.ascontiguousarray(array.T))
+    assert calculate_image_hash(array) != calculate_image_hash(array.reshape(20, 5))
+
+
+def test_calculate_file_hash(scientists_image_path):
+    with open(scientists_image_path, 'rb') as f:
+        content = f.read()
+
+    assert calculate_file_hash(scientists_image_path) == hashlib.md5(content).hexdigest()
+    assert calculate_file_hash(scientists_image_path, 'blake2b') == hashlib.blake2b(content).hexdigest()
+
+
+def test_calculate_file_hash_without_file_digest(scientists_image_path, monkeypatch):
+    # hashlib.file_digest is only available from Python 3.11
+    monkeypatch.delattr(hashlib, 'file_digest', raising=False)
+    md5 = calculate_file_hash(scientists_image_path)
+    assert md5 == '18059918cc26f67b78f6f2378b1a8e5b'
+
+
+def test_calculate_file_hash_unsupported_algorithm(scientists_image_path):
+    with pytest.raises(ValueError):
+        calculate_file_hash(scientists_image_path, 'not_an_algorithm')
+
+
+def test_calculate_files_hashes(scientists_image_path):
+    other_image_path = os.path.join(get_test_resources_dir(), 'test_images', 'canary_islands.png')
+    file_paths = [scientists_image_path, other_image_path]
+
+    file_hashes = calculate_files_hashes(file_paths, 'sha256', max_workers=2)
+
+    assert file_hashes == {file_path: calculate_file_hash(file_path, 'sha256') for file_path in file_paths}